@@ -0,0 +1,87 @@
+"""
+Reports cold-start import cost for each Lambda and checks it against a budget.
+
+Each Lambda is imported in a fresh interpreter with `python -X importtime`,
+laid out the way its deployment zip is (its own directory plus src/shared).
+The report lists the slowest modules by cumulative import time, and the
+script exits non-zero if any Lambda exceeds its budget.
+
+Usage:
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --lambda acknowledgment_handler --budget-ms 250 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Default budgets in milliseconds for importing lambda_function
+BUDGETS_MS = {
+    'github_monitor': 400,
+    'escalation_handler': 400,
+    'acknowledgment_handler': 400,
+}
+
+LAMBDA_ENV = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'DYNAMODB_TABLE': 'github-status-monitor',
+    'SLACK_WEBHOOK_URL': 'http://127.0.0.1/slack',
+    'SLACK_API_TOKEN': 'budget',
+    'GITHUB_SERVICES': 'Git Operations,API Requests',
+    'MONITORING_INTERVAL': '5',
+    'ESCALATION_TIMEOUT': '15',
+    'ESCALATION_CONTACT': '@budget',
+    'HEARTBEAT_BUCKET': 'budget-heartbeat',
+    'HEARTBEAT_FILE': 'heartbeat.html',
+    'SERVICE_NAME': 'budget',
+}
+
+def measure(function_dir):
+    """Imports lambda_function in a fresh interpreter; returns [(cumulative_us, self_us, module)]."""
+    env = dict(os.environ, **LAMBDA_ENV)
+    env['PYTHONPATH'] = os.pathsep.join([
+        os.path.join(REPO_ROOT, 'src', function_dir),
+        os.path.join(REPO_ROOT, 'src', 'shared'),
+    ])
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import lambda_function'],
+        env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {function_dir} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|', 2)
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lambda', dest='functions', action='append', choices=sorted(BUDGETS_MS),
+                        help='check only these Lambdas')
+    parser.add_argument('--budget-ms', type=float, help='override the budget for every checked Lambda')
+    parser.add_argument('--top', type=int, default=10, help='number of modules to list per Lambda')
+    args = parser.parse_args()
+
+    over_budget = []
+    for function_dir in args.functions or sorted(BUDGETS_MS):
+        rows = measure(function_dir)
+        total_ms = next((cumulative for cumulative, _, module in rows if module.strip() == 'lambda_function'), 0) / 1000
+        budget_ms = args.budget_ms or BUDGETS_MS[function_dir]
+        verdict = 'ok' if total_ms <= budget_ms else 'OVER BUDGET'
+        if total_ms > budget_ms:
+            over_budget.append(function_dir)
+
+        print(f"{function_dir}: {total_ms:.1f} ms (budget {budget_ms:.0f} ms) {verdict}")
+        for cumulative, self_us, module in sorted(rows, reverse=True)[:args.top]:
+            print(f"  {cumulative / 1000:8.1f} ms cumulative {self_us / 1000:8.1f} ms self  {module}")
+
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == '__main__':
+    main()
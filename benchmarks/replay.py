@@ -0,0 +1,414 @@
+"""
+Replays summary.json sequences through the github_monitor pipeline locally.
+
+DynamoDB and S3 are replaced by in-memory stand-ins that count calls, and a
+local HTTP server serves summary.json and acts as the Slack webhook sink.
+With --backend sqlite the monitor runs against its in-memory SQLite state
+store instead, which measures the pipeline without the DynamoDB stand-in.
+For each scenario the harness reports wall time, DynamoDB calls, Slack
+requests and bytes, and peak Python memory.
+
+Usage:
+    python benchmarks/replay.py                       # all synthetic scenarios
+    python benchmarks/replay.py --scenario outage-100
+    python benchmarks/replay.py --backend sqlite
+    python benchmarks/replay.py --replay recorded.json --json results.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FakeBatchWriter:
+    """Buffers puts and counts one BatchWriteItem per 25 items, like boto3's batch_writer."""
+
+    def __init__(self, table):
+        self.table = table
+        self.buffer = {}
+
+    def put_item(self, Item):
+        self.buffer[(Item['service_name'], Item['timestamp'])] = Item
+        if len(self.buffer) >= 25:
+            self.flush()
+
+    def delete_item(self, Key):
+        self.buffer[(Key['service_name'], Key['timestamp'])] = None
+        if len(self.buffer) >= 25:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.table.calls['BatchWriteItem'] += 1
+        for key, item in self.buffer.items():
+            if item is None:
+                self.table.items.pop(key, None)
+            else:
+                self.table.items[key] = self.table.store(item)
+        self.buffer = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+class FakeClient:
+    """Stand-in for the resource's client; applies TransactWriteItems without checking conditions."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def transact_write_items(self, TransactItems):
+        self.table.calls['TransactWriteItems'] += 1
+        for action in TransactItems:
+            if 'Put' in action:
+                item = action['Put']['Item']
+                self.table.items[(item['service_name'], item['timestamp'])] = self.table.store(item)
+            elif 'Delete' in action:
+                key = action['Delete']['Key']
+                self.table.items.pop((key['service_name'], key['timestamp']), None)
+        return {}
+
+class FakeMeta:
+    def __init__(self, table):
+        self.client = FakeClient(table)
+
+class FakeTable:
+    """In-memory stand-in for the github-status-monitor table."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = {}
+        self.calls = Counter()
+        self.meta = FakeMeta(self)
+
+    @staticmethod
+    def store(item):
+        # Round-trip through JSON so stored items behave like DynamoDB copies
+        return json.loads(json.dumps(item, default=str), parse_int=Decimal)
+
+    def get_item(self, Key, **kwargs):
+        self.calls['GetItem'] += 1
+        item = self.items.get((Key['service_name'], Key['timestamp']))
+        return {'Item': self.store(item)} if item else {}
+
+    def put_item(self, Item, ConditionExpression=None, **kwargs):
+        self.calls['PutItem'] += 1
+        key = (Item['service_name'], Item['timestamp'])
+        if ConditionExpression == 'attribute_not_exists(service_name)' and key in self.items:
+            raise conditional_check_failed('PutItem')
+        self.items[key] = self.store(Item)
+        return {}
+
+    def delete_item(self, Key, **kwargs):
+        self.calls['DeleteItem'] += 1
+        self.items.pop((Key['service_name'], Key['timestamp']), None)
+        return {}
+
+    def update_item(self, **kwargs):
+        self.calls['UpdateItem'] += 1
+        return {}
+
+    def query(self, **kwargs):
+        self.calls['Query'] += 1
+        return {'Items': []}
+
+    def batch_writer(self, **kwargs):
+        return FakeBatchWriter(self)
+
+class FakeDynamoDB:
+    """Resource-level stand-in exposing Table() and batch_get_item()."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def Table(self, name):
+        return self.table
+
+    def batch_get_item(self, RequestItems):
+        self.table.calls['BatchGetItem'] += 1
+        responses = {}
+        for name, request in RequestItems.items():
+            responses[name] = [
+                self.table.store(self.table.items[(key['service_name'], key['timestamp'])])
+                for key in request['Keys']
+                if (key['service_name'], key['timestamp']) in self.table.items
+            ]
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+class FakeS3:
+    """In-memory stand-in for the heartbeat bucket."""
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = Counter()
+
+    def get_object(self, Bucket, Key):
+        self.calls['GetObject'] += 1
+        if (Bucket, Key) not in self.objects:
+            raise s3_error('NoSuchKey', 'GetObject')
+        body = self.objects[(Bucket, Key)]
+        return {'Body': _Body(body), 'ETag': etag(body)}
+
+    def put_object(self, Bucket, Key, Body, IfMatch=None, IfNoneMatch=None, **kwargs):
+        self.calls['PutObject'] += 1
+        current = self.objects.get((Bucket, Key))
+        if (IfNoneMatch == '*' and current is not None) or (IfMatch and (current is None or etag(current) != IfMatch)):
+            raise s3_error('PreconditionFailed', 'PutObject')
+        body = Body if isinstance(Body, bytes) else Body.encode('utf-8')
+        self.objects[(Bucket, Key)] = body
+        return {'ETag': etag(body)}
+
+class _Body:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+def etag(body):
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+def s3_error(code, operation):
+    from botocore.exceptions import ClientError
+    return ClientError({'Error': {'Code': code, 'Message': ''}}, operation)
+
+def conditional_check_failed(operation):
+    from botocore.exceptions import ClientError
+    return ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': ''}}, operation)
+
+class LocalEndpoints:
+    """Serves the current summary frame and records Slack webhook POSTs."""
+
+    def __init__(self, send_etag=True):
+        self.frame = b'{}'
+        self.send_etag = send_etag
+        self.slack_requests = 0
+        self.slack_bytes = 0
+        self.lock = threading.Lock()
+
+        endpoints = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # Otherwise delayed ACKs add ~40 ms per response
+
+            def do_GET(self):
+                etag = '"' + hashlib.md5(endpoints.frame).hexdigest() + '"'
+                if endpoints.send_etag and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(endpoints.frame)))
+                if endpoints.send_etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(endpoints.frame)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', '0'))
+                self.rfile.read(length)
+                with endpoints.lock:
+                    endpoints.slack_requests += 1
+                    endpoints.slack_bytes += length
+                self.send_response(200)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def component(index, status='operational'):
+    return {'id': f"c{index}", 'name': f"Component {index}", 'status': status}
+
+def incident(incident_id, component_ids, update_ids):
+    """Builds a summary.json incident with updates listed newest first."""
+    return {
+        'id': incident_id,
+        'name': f"Incident {incident_id}",
+        'shortlink': f"https://stspg.io/{incident_id}",
+        'components': [{'id': cid, 'name': f"Component {cid[1:]}"} for cid in component_ids],
+        'incident_updates': [
+            {'id': update_id, 'status': 'investigating', 'body': f"Update {update_id}",
+             'created_at': f"2026-01-01T00:{minute:02d}:00Z"}
+            for minute, update_id in reversed(list(enumerate(update_ids)))
+        ]
+    }
+
+def summary(components, incidents=()):
+    return {'components': components, 'incidents': list(incidents)}
+
+def scenario_quiet(polls=50, count=20):
+    frame = summary([component(i) for i in range(count)])
+    return [frame] * polls
+
+def scenario_flapping(polls=30, count=20):
+    frames = []
+    for poll in range(polls):
+        if poll % 2:
+            frames.append(summary(
+                [component(0, 'degraded_performance')] + [component(i) for i in range(1, count)],
+                [incident(f"flap{poll}", ['c0'], [f"flap{poll}-u1"])]
+            ))
+        else:
+            frames.append(summary([component(i) for i in range(count)]))
+    return frames
+
+def scenario_outage(count=100):
+    ids = [f"c{i}" for i in range(count)]
+    operational = summary([component(i) for i in range(count)])
+    down = [component(i, 'major_outage') for i in range(count)]
+    return [
+        operational,
+        summary(down, [incident('big', ids, ['u1'])]),
+        summary(down, [incident('big', ids, ['u1', 'u2'])]),
+        summary(down, [incident('big', ids, ['u1', 'u2', 'u3'])]),
+        operational,
+    ]
+
+SCENARIOS = {
+    'quiet': (scenario_quiet, True),
+    'quiet-no-etag': (scenario_quiet, False),
+    'flapping': (scenario_flapping, True),
+    'outage-100': (scenario_outage, True),
+}
+
+def load_replay(paths):
+    """Loads recorded frames; each file is one summary.json or a JSON list of them."""
+    frames = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        frames.extend(data if isinstance(data, list) else [data])
+    return frames
+
+def load_monitor(endpoints):
+    """Imports github_monitor/main.py against the local stand-ins."""
+    os.environ.update({
+        'AWS_DEFAULT_REGION': os.environ.get('AWS_DEFAULT_REGION', 'us-east-1'),
+        'DYNAMODB_TABLE': 'github-status-monitor',
+        'SLACK_WEBHOOK_URL': f"{endpoints.url}/slack",
+        'SLACK_API_TOKEN': 'benchmark',
+        'GITHUB_SERVICES': '',  # Monitor every synthetic component
+        'MONITORING_INTERVAL': '5',
+        'ESCALATION_TIMEOUT': '15',
+        'ESCALATION_CONTACT': '@benchmark',
+        'HEARTBEAT_BUCKET': 'benchmark-heartbeat',
+        'HEARTBEAT_FILE': 'heartbeat.html',
+        'SERVICE_NAME': 'benchmark',
+    })
+    for path in ('src/shared', 'src/github_monitor'):
+        full_path = os.path.join(REPO_ROOT, path)
+        if full_path not in sys.path:
+            sys.path.insert(0, full_path)
+
+    import main
+    return main
+
+def run_scenario(name, frames, send_etag, backend='dynamodb'):
+    endpoints = LocalEndpoints(send_etag=send_etag)
+    try:
+        main = load_monitor(endpoints)
+        table = FakeTable(main.DYNAMODB_TABLE)
+        s3 = FakeS3()
+        if backend == 'sqlite':
+            store = main.state.SQLiteStore()
+        else:
+            store = main.state.DynamoDBStore(main.DYNAMODB_TABLE, dynamodb=FakeDynamoDB(table))
+        main.clients.update({'store': store, 's3': s3})
+        main.heartbeat.clients['s3'] = s3
+        main.heartbeat.state.update({'published_at': 0, 'document': None, 'etag': None})
+        main.STATUS_SOURCES = [dict(main.STATUS_SOURCES[0], url=f"{endpoints.url}/summary.json")]
+        main.SLACK_WEBHOOK_URL = f"{endpoints.url}/slack"
+        main.status_cache.update({'loaded': False, 'sources': {}})
+        main.pending_alerts.clear()
+        main.outbox_state.update({'leader': False, 'swept_at': 0, 'pending': False})
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        for frame in frames:
+            endpoints.frame = json.dumps(frame).encode('utf-8')
+            main.lambda_handler({}, None)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'scenario': name,
+            'polls': len(frames),
+            'wall_ms': round(elapsed * 1000, 1),
+            'ms_per_poll': round(elapsed * 1000 / max(len(frames), 1), 2),
+            'dynamodb_calls': sum(table.calls.values()),
+            'dynamodb_by_op': dict(table.calls),
+            's3_calls': sum(s3.calls.values()),
+            'slack_requests': endpoints.slack_requests,
+            'slack_bytes': endpoints.slack_bytes,
+            'peak_kib': round(peak / 1024, 1),
+        }
+    finally:
+        endpoints.close()
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='run only these scenarios')
+    parser.add_argument('--replay', nargs='+', metavar='FILE', help='replay recorded summary.json frames')
+    parser.add_argument('--backend', choices=['dynamodb', 'sqlite'], default='dynamodb',
+                        help='state store: the counting DynamoDB stand-in or in-memory SQLite')
+    parser.add_argument('--json', metavar='FILE', help='also write results as JSON for comparing commits')
+    parser.add_argument('--verbose', action='store_true', help='keep the pipeline\'s own print output')
+    args = parser.parse_args()
+
+    runs = []
+    if args.replay:
+        runs.append(('replay', load_replay(args.replay), True))
+    for name in args.scenario or ([] if args.replay else sorted(SCENARIOS)):
+        build, send_etag = SCENARIOS[name]
+        runs.append((name, build(), send_etag))
+
+    results = []
+    for name, frames, send_etag in runs:
+        stdout = sys.stdout
+        if not args.verbose:
+            sys.stdout = open(os.devnull, 'w')
+        try:
+            results.append(run_scenario(name, frames, send_etag, args.backend))
+        finally:
+            if not args.verbose:
+                sys.stdout.close()
+                sys.stdout = stdout
+
+    header = f"{'scenario':<16}{'polls':>6}{'wall ms':>10}{'ms/poll':>9}{'ddb':>6}{'s3':>5}{'slack':>7}{'bytes':>9}{'peak KiB':>10}"
+    print(header)
+    for r in results:
+        print(f"{r['scenario']:<16}{r['polls']:>6}{r['wall_ms']:>10}{r['ms_per_poll']:>9}{r['dynamodb_calls']:>6}"
+              f"{r['s3_calls']:>5}{r['slack_requests']:>7}{r['slack_bytes']:>9}{r['peak_kib']:>10}")
+        print(f"{'':<16}dynamodb: {r['dynamodb_by_op']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main_cli()
@@ -1,17 +1,38 @@
 import json
-import os
-import boto3
-import urllib.parse
 import time
-from boto3.dynamodb.conditions import Key  # Import Key for GSI queries
+import urllib.parse
+import acknowledgments
+import metrics
+import stats
+from main import ACK_MODE, acknowledge_incident, deliver_outbox, find_incident, get_lambda_client, get_service_stats
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['DYNAMODB_TABLE'])
+STATS_DEFAULT_DAYS = 30
+STATS_MAX_DAYS = 366
 
 def lambda_handler(event, context):
+    """Entry point; emits the invocation's metrics however the request ends."""
     try:
-        print(f"Received event: {json.dumps(event, indent=2)}") # Log full event for debugging
+        with metrics.timer('Total'):
+            return handle_request(event, context)
+    finally:
+        metrics.emit()
+
+def handle_request(event, context):
+    # Async stage: persist an acknowledgment that an earlier invocation already answered
+    if 'deferred_acknowledgment' in event:
+        ack = event['deferred_acknowledgment']
+        response = process_acknowledgment(ack['incident'], ack['user'], ack['user_name'])
+        if response['statusCode'] >= 500:
+            # The user has already seen it succeed, so fail the invocation and let Lambda
+            # retry the event; the ack is conditional, so a retry cannot record it twice
+            raise Exception(f"Deferred acknowledgment failed: {response['body']}")
+        return response
+
+    # Dashboard queries: GET /stats?service=<name>&from=YYYY-MM-DD&to=YYYY-MM-DD
+    if event.get('resource') == '/stats':
+        return handle_stats_request(event)
 
+    try:
         # Ensure 'body' exists and is a string
         if 'body' not in event or not event['body']:
             print("Error: No body found in event")
@@ -21,7 +42,6 @@ def lambda_handler(event, context):
             }
 
         raw_body = event['body']
-        print(f"Raw body received: {raw_body}") # Debug log the body
 
         # Handle Slack's form-encoded payload or raw JSON from AWS CLI
         if isinstance(raw_body, str):
@@ -39,15 +59,18 @@ def lambda_handler(event, context):
         else:
             payload = raw_body
 
-        print(f"Parsed payload: {json.dumps(payload, indent=2)}")
-
         # Extract incident ID and user from payload
         actions = payload.get('actions', [])
         if not actions:
             print("Error: No actions found in payload")
             return {'statusCode': 400, 'body': json.dumps({'error': 'No actions found in payload'})}
 
-        incident_id = actions[0].get('value')
+        # The button value carries the incident id and, for newer messages, its status row key
+        incident = acknowledgments.parse_button_value(actions[0].get('value'))
+        incident_id = incident['incident_id']
+        if not incident_id:
+            print("Error: No incident ID in action value")
+            return {'statusCode': 400, 'body': json.dumps({'error': 'No incident ID in payload'})}
 
         # Extract user information robustly
         user = None
@@ -64,45 +87,94 @@ def lambda_handler(event, context):
         # Get the username if available
         user_name = payload['user'].get('name', user) if 'user' in payload else user
 
-        print(f"Incident ID: {incident_id}, User: {user}")
-
-        # Query DynamoDB using GSI to find matching incident_id
-        response = table.query(
-            IndexName="incident_id-index",
-            KeyConditionExpression=Key("incident_id").eq(incident_id)
-        )
-
-        items = response.get('Items', [])
-        if not items:
-            print("No matching incident found")
-            return {'statusCode': 404, 'body': json.dumps({'error': 'Incident not found'})}
-
-        # Update the first matching item found
-        item = items[0]
-        table.update_item(
-            Key={
-                'service_name': item['service_name'],
-                'timestamp': item['timestamp'] # Must include both partition and sort keys
-            },
-            UpdateExpression="SET acknowledged_by = :user, acknowledged_at = :time",
-            ExpressionAttributeValues={
-                ':user': user,
-                ':time': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
+        # Slack needs an answer within 3 seconds, so reply now and persist afterwards
+        if ACK_MODE == 'async' and context is not None:
+            defer_acknowledgment(context, incident, user, user_name)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'message': f'Acknowledging incident {incident_id} for {user_name}'})
             }
-        )
 
-        # Call acknowledge_incident from main.py to store username
-        from main import acknowledge_incident
-        acknowledge_incident(incident_id, user, user_name)
+        return process_acknowledgment(incident, user, user_name)
 
+    except Exception as e:
+        print(f"Error handling acknowledgment: {e}")
         return {
-            'statusCode': 200,
-            'body': json.dumps({'message': f'Incident acknowledged by {user_name} successfully'})
+            'statusCode': 500,
+            'body': json.dumps(f'Error: {str(e)}')
         }
 
+def defer_acknowledgment(context, incident, user, user_name):
+    """
+    Hands an acknowledgment to an asynchronous invocation of this function.
+    Falls back to processing it inline if the invoke fails.
+    """
+    ack = {'incident': incident, 'user': user, 'user_name': user_name}
+    try:
+        get_lambda_client().invoke(
+            FunctionName=context.invoked_function_arn,
+            InvocationType='Event',
+            Payload=json.dumps({'deferred_acknowledgment': ack}).encode('utf-8')
+        )
     except Exception as e:
-        print(f"Error handling acknowledgment: {e}")
+        print(f"Error deferring acknowledgment, processing inline: {e}")
+        process_acknowledgment(incident, user, user_name)
+
+def process_acknowledgment(incident, user, user_name):
+    """
+    Records an acknowledgment. Only the first acknowledgment of each of an
+    incident's status rows is stored and confirmed, so duplicate clicks and
+    async retries are harmless. Errors come back as a 500 response.
+    """
+    try:
+        if 'service_name' not in incident:
+            incident = find_incident(incident['incident_id'])
+            if not incident:
+                print("No matching incident found")
+                return {'statusCode': 404, 'body': json.dumps({'error': 'Incident not found'})}
+
+        response = acknowledge_incident(incident, user, user_name)
+        deliver_outbox()
+        return response
+
+    except Exception as e:
+        print(f"Error processing acknowledgment: {e}")
         return {
             'statusCode': 500,
             'body': json.dumps(f'Error: {str(e)}')
         }
+
+def handle_stats_request(event):
+    """
+    Serves uptime, MTTA and MTTR for one service. 'to' defaults to today (UTC)
+    and 'from' to STATS_DEFAULT_DAYS days earlier.
+    """
+    params = event.get('queryStringParameters') or {}
+    service_name = params.get('service')
+    if not service_name:
+        return {'statusCode': 400, 'body': json.dumps({'error': "Missing 'service' parameter"})}
+
+    try:
+        last_day = params.get('to') or stats.day_of(time.time())
+        first_day = params.get('from') or stats.day_of(stats.day_start(last_day) - (STATS_DEFAULT_DAYS - 1) * stats.DAY)
+        days = (stats.day_start(last_day) - stats.day_start(first_day)) // stats.DAY + 1
+    except ValueError:
+        return {'statusCode': 400, 'body': json.dumps({'error': "'from' and 'to' must be YYYY-MM-DD"})}
+    if not 1 <= days <= STATS_MAX_DAYS:
+        return {'statusCode': 400, 'body': json.dumps({'error': f"Query between 1 and {STATS_MAX_DAYS} days"})}
+
+    try:
+        summary = get_service_stats(service_name, first_day, last_day)
+    except Exception as e:
+        print(f"Error reading stats for {service_name}: {e}")
+        return {'statusCode': 500, 'body': json.dumps({'error': 'Could not read stats'})}
+
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Cache-Control': 'max-age=60',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps(summary)
+    }
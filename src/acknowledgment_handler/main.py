@@ -1,30 +1,77 @@
 import json
 import os
+import time
 import boto3
+from boto3.dynamodb.types import TypeDeserializer
+import acknowledgments
+import metrics
+import outbox
+import stats
+import templates
 
 # Environment variables
 DYNAMODB_TABLE = os.environ['DYNAMODB_TABLE']
 SLACK_API_TOKEN = os.environ['SLACK_API_TOKEN']
 SLACK_WEBHOOK_URL = os.environ['SLACK_WEBHOOK_URL']
+ACK_MODE = os.environ.get('ACK_MODE', 'inline')  # 'async' replies at once and persists in a self-invocation
 
-# Clients
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(DYNAMODB_TABLE)
+# Low-level client, created on first use; the resource layer is too slow to load on the 3 s ack path
+clients = {}
 
-def acknowledge_incident(incident_id, user, user_name):  # Add user_name parameter
+deserializer = TypeDeserializer()
+
+def get_dynamodb_client():
+    """Returns the cached low-level DynamoDB client."""
+    if 'dynamodb' not in clients:
+        clients['dynamodb'] = metrics.instrument(boto3.client('dynamodb'))
+    return clients['dynamodb']
+
+def get_lambda_client():
+    """Returns the cached Lambda client used to hand acknowledgments to the async stage."""
+    if 'lambda' not in clients:
+        clients['lambda'] = metrics.instrument(boto3.client('lambda'))
+    return clients['lambda']
+
+def find_incident(incident_id):
+    """
+    Looks up an incident's status row key through incident_id-index.
+    Only needed for buttons sent before the key was embedded in the button value.
+    """
+    response = get_dynamodb_client().query(
+        TableName=DYNAMODB_TABLE,
+        IndexName="incident_id-index",
+        KeyConditionExpression="incident_id = :incident_id",
+        ExpressionAttributeValues={':incident_id': {'S': incident_id}}
+    )
+    items = response.get('Items', [])
+    if not items:
+        return None
+
+    # Prefer the row that carries the escalation state
+    item = next((item for item in items if item['timestamp']['S'] == 'latest'), items[0])
+    return {
+        'incident_id': incident_id,
+        'service_name': item['service_name']['S'],
+        'timestamp': item['timestamp']['S']
+    }
+
+def acknowledge_incident(incident, user, user_name):  # Add user_name parameter
     """
     Acknowledges an incident in DynamoDB and sends a follow-up message to Slack.
+    incident holds the incident_id plus the service_name/timestamp key of its status row.
     """
     try:
-        # Acknowledge in DynamoDB
-        table.put_item(Item={
-            'incident_id': incident_id,
-            'acknowledged_by': user,
-            'user_name': user_name  # Add this line to store username
-        })
-
-        # Send Slack confirmation message
-        send_acknowledgment_confirmation(incident_id, user_name)  # Use user_name instead of user
+        # Status row, acknowledgments table and the Slack confirmation are written in one transaction
+        message = outbox.message_item(confirmation_message(incident['incident_id'], user_name), 'acknowledgment')
+        if not acknowledgments.record_acknowledgment(
+            get_dynamodb_client(), DYNAMODB_TABLE, incident, user, user_name, outbox.typed(message)
+        ):
+            return {
+                'statusCode': 200,
+                'body': json.dumps(f"Incident {incident['incident_id']} was already acknowledged.")
+            }
+
+        outbox.track(message)
         return {
             'statusCode': 200,
             'body': json.dumps('Incident acknowledgment processed successfully.')
@@ -36,26 +83,56 @@ def acknowledge_incident(incident_id, user, user_name):  # Add user_name paramet
             'body': json.dumps(f'An error occurred: {str(e)}')
         }
 
-def send_acknowledgment_confirmation(incident_id, user):
+def confirmation_message(incident_id, user):
     """
-    Sends a follow-up message to Slack confirming the acknowledgment.
+    Renders the follow-up message to Slack confirming the acknowledgment.
     """
-    try:
-        message = {
-            "text": f":eyes: {user} is handling incident {incident_id}."
-        }
-        
-        encoded_data = json.dumps(message).encode('utf-8')
-        
-        # Make a POST request to the Slack webhook URL
-        http = urllib3.PoolManager()
-        response = http.request(
-            'POST',
-            SLACK_WEBHOOK_URL,
-            body=encoded_data,
-            headers={'Content-type': 'application/json'}
-        )
-        print(f"Slack confirmation message sent: {response.status}")
+    return templates.render('acknowledgment', (incident_id, user), user=user, incident_id=incident_id)
 
+def deliver_outbox():
+    """
+    POSTs the confirmation committed with the acknowledgment. If that fails it
+    stays in the outbox for the monitor's drainer; delivery never fails the ack.
+    """
+    try:
+        outbox.deliver(outbox.ClientWriter(get_dynamodb_client(), DYNAMODB_TABLE), SLACK_WEBHOOK_URL)
     except Exception as e:
         print(f"Error sending Slack confirmation message: {e}")
+
+def get_service_stats(service_name, first_day, last_day):
+    """
+    Returns uptime, MTTA and MTTR for a service over the UTC days first_day to
+    last_day (YYYY-MM-DD), from its daily stats rows plus its status row for
+    the interval still open. Costs one Query and one GetItem.
+    """
+    client = get_dynamodb_client()
+    query_args = {
+        'TableName': DYNAMODB_TABLE,
+        'KeyConditionExpression': 'service_name = :partition AND #day BETWEEN :first AND :last',
+        'ExpressionAttributeNames': {'#day': 'timestamp'},
+        'ExpressionAttributeValues': {
+            ':partition': {'S': stats.PREFIX + service_name},
+            ':first': {'S': first_day},
+            ':last': {'S': last_day}
+        }
+    }
+    items = []
+    while True:
+        response = client.query(**query_args)
+        items.extend(untyped(item) for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    latest = client.get_item(
+        TableName=DYNAMODB_TABLE,
+        Key={'service_name': {'S': service_name}, 'timestamp': {'S': 'latest'}}
+    ).get('Item')
+
+    start = stats.day_start(first_day)
+    end = max(min(stats.day_start(last_day) + stats.DAY, int(time.time())), start)
+    return stats.summarize(service_name, items, start, end, untyped(latest) if latest else None)
+
+def untyped(item):
+    """Converts an item from DynamoDB's typed attribute values."""
+    return {name: deserializer.deserialize(value) for name, value in item.items()}
@@ -1,18 +1 @@
-
-import json
-import os
-import boto3
-from datetime import datetime, timedelta
-
-def lambda_handler(event, context):
-    # This is a placeholder for the Escalation Handler Lambda function
-    # In a real implementation, this would:
-    # 1. Check for unacknowledged incidents that exceed the escalation timeout
-    # 2. Send escalation notifications
-    
-    print("Escalation Handler running")
-    
-    return {
-        'statusCode': 200,
-        'body': json.dumps('Escalation check completed successfully')
-    }
+from main import lambda_handler  # Import the handler from main.py
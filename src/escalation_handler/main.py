@@ -2,25 +2,52 @@ import json
 import os
 import time
 import boto3
-import urllib3
+import escalations
+import heartbeat
+import metrics
+import outbox
+import templates
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 
 # Environment variables
 DYNAMODB_TABLE = os.environ['DYNAMODB_TABLE']
 SLACK_WEBHOOK_URL = os.environ['SLACK_WEBHOOK_URL']
-ESCALATION_TIMEOUT = int(os.environ['ESCALATION_TIMEOUT'])
 ESCALATION_CONTACT = os.environ['ESCALATION_CONTACT']
 
-# Clients
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(DYNAMODB_TABLE)
-http = urllib3.PoolManager()
+ESCALATION_OPEN = 'open'
+
+# Last minute bucket fully processed by a tick
+CURSOR_KEY = {'service_name': '__escalation_cursor__', 'timestamp': 'latest'}
+FIRST_RUN_LOOKBACK = 60 * 60  # Seconds of buckets the first tick picks up
+MAX_CATCHUP = 24 * 60 * 60  # Buckets older than this behind the cursor are skipped
+# Schedule rows escalated per transaction; each takes up to 3 of TransactWriteItems' 100 actions
+MAX_ROWS_PER_TRANSACTION = 30
+
+# Clients are created on first use and reused by warm invocations
+clients = {}
+
+def get_table():
+    """Returns the cached status table."""
+    if 'table' not in clients:
+        dynamodb = boto3.resource('dynamodb')
+        metrics.instrument(dynamodb.meta.client)
+        clients['table'] = dynamodb.Table(DYNAMODB_TABLE)
+    return clients['table']
 
 def lambda_handler(event, context):
     """
-    Checks for incidents that have not been acknowledged and escalates them.
+    Fires the escalation tiers that have come due since the last tick.
     """
     try:
-        escalate_unacknowledged_incidents()
+        with metrics.timer('Total'):
+            heartbeat.beat()
+            try:
+                escalate_due_incidents(int(time.time()))
+            finally:
+                # Escalations committed before a failure are still delivered
+                deliver_outbox()
+                heartbeat.flush()
         return {
             'statusCode': 200,
             'body': json.dumps('Escalation check completed.')
@@ -31,54 +58,164 @@ def lambda_handler(event, context):
             'statusCode': 500,
             'body': json.dumps(f'An error occurred: {str(e)}')
         }
+    finally:
+        metrics.emit()
 
-def escalate_unacknowledged_incidents():
+def escalate_due_incidents(now):
     """
-    Escalates any incidents older than the configured timeout that haven't been acknowledged.
+    Processes every minute bucket from the one after the cursor up to the
+    current minute, then moves the cursor to the last complete minute. The
+    current minute is read again next tick for rows not yet due, and so is a
+    bucket in which a row failed.
     """
-    current_time = time.time()
-    
-    try:
-        # Scan active incidents (status != 'operational')
-        scan_response = table.scan(
-            FilterExpression='attribute_not_exists(acknowledged_by)'
-        )
-        items = scan_response.get('Items', [])
-        
-        for item in items:
-            timestamp = time.mktime(time.strptime(item['timestamp'], '%Y-%m-%d %H:%M:%S UTC'))
-            
-            # Check if incident has timed out
-            if (current_time - timestamp) > (ESCALATION_TIMEOUT * 60):
-                escalate_incident(item)
+    current_minute = now - now % 60
+    cursor = get_cursor()
+    start = cursor + 60 if cursor is not None else current_minute - FIRST_RUN_LOOKBACK
+    start = max(start, current_minute - MAX_CATCHUP)
+
+    processed = start - 60
+    failed = False
+    for minute in range(start, current_minute + 60, 60):
+        # Due rows grouped per (incident, tier), so a multi-component incident sends one message
+        groups = {}
+        for item in get_bucket(escalations.bucket(minute)):
+            if int(item['due_at']) > now:
+                continue
+            groups.setdefault((item['escalation_incident'], int(item['tier'])), []).append(item)
+
+        for (incident_id, tier), items in groups.items():
+            for first in range(0, len(items), MAX_ROWS_PER_TRANSACTION):
+                try:
+                    escalate_incident(incident_id, tier, items[first:first + MAX_ROWS_PER_TRANSACTION])
+                except Exception as e:
+                    print(f"Error escalating incident {incident_id} tier {tier}: {e}")
+                    failed = True
+
+        if not failed and minute < current_minute:
+            processed = minute
+        metrics.count('EscalationBuckets')
 
+    if cursor is None or processed > cursor:
+        get_table().put_item(Item=dict(CURSOR_KEY, minute=processed))
+
+def get_cursor():
+    """
+    Returns the last fully processed minute (epoch), or None before the first
+    tick. A failed read raises, skipping the tick, since treating it as a first
+    run could move the cursor backward.
+    """
+    try:
+        item = get_table().get_item(Key=CURSOR_KEY, ConsistentRead=True).get('Item')
     except Exception as e:
-        print(f"Error scanning DynamoDB: {e}")
+        print(f"Error reading escalation cursor: {e}")
+        raise
+    return int(item['minute']) if item else None
 
-def escalate_incident(item):
+def get_bucket(bucket):
     """
-    Escalates an incident by sending a message to the configured escalation
-def escalate_incident(item):
+    Yields the schedule rows in one minute bucket, page by page.
     """
-    Escalates an incident by sending a message to the configured escalation contact.
+    query_args = {'KeyConditionExpression': Key('service_name').eq(bucket), 'ConsistentRead': True}
+    while True:
+        response = get_table().query(**query_args)
+        yield from response.get('Items', [])
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def escalate_incident(incident_id, tier, items):
     """
-    service_name = item['service_name']
-    incident_id = item['incident_id']
-    
-    try:
-        # Send escalation message to Slack
-        message = {
-            "text": f":rotating_light: *ESCALATION*: Incident {incident_id} for {service_name} has not been acknowledged. Escalating to {ESCALATION_CONTACT}."
+    Escalates one tier of an incident in a single transaction: claims the tier
+    on the status row of each schedule row in items, schedules the next tier,
+    removes the schedule rows and writes the message for the tier's escalation
+    contact to the outbox. Rows whose claim fails (acknowledged, resolved or
+    already escalated) are removed and the rest tried again.
+    Returns the number of rows escalated. A failure leaves the rows in their
+    bucket to be retried.
+    """
+    while items:
+        message = outbox.message_item(escalation_message(incident_id, tier, items), 'escalation')
+        actions = []
+        claims = []
+        for item in items:
+            claims.append(len(actions))
+            actions.extend(schedule_actions(item, tier))
+        actions.append({'Put': {'TableName': DYNAMODB_TABLE, 'Item': message}})
+
+        try:
+            get_table().meta.client.transact_write_items(TransactItems=actions)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+            reasons = [reason.get('Code') for reason in e.response.get('CancellationReasons', [])]
+            skipped = [index for index, claim in enumerate(claims) if reasons[claim:claim + 1] == ['ConditionalCheckFailed']]
+            if not skipped:
+                raise
+            for index in skipped:
+                get_table().delete_item(Key=schedule_key(items[index]))
+            metrics.count('EscalationsSkipped', len(skipped))
+            items = [item for index, item in enumerate(items) if index not in skipped]
+            continue
+
+        outbox.track(message)
+        metrics.count('Escalations')
+        return len(items)
+    return 0
+
+def schedule_actions(item, tier):
+    """
+    Returns the transaction actions for one schedule row, its claim first.
+    The claim records the tier on the incident's status row, only if the row
+    still holds this incident, is unacknowledged, and has not fired this tier yet.
+    """
+    actions = [{
+        'Update': {
+            'TableName': DYNAMODB_TABLE,
+            'Key': {'service_name': item['row_service_name'], 'timestamp': item['row_timestamp']},
+            'UpdateExpression': 'SET escalation_tier = :tier',
+            'ConditionExpression': 'incident_id = :incident_id AND escalation_state = :open '
+                                   'AND (attribute_not_exists(escalation_tier) OR escalation_tier < :tier)',
+            'ExpressionAttributeValues': {
+                ':tier': tier,
+                ':incident_id': item['escalation_incident'],
+                ':open': ESCALATION_OPEN
+            }
         }
-        
-        encoded_data = json.dumps(message).encode('utf-8')
-        response = http.request(
-            'POST',
-            SLACK_WEBHOOK_URL,
-            body=encoded_data,
-            headers={'Content-type': 'application/json'}
-        )
-        print(f"Escalation message sent to Slack: {response.status}")
+    }]
+
+    if tier < len(escalations.TIERS):
+        actions.append({'Put': {'TableName': DYNAMODB_TABLE, 'Item': escalations.schedule_item(
+            {'service_name': item['row_service_name'], 'timestamp': item['row_timestamp']},
+            item['escalation_incident'], item['service'], item['opened_at'], tier + 1
+        )}})
+
+    actions.append({'Delete': {'TableName': DYNAMODB_TABLE, 'Key': schedule_key(item)}})
+    return actions
 
+def schedule_key(item):
+    return {'service_name': item['service_name'], 'timestamp': item['timestamp']}
+
+def escalation_message(incident_id, tier, items):
+    """
+    Renders the message to the tier's escalation contact, naming every service in items.
+    """
+    service_name = ', '.join(sorted({item['service'] for item in items}))
+    contact = escalations.TIERS[tier - 1]['contact'] or ESCALATION_CONTACT
+    minutes = escalations.TIERS[tier - 1]['minutes']
+
+    return templates.render(
+        'escalation', (incident_id, tier, service_name),
+        tier=tier, incident_id=incident_id, services=service_name, minutes=minutes, contact=contact
+    )
+
+def deliver_outbox():
+    """
+    POSTs the escalations committed by this tick. What is not delivered stays
+    in the outbox for the monitor's drainer; delivery never fails the tick.
+    """
+    try:
+        with get_table().batch_writer() as writer:
+            outbox.deliver(writer, SLACK_WEBHOOK_URL)
     except Exception as e:
-        print(f"Error sending escalation message: {e}")
+        print(f"Error delivering escalation messages: {e}")
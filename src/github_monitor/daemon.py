@@ -0,0 +1,108 @@
+"""
+Long-running GitHub status monitor.
+
+Runs the same monitoring cycle as the scheduled Lambda (check_github_status in
+main.py) on an asyncio schedule that adapts to what it sees:
+- while any component is non-operational it polls every DAEMON_MIN_INTERVAL seconds,
+- after a change it polls every DAEMON_BASE_INTERVAL seconds,
+- each quiet poll stretches the interval by DAEMON_BACKOFF, up to DAEMON_MAX_INTERVAL.
+The interval never drops below the summary's Cache-Control max-age, and unchanged
+summaries are answered with a 304 through the monitor's conditional GET.
+
+It reads the same environment variables as the Lambda. STATE_BACKEND=sqlite
+runs it without DynamoDB.
+
+Usage:
+    python src/github_monitor/daemon.py
+"""
+import asyncio
+import os
+import signal
+import sys
+import time
+
+# Outside Lambda, shared modules are not merged into this directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared')
+if os.path.isdir(SHARED_DIR) and SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+import heartbeat
+import main
+import metrics
+import notifications
+import outbox
+
+MIN_INTERVAL = float(os.environ.get('DAEMON_MIN_INTERVAL', '10'))  # While a component is degraded
+BASE_INTERVAL = float(os.environ.get('DAEMON_BASE_INTERVAL', '30'))  # Right after a change
+MAX_INTERVAL = float(os.environ.get('DAEMON_MAX_INTERVAL', '300'))  # Ceiling for quiet periods
+BACKOFF = float(os.environ.get('DAEMON_BACKOFF', '1.5'))
+
+def run_cycle():
+    """
+    Runs one monitoring cycle, delivers its outbox and heartbeat and emits its metrics.
+    """
+    try:
+        with metrics.timer('Total'):
+            try:
+                result = main.check_github_status()
+                main.deliver_outbox()
+                return result
+            finally:
+                outbox.discard()
+                notifications.flush()
+                heartbeat.flush()
+    finally:
+        metrics.emit()
+
+def next_interval(interval, result):
+    """
+    Returns the delay before the next poll given the last cycle's result.
+    """
+    components = result.get('components')
+    if components is None:
+        # Another monitor holds the lease; keep checking whether it lapses
+        return BASE_INTERVAL
+
+    if any(component.get('status') != 'operational' for component in components):
+        interval = MIN_INTERVAL
+    elif result.get('changed'):
+        interval = BASE_INTERVAL
+    else:
+        interval = min(interval * BACKOFF, MAX_INTERVAL)
+
+    # Polling faster than the CDN's max-age only returns the same summary
+    return min(max(interval, main.source_max_age()), MAX_INTERVAL)
+
+async def run(stop):
+    """
+    Polls until stop is set. A failed cycle is logged and retried with backoff.
+    """
+    interval = BASE_INTERVAL
+    while not stop.is_set():
+        started = time.monotonic()
+        try:
+            # The cycle does blocking I/O, so it runs off the event loop
+            result = await asyncio.to_thread(run_cycle)
+            interval = next_interval(interval, result)
+            print(f"{result['message']}. Next poll in {interval:.0f}s.")
+        except Exception as e:
+            interval = min(max(interval, BASE_INTERVAL) * BACKOFF, MAX_INTERVAL)
+            print(f"Monitoring cycle failed: {e}. Retrying in {interval:.0f}s.")
+
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=max(0, interval - (time.monotonic() - started)))
+        except asyncio.TimeoutError:
+            pass
+
+async def run_daemon():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print(f"GitHub status daemon started (poll every {MIN_INTERVAL:.0f}-{MAX_INTERVAL:.0f}s).")
+    await run(stop)
+    print("GitHub status daemon stopped.")
+
+if __name__ == '__main__':
+    asyncio.run(run_daemon())
@@ -0,0 +1,42 @@
+# Per-component hysteresis for status transitions.
+#
+# A component's latest row holds its confirmed status. When a poll reports a
+# different status it becomes the row's candidate (pending_status) and is only
+# confirmed once it has been seen on `polls` consecutive polls and for at least
+# `dwell` seconds. Seeing the confirmed status again drops the candidate, so a
+# component that flaps faster than that never reaches the alert path. The
+# counters live in the latest row, which the sync already reads in one batch.
+
+PENDING_FIELDS = ('pending_status', 'pending_count', 'pending_since')
+
+STEADY = 'steady'  # Same status as confirmed, nothing pending
+CONFIRM = 'confirm'  # Candidate held long enough; handle it as a status change
+PENDING = 'pending'  # Candidate recorded, not yet confirmed
+SUPPRESSED = 'suppressed'  # Back to the confirmed status before the candidate was confirmed
+
+def enabled(polls, dwell):
+    return polls > 1 or dwell > 0
+
+def observe(existing_status, current_status, now, polls=1, dwell=0):
+    """
+    Advances a component's state machine by one poll.
+    Returns (outcome, row): row is the latest row to write for PENDING and
+    SUPPRESSED, and None otherwise. With polls=1 and dwell=0 every change is
+    confirmed at once.
+    """
+    if existing_status['status'] == current_status:
+        if existing_status.get('pending_status') is None:
+            return STEADY, None
+        return SUPPRESSED, {field: value for field, value in existing_status.items() if field not in PENDING_FIELDS}
+
+    if existing_status.get('pending_status') == current_status:
+        count = int(existing_status.get('pending_count', 0)) + 1
+        since = int(existing_status.get('pending_since', now))
+    else:
+        # A new candidate, or a different one than before, starts over
+        count, since = 1, int(now)
+
+    if count >= polls and now - since >= dwell:
+        return CONFIRM, None
+
+    return PENDING, dict(existing_status, pending_status=current_status, pending_count=count, pending_since=since)
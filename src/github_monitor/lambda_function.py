@@ -1,5 +1 @@
-import json
-import os
-import boto3
-from datetime import datetime
 from main import lambda_handler  # Import the handler from main.py
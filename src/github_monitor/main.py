@@ -1,10 +1,22 @@
 import json
+import hashlib
 import os
 import time
-import urllib3
-import boto3
 import urllib.parse
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import acknowledgments
+import escalations
+import heartbeat
+import hysteresis
+import metrics
+import notifications
+import outbox
+import sources
+import state
+import stats
+import summary_stream
+import templates
 
 # Environment variablesDYNAMODB_TABLE = os.environ['DYNAMODB_TABLE']
 DYNAMODB_TABLE = os.environ['DYNAMODB_TABLE']
@@ -15,81 +27,129 @@ MONITORING_INTERVAL = int(os.environ['MONITORING_INTERVAL'])
 ESCALATION_TIMEOUT = int(os.environ['ESCALATION_TIMEOUT'])
 ESCALATION_CONTACT = os.environ['ESCALATION_CONTACT']
 HEARTBEAT_BUCKET = os.environ['HEARTBEAT_BUCKET']
-HEARTBEAT_FILE = os.environ['HEARTBEAT_FILE']
 SERVICE_NAME = os.environ['SERVICE_NAME']
+ALERT_COALESCE_WINDOW = int(os.environ.get('ALERT_COALESCE_WINDOW', '0'))  # Seconds to hold alerts across runs
+HISTORY_TTL_DAYS = int(os.environ.get('HISTORY_TTL_DAYS', '30'))  # Raw history rows expire after this
+HISTORY_COMPACT_AFTER_DAYS = int(os.environ.get('HISTORY_COMPACT_AFTER_DAYS', '1'))
+STATE_BACKEND = os.environ.get('STATE_BACKEND', 'dynamodb')  # 'sqlite' runs against a local store
+STATE_DB_PATH = os.environ.get('STATE_DB_PATH', ':memory:')
+# A status change is only acted on after this many consecutive polls and seconds (see hysteresis.py)
+HYSTERESIS_POLLS = int(os.environ.get('HYSTERESIS_POLLS', '1'))
+HYSTERESIS_DWELL = int(os.environ.get('HYSTERESIS_DWELL', '0'))
+MONITOR_ROLE = os.environ.get('MONITOR_ROLE', 'primary')  # 'primary' or 'secondary'
+LEASE_HOLDER = f"{os.environ.get('AWS_REGION', 'local')}/{os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'github-status-monitor')}"
+# Leader lease lasts two polling intervals so a single missed run does not cause a failover
+LEASE_DURATION = int(os.environ.get('LEASE_DURATION', str(MONITORING_INTERVAL * 60 * 2 + 60)))
+# Seconds between drains of the outbox while this container has not left rows behind itself
+OUTBOX_SWEEP_INTERVAL = int(os.environ.get('OUTBOX_SWEEP_INTERVAL', '300'))
 
-#DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(DYNAMODB_TABLE)
+if isinstance(GITHUB_SERVICES, str):
+    GITHUB_SERVICES = [name.strip() for name in GITHUB_SERVICES.split(',') if name.strip()]
 
-#S3 client
-s3 = boto3.client('s3')
+# AWS clients and the state store are created on first use and reused by warm invocations
+clients = {}
+http = notifications.http
 
-if isinstance(GITHUB_SERVICES, str):
-    GITHUB_SERVICES = GITHUB_SERVICES.split(',')
+GITHUB_STATUS_URL = 'https://www.githubstatus.com/api/v2/summary.json'
+STATUS_CACHE_FILE = 'github-status-cache.json'
+
+# Status pages to poll; githubstatus.com plus any STATUS_SOURCES entries (see sources.py)
+STATUS_SOURCES = sources.load_sources(os.environ.get('STATUS_SOURCES'), GITHUB_STATUS_URL, GITHUB_SERVICES)
+MAX_SOURCE_WORKERS = 8
+# 'stream' parses summary.json incrementally and keeps only watched components; 'full' uses json.loads
+SUMMARY_PARSER = os.environ.get('SUMMARY_PARSER', 'stream')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Single row holding per-component hashes of the last synced summary, and the
+# last ingested incident_update id per open incident
+FINGERPRINT_KEY = {'service_name': '__summary_fingerprint__', 'timestamp': 'latest'}
+
+# Leader lease shared by the primary and secondary monitors
+LEASE_KEY = {'service_name': '__monitor_lease__', 'timestamp': 'latest'}
+
+# Marker holding the last history day rolled up into per-day summaries
+COMPACTION_KEY = {'service_name': '__history_compaction__', 'timestamp': 'latest'}
+
+# Alerts held across runs while the coalescing window is open
+DIGEST_KEY = {'service_name': '__alert_digest__', 'timestamp': 'latest'}
+MAX_DIGEST_SECTIONS = 45  # Slack allows 50 blocks per message
+
+# Alerts raised during the current invocation, sent together by flush_alerts()
+pending_alerts = []
+
+# Daily stats changes per (service, day) recorded by the current sync, written by flush_stats()
+pending_stats = {}
 
-# AWS Clients
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(DYNAMODB_TABLE)
-http = urllib3.PoolManager()
+# Whether the last sync left a transition unconfirmed; None until this container has synced
+sync_state = {'pending': None}
+
+# Whether this container holds the lease, and when it last drained the outbox
+outbox_state = {'leader': False, 'swept_at': 0, 'pending': False}
+
+# Last fetched summary and validators per source; survives between warm invocations
+status_cache = {'loaded': False, 'sources': {}}
+
+def get_store():
+    """Returns the cached state store for the status table (see state.py)."""
+    if 'store' not in clients:
+        clients['store'] = state.open_store(STATE_BACKEND, DYNAMODB_TABLE, STATE_DB_PATH)
+    return clients['store']
+
+def get_s3():
+    """Returns the cached S3 client for the heartbeat bucket, shared with the heartbeat module."""
+    if 's3' not in clients:
+        clients['s3'] = heartbeat.get_s3()
+    return clients['s3']
 
 def send_incident_to_slack(service_name, incident_id, description, is_test=False):
     """Stores incident in DynamoDB and sends Slack notification."""
-    timestamp = datetime.utcnow().isoformat()
-    
-    # Check if incident already exists using the GSI
-    response = table.query(
-        IndexName='incident_id-index',
-        KeyConditionExpression='incident_id = :incident_id',
-        ExpressionAttributeValues={':incident_id': incident_id}
+    now = int(time.time())
+    timestamp = utc_timestamp(now)
+    row_key = {'service_name': service_name, 'timestamp': f"incident#{incident_id}"}
+
+    # Sent once per row, so the body is not cached; the description is the caller's
+    body = templates.render(
+        'incident',
+        prefix='🟢 TEST: ' if is_test else '🔴 Incident Alert: ',
+        service=service_name,
+        description=description,
+        color='#FF0000' if not is_test else '#36a64f',
+        button=acknowledgments.button_value(incident_id, service_name, row_key['timestamp'])
     )
-    
-    if response.get('Items'):
+    message = outbox.message_item(body, 'incident', now)
+
+    # Store the incident with its escalation schedule and Slack message (with acknowledgment
+    # button) in one transaction; a retry or concurrent run finds it already there
+    created = create_incident_record(dict(
+        row_key,
+        created_at=timestamp,
+        incident_id=incident_id,
+        status='active',
+        description=description,
+        is_test=is_test,  # Mark test messages
+        acknowledged=False,  # Add acknowledgment tracking
+        **escalation_fields()
+    ), [escalations.schedule_item(row_key, incident_id, service_name, now), message])
+
+    if not created:
         print(f"Incident {incident_id} already exists. Skipping duplicate entry.")
         return
-    
-    # Step 1: Store the incident in DynamoDB
-    table.put_item(
-        Item={
-            'service_name': service_name,
-            'timestamp': timestamp,
-            'incident_id': incident_id,
-            'status': 'active',
-            'description': description,
-            'is_test': is_test,  # Mark test messages
-            'acknowledged': False  # Add acknowledgment tracking
-        }
-    )
-    
-    # Step 2: Send Slack message with acknowledgment button
-    slack_message = {
-        "text": f"{'🟢 TEST: ' if is_test else '🔴 Incident Alert: '} {service_name} is experiencing an issue!",
-        "attachments": [
-            {
-                "text": description,
-                "fallback": "Acknowledge Incident",
-                "callback_id": "incident_acknowledgment",
-                "color": "#FF0000" if not is_test else "#36a64f",
-                "actions": [
-                    {
-                        "name": "acknowledge",
-                        "text": "Acknowledge",
-                        "type": "button",
-                        "value": incident_id
-                    }
-                ]
-            }
-        ]
-    }
-    
-    response = http.request(
-        'POST',
-        SLACK_WEBHOOK_URL,
-        body=json.dumps(slack_message).encode('utf-8'),
-        headers={'Content-Type': 'application/json'}
-    )
-    
-    print(f"Slack response: {response.status}, {response.data}")
+    outbox.track(message)
+
+def create_incident_record(item, related=()):
+    """
+    Writes an incident row keyed by its incident id, and the related rows that
+    go with it, in one transaction that only commits if the incident row is new.
+    Returns True if the row was created, False if it already existed.
+    """
+    try:
+        with get_store().writer(atomic=True) as writer:
+            writer.put_new(item)
+            for related_item in related:
+                writer.put_item(Item=related_item)
+        return True
+    except state.ItemExists:
+        return False
 
 def handle_acknowledgment(event):
     """Handles the acknowledgment of an incident from Slack."""
@@ -106,62 +166,37 @@ def handle_acknowledgment(event):
         parsed_body = urllib.parse.parse_qs(body)
         payload = json.loads(parsed_body['payload'][0])
         
-        incident_id = payload['actions'][0]['value']
+        # The button value carries the incident id and, for newer messages, its status row key
+        incident = acknowledgments.parse_button_value(payload['actions'][0]['value'])
+        incident_id = incident['incident_id']
         user_name = payload['user']['name']
         user_id = payload['user']['id']
         
-        # Find the incident in DynamoDB using the GSI
-        response = table.query(
-            IndexName='incident_id-index',
-            KeyConditionExpression='incident_id = :incident_id',
-            ExpressionAttributeValues={':incident_id': incident_id}
-        )
+        if 'service_name' not in incident:
+            # Older buttons only carry the incident id; find its row using the GSI
+            items = get_store().query_incident(incident_id)
+            
+            if not items:
+                return {
+                    'statusCode': 404,
+                    'body': json.dumps({'message': f'Incident {incident_id} not found'})
+                }
+            
+            item = next((item for item in items if item['timestamp'] == 'latest'), items[0])
+            incident.update(service_name=item['service_name'], timestamp=item['timestamp'])
         
-        if not response.get('Items'):
+        # Status row, acknowledgments table and the Slack confirmation are written in one
+        # transaction; the first ack of the row wins
+        body = templates.render('acknowledgment', (incident_id, user_name), user=user_name, incident_id=incident_id)
+        message = outbox.message_item(body, 'acknowledgment')
+        first_ack = get_store().acknowledge(incident, f"{user_name} ({user_id})", user_name, message)
+        if not first_ack:
             return {
-                'statusCode': 404,
-                'body': json.dumps({'message': f'Incident {incident_id} not found'})
+                'statusCode': 200,
+                'body': json.dumps({'message': f'Incident {incident_id} was already acknowledged'})
             }
         
-        incident = response['Items'][0]
-        
-        # Update the incident with acknowledgment info
-        table.update_item(
-            Key={
-                'service_name': incident['service_name'],
-                'timestamp': incident['timestamp']
-            },
-            UpdateExpression='SET acknowledged = :ack, acknowledged_by = :user, acknowledged_at = :time',
-            ExpressionAttributeValues={
-                ':ack': True,
-                ':user': f"{user_name} ({user_id})",
-                ':time': datetime.utcnow().isoformat()
-            }
-        )
-
-        # Also store in the acknowledgments table
-        ack_table = dynamodb.Table('github-incident-acknowledgments')
-        ack_table.put_item(
-            Item={
-                'incident_id': incident_id,
-                'acknowledged_by': f"{user_name} ({user_id})",
-                'acknowledged_at': datetime.utcnow().isoformat(),
-                'service_name': incident['service_name']
-            }
-        )
-        
-        # Send confirmation message back to Slack
-        confirmation_message = {
-            "text": f":white_check_mark: Incident `{incident_id}` has been acknowledged by {user_name}",
-            "replace_original": False
-        }
-        
-        http.request(
-            'POST',
-            payload['response_url'],
-            body=json.dumps(confirmation_message).encode('utf-8'),
-            headers={'Content-Type': 'application/json'}
-        )
+        outbox.track(message)
         
         return {
             'statusCode': 200,
@@ -179,7 +214,7 @@ def store_incident(message):
     """
     Store the incident in DynamoDB.
     """
-    timestamp = str(int(time.time()))
+    timestamp = utc_timestamp()
     item = {
         'service_name': SERVICE_NAME,
         'timestamp': timestamp,
@@ -190,7 +225,7 @@ def store_incident(message):
     }
     try:
         print(f"Attempting to store incident: {item}")  # Add this line BEFORE table.put_item
-        table.put_item(Item=item)
+        get_store().put_item(Item=item)
         print(f"Incident stored in DynamoDB: {item}")
     except Exception as e:
         print(f"Error storing incident in DynamoDB: {e}")
@@ -198,100 +233,561 @@ def store_incident(message):
 
 def lambda_handler(event, context):
     """Main Lambda entry point."""
+    try:
+        with metrics.timer('Total'):
+            try:
+                response = handle_event(event)
+                deliver_outbox()
+                return response
+            finally:
+                # After a failure, rows already committed are left to the drainer
+                outbox.discard()
+                notifications.flush()
+                heartbeat.flush()
+    finally:
+        metrics.emit()
+
+def handle_event(event):
+    """Routes an acknowledgment, test or scheduled event."""
     # Check if this is an acknowledgment from Slack
     if event.get('requestContext', {}).get('resourcePath') == '/acknowledge':
         return handle_acknowledgment(event)
         
-    # If not an acknowledgment, proceed with the original monitoring logic
-    is_test = event.get('test', False)
-    
-    for service_name in GITHUB_SERVICES:
-        incident_id = f"test-incident-{int(time.time())}" if is_test else f"incident-{int(time.time())}"
-        description = f"Service {service_name} is {'TESTING alert.' if is_test else 'down. Investigating.'}"
-        send_incident_to_slack(service_name, incident_id, description, is_test=is_test)
-    
+    # Daily scheduled compaction of raw history rows
+    if event.get('action') == 'compact_history':
+        compacted = compact_history()
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'message': f'Compacted {compacted} history rows'})
+        }
+
+    # Test events send a synthetic incident for each configured service
+    if event.get('test', False):
+        for service_name in GITHUB_SERVICES:
+            incident_id = f"test-incident-{int(time.time())}"
+            description = f"Service {service_name} is TESTING alert."
+            send_incident_to_slack(service_name, incident_id, description, is_test=True)
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'message': 'Incident notifications sent'})
+        }
+
+    # Scheduled run
+    result = check_github_status()
     return {
         'statusCode': 200,
-        'body': json.dumps({'message': 'Incident notifications sent'})
+        'body': json.dumps({'message': result['message']})
     }
 
-def check_heartbeat():
+def check_github_status():
+    """
+    Runs one monitoring cycle: lease, conditional fetch, incident ingestion, sync and alerts.
+    Shared by the scheduled Lambda run and the long-running daemon (daemon.py).
+    Returns a dict with the message, whether the summary changed, and its components
+    (None if another monitor holds the lease).
+    """
+    # Liveness is written in the background, so it overlaps the fetch below
+    heartbeat.beat()
+
+    # Only the lease holder runs the pipeline and drains the outbox; the other region exits here
+    with metrics.timer('Lease'):
+        leader = acquire_lease()
+    outbox_state['leader'] = leader
+    if not leader:
+        metrics.count('LeaseSkipped')
+        return {'message': 'Monitoring lease held by another region', 'changed': False, 'components': None}
+
+    # Fetch every due source, then sync all components in one batch
+    with metrics.timer('Fetch'):
+        fetched = fetch_status_sources()
+    changed = {name: result for name, result in fetched.items() if result[1] is not None}
+    if not changed and not transitions_pending():
+        metrics.count('SummaryUnchanged')
+        flush_alerts()
+        return {'message': 'GitHub status unchanged', 'changed': False, 'components': collect_components({})[0]}
+
+    # An unchanged summary is still synced while a transition waits for confirmation.
+    # The sync writes its alerts to the outbox in the same transaction as the status rows.
+    components, incidents = collect_components({name: data for name, (data, _) in changed.items()})
+    with metrics.timer('Diff'):
+        sync_github_services(components, incidents)
+    if not changed:
+        return {'message': 'GitHub status unchanged', 'changed': False, 'components': components}
+
+    with metrics.timer('Cache'):
+        for name, (data, validators) in changed.items():
+            save_source_status(name, data, validators)
+        save_status_cache()
+
+    return {'message': 'GitHub status check completed', 'changed': True, 'components': components}
+
+def transitions_pending():
     """
-    Checks the heartbeat file in S3 to ensure the Lambda function is running.
+    Returns True if a status transition may be waiting for hysteresis confirmation.
+    A cold container does not know, so it syncs once to find out.
+    """
+    return hysteresis.enabled(HYSTERESIS_POLLS, HYSTERESIS_DWELL) and sync_state['pending'] is not False
+
+def acquire_lease():
     """
+    Takes or renews the leader lease for this scheduled run.
+    The primary always renews it. The secondary reads it first and only takes
+    over, with a conditional write, once the lease has expired.
+    """
+    now = int(time.time())
+    lease_item = dict(LEASE_KEY, holder=LEASE_HOLDER, expires_at=now + LEASE_DURATION)
+
+    try:
+        if MONITOR_ROLE == 'primary':
+            get_store().put_item(Item=lease_item)
+            return True
+
+        lease = get_store().get_item(LEASE_KEY, consistent=True)
+        if lease and lease.get('holder') != LEASE_HOLDER and int(lease.get('expires_at', 0)) > now:
+            print(f"Lease held by {lease['holder']} until {lease['expires_at']}. Skipping run.")
+            return False
+
+        if not get_store().put_lease(lease_item, now):
+            print("Lease taken by another region. Skipping run.")
+            return False
+        return True
+    except Exception as e:
+        print(f"Error acquiring lease: {e}")
+
+    # If the lease row is unreachable, monitoring is more important than deduplication
+    return True
+
+def fetch_status_sources():
+    """
+    Fetches every source whose polling interval has elapsed, concurrently over
+    the shared connection pool. Returns {name: (data, validators)} for the fetched
+    sources. A failing source is skipped; if every due source fails, this raises.
+    """
+    load_status_cache()
+    now = time.time()
+    due = [
+        source for source in STATUS_SOURCES
+        if now - get_source_cache(source['name'])['fetched_at'] >= source['interval'] * 0.9
+    ]
+    if not due:
+        return {}
+
+    if len(due) == 1:
+        outcomes = [fetch_source_outcome(due[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(due), MAX_SOURCE_WORKERS)) as executor:
+            outcomes = list(executor.map(fetch_source_outcome, due))
+
+    fetched = {source['name']: outcome for source, outcome in zip(due, outcomes) if outcome is not None}
+    if not fetched:
+        raise Exception("Failed to fetch any status source.")
+    return fetched
+
+def fetch_source_outcome(source):
+    """
+    Fetches one source for fetch_status_sources(), returning None instead of raising.
+    """
+    try:
+        return fetch_source_status(source)
+    except Exception as e:
+        print(f"Skipping status source {source['name']}: {e}")
+        return None
+
+def fetch_source_status(source):
+    """
+    Fetches one source's summary with a conditional GET.
+    Returns (data, validators); validators is None when the summary is unchanged.
+    """
+    cache = get_source_cache(source['name'])
+
+    headers = {}
+    if cache['data'] is not None:
+        if cache['etag']:
+            headers['If-None-Match'] = cache['etag']
+        if cache['last_modified']:
+            headers['If-Modified-Since'] = cache['last_modified']
+
+    try:
+        # The body is read by the parser below rather than buffered by urllib3
+        response = http.request('GET', source['url'], headers=headers, preload_content=False)
+        try:
+            cache['max_age'] = cache_max_age(response.headers.get('Cache-Control'))
+            cache['fetched_at'] = time.time()
+
+            if response.status == 304:
+                return cache['data'], None
+            if response.status != 200:
+                raise Exception(f"Unexpected HTTP status {response.status}")
+
+            # Parse time includes reading the body, which the streaming parser interleaves
+            with metrics.timer('Parse'):
+                if SUMMARY_PARSER == 'stream':
+                    data = summary_stream.parse_summary(response.stream(STREAM_CHUNK_SIZE), source['components'])
+                else:
+                    data = json.loads(response.read())
+            validators = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+            return data, validators
+        finally:
+            response.drain_conn()
+            response.release_conn()
+    except Exception as e:
+        print(f"Error fetching {source['name']} status: {e}")
+        raise Exception(f"Failed to fetch {source['name']} status.")
+
+def collect_components(fresh):
+    """
+    Normalizes every source into one list of components and incidents, using
+    freshly fetched summaries from `fresh` and the cached summary otherwise.
+    """
+    components = []
+    incidents = []
+    for source in STATUS_SOURCES:
+        data = fresh.get(source['name'], get_source_cache(source['name'])['data'])
+        if data is None:
+            continue
+        source_components, source_incidents = sources.normalize_summary(source, data)
+        components.extend(source_components)
+        incidents.extend(source_incidents)
+    return components, incidents
+
+def get_source_cache(source_name):
+    """
+    Returns the cached summary, validators and fetch time for a source.
+    """
+    return status_cache['sources'].setdefault(source_name, {
+        'etag': None, 'last_modified': None, 'data': None, 'max_age': 0, 'fetched_at': 0
+    })
+
+def source_max_age():
+    """
+    Returns the shortest Cache-Control max-age reported by any source.
+    """
+    return min((cache['max_age'] for cache in status_cache['sources'].values()), default=0)
+
+def cache_max_age(cache_control):
+    """
+    Returns the max-age in seconds from a Cache-Control header, or 0.
+    """
+    for directive in (cache_control or '').split(','):
+        name, _, value = directive.strip().partition('=')
+        if name.lower() == 'max-age' and value.isdigit():
+            return int(value)
+    return 0
+
+def load_status_cache():
+    """
+    Loads the cached summaries from the heartbeat bucket on a cold start.
+    """
+    if status_cache['loaded']:
+        return
+    status_cache['loaded'] = True
+
     try:
-        response = s3.get_object(Bucket=HEARTBEAT_BUCKET, Key=HEARTBEAT_FILE)
-        content = response['Body'].read().decode('utf-8')
-        print(f"Heartbeat file content: {content}")
+        response = get_s3().get_object(Bucket=HEARTBEAT_BUCKET, Key=STATUS_CACHE_FILE)
+        cached = json.loads(response['Body'].read().decode('utf-8'))
+        # Caches written before sources were added hold only the GitHub summary
+        cached_sources = cached['sources'] if 'sources' in cached else {sources.DEFAULT_SOURCE: cached}
+        allowlists = {source['name']: sorted(source['components']) for source in STATUS_SOURCES}
+        for name, cached_source in cached_sources.items():
+            # A summary pruned to a different allowlist cannot stand in for a 304
+            data = cached_source.get('data') or {}
+            if 'allowlist' in data and data['allowlist'] != allowlists.get(name):
+                continue
+            get_source_cache(name).update({
+                'etag': cached_source.get('etag'),
+                'last_modified': cached_source.get('last_modified'),
+                'data': cached_source.get('data'),
+                'fetched_at': cached_source.get('fetched_at', 0)
+            })
     except Exception as e:
-        print(f"Heartbeat check failed: {e}")
-        raise Exception("Lambda heartbeat check failed. Failing before GitHub status check.")
+        print(f"No cached status available: {e}")
+
+def save_source_status(source_name, data, validators):
+    """
+    Records a processed summary so later runs can send conditional requests.
+    Call only after the summary has been fully handled, otherwise a 304 would hide its changes.
+    """
+    get_source_cache(source_name).update({
+        'etag': validators.get('etag'),
+        'last_modified': validators.get('last_modified'),
+        'data': data
+    })
 
-def update_heartbeat():
+def save_status_cache():
     """
-    Updates the heartbeat file in S3 to confirm the Lambda function is still running.
+    Writes the cached summaries to the heartbeat bucket for the next cold start.
     """
+    status_cache['loaded'] = True
+    cached_sources = {
+        name: {
+            'etag': cache['etag'],
+            'last_modified': cache['last_modified'],
+            'data': cache['data'],
+            'fetched_at': cache['fetched_at']
+        }
+        for name, cache in status_cache['sources'].items()
+        if cache['etag'] or cache['last_modified']
+    }
+    if not cached_sources:
+        return
+
     try:
-        timestamp = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
-        content = f"<html><body>Lambda heartbeat: Last updated {timestamp}</body></html>"
-        s3.put_object(Bucket=HEARTBEAT_BUCKET, Key=HEARTBEAT_FILE, Body=content.encode('utf-8'), ContentType='text/html', ACL='public-read')
-        print(f"Heartbeat file updated successfully.")
+        body = json.dumps({'sources': cached_sources}).encode('utf-8')
+        get_s3().put_object(Bucket=HEARTBEAT_BUCKET, Key=STATUS_CACHE_FILE, Body=body, ContentType='application/json')
     except Exception as e:
-        print(f"Error updating heartbeat file: {e}")
-        raise Exception("Failed to update Lambda heartbeat.")
+        print(f"Error saving status cache: {e}")
+
+def sync_github_services(components, incidents=()):
+    """
+    Syncs fetched components against DynamoDB with batched reads and writes.
+    The fingerprint row also holds the incident high-water marks, so an
+    unchanged summary costs that single read. Otherwise new incident updates
+    are ingested, and only components whose fingerprint changed since the
+    last sync are diffed, plus those with a transition still waiting for
+    hysteresis confirmation.
+    """
+    attach_incidents(components, latest_incidents(incidents))
+    marks = incident_marks(incidents)
+    digest, component_hashes = summary_fingerprint(components, marks)
+    stored = get_summary_fingerprint()
+
+    if stored.get('digest') == digest:
+        metrics.count('FingerprintUnchanged')
+        sync_state['pending'] = False
+        flush_alerts()
+        return
+
+    if not ingest_incidents(incidents, stored.get('marks', {})):
+        # Keep the old marks and force a full diff, so the next sync ingests them again
+        marks = stored.get('marks', {})
+        digest = None
+
+    stored_hashes = stored.get('components', {})
+    changed = [
+        component for component in components
+        if stored_hashes.get(component_key(component)) != component_hashes[component_key(component)]
+    ]
+    metrics.count('ComponentsChanged', len(changed))
+
+    existing_statuses = get_service_statuses([component['name'] for component in changed])
+
+    # Status rows, their stats, their alerts and the fingerprint commit in one transaction
+    pending = 0
+    pending_stats.clear()  # Left over only if an earlier sync failed before committing
+    with get_store().writer(atomic=True) as writer:
+        for component in changed:
+            if apply_service_status(component, existing_statuses.get(component['name']), writer):
+                # Leave it out of the fingerprint so the next sync diffs it again
+                component_hashes[component_key(component)] = hysteresis.PENDING
+                pending += 1
+        flush_stats(writer)
+        flush_alerts(writer)
+
+        if pending:
+            digest = None
+        writer.put_item(Item=dict(FINGERPRINT_KEY, digest=digest, components=component_hashes, marks=marks))
+    sync_state['pending'] = pending > 0
+
+def component_key(component):
+    """
+    Returns the stable key used for a component in the fingerprint row.
+    """
+    return component.get('id') or component['name']
+
+def component_hash(component):
+    """
+    Hashes the fields of a component that drive status handling.
+    """
+    incident = component_incident(component) or {}
+    incident_update_id = incident.get('update_id') or incident.get('id') or ''
+
+    fields = f"{component_key(component)}|{component['status']}|{incident_update_id}"
+    return hashlib.blake2b(fields.encode('utf-8'), digest_size=8).hexdigest()
 
-def get_github_status():
+def summary_fingerprint(components, marks=None):
     """
-    Fetches GitHub status from the public API.
+    Returns (digest, component_hashes) for a list of components. The digest
+    also covers the latest update of every incident, including those that do
+    not affect a watched component, so a new update is never skipped.
+    """
+    component_hashes = {component_key(component): component_hash(component) for component in components}
+    combined = '|'.join(f"{key}={value}" for key, value in sorted(component_hashes.items()))
+    combined += '|' + '|'.join(f"incident:{key}={value}" for key, value in sorted((marks or {}).items()))
+    digest = hashlib.blake2b(combined.encode('utf-8'), digest_size=16).hexdigest()
+    return digest, component_hashes
+
+def get_summary_fingerprint():
+    """
+    Retrieves the fingerprint row written by the last successful sync.
     """
     try:
-        url = 'https://www.githubstatus.com/api/v2/summary.json'
-        response = http.request('GET', url)
-        data = json.loads(response.data.decode('utf-8'))
-        return data
+        return get_store().get_item(FINGERPRINT_KEY, consistent=True) or {}
     except Exception as e:
-        print(f"Error fetching GitHub status: {e}")
-        raise Exception("Failed to fetch GitHub status.")
+        print(f"Error retrieving summary fingerprint: {e}")
+        return {}
 
 def process_github_service(component):
     """
     Processes a specific GitHub service component.
     """
+    existing_status = get_service_status(component['name'])
+    with get_store().writer(atomic=True) as writer:
+        apply_service_status(component, existing_status, writer)
+        flush_stats(writer)
+        flush_alerts(writer)
+
+def apply_service_status(component, existing_status, writer):
+    """
+    Diffs a component against its stored latest row and writes any change through writer.
+    Returns True if a status change is waiting for hysteresis confirmation.
+    """
     service_name = component['name']
     current_status = component['status']
-    timestamp = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
+    timestamp = utc_timestamp()
     
-    incident = None
+    incident = component_incident(component)
+
+    if existing_status:
+        # Check if the status has changed for long enough to act on
+        outcome, latest_item = hysteresis.observe(existing_status, current_status, time.time(), HYSTERESIS_POLLS, HYSTERESIS_DWELL)
+        if latest_item:
+            writer.put_item(Item=latest_item)
+
+        if outcome == hysteresis.CONFIRM:
+            handle_status_change(service_name, current_status, timestamp, incident, existing_status, writer)
+        elif outcome == hysteresis.PENDING:
+            metrics.count('TransitionsPending')
+        elif outcome == hysteresis.SUPPRESSED:
+            metrics.count('FlapsSuppressed')
+        return outcome == hysteresis.PENDING
+
+    # Add the new service to DynamoDB
+    add_new_service(service_name, current_status, timestamp, incident, writer)
+    return False
+
+def component_incident(component):
+    """
+    Returns the incident attached to a component, or None.
+    """
+    if component.get('incident'):
+        return component['incident']
     if component.get('incident_updates'):
-        incident = component.get('incident_updates')[0]
+        return component['incident_updates'][0]
+    return None
 
-    # Check if the service is already in DynamoDB
-    existing_status = get_service_status(service_name)
+def incident_marks(incidents):
+    """
+    Returns the latest incident_update id of each incident that has updates.
+    """
+    return {
+        incident['id']: incident['incident_updates'][0]['id']
+        for incident in incidents if incident.get('incident_updates')
+    }
 
-    if existing_status:
-        # Check if the status has changed
-        if existing_status['status'] != current_status:
-            handle_status_change(service_name, current_status, timestamp, incident)
-    else:
-        # Add the new service to DynamoDB
-        add_new_service(service_name, current_status, timestamp, incident)
+def latest_incidents(incidents):
+    """
+    Returns a dict of component id to the latest incident affecting it.
+    """
+    component_incidents = {}
+    for incident in incidents:
+        updates = incident.get('incident_updates') or []
+        if not updates:
+            continue
+
+        compact = {
+            'id': incident['id'],
+            'update_id': updates[0]['id'],
+            'shortlink': incident.get('shortlink', ''),
+            'body': updates[0].get('body', '')
+        }
+        for affected in incident.get('components') or []:
+            component_incidents.setdefault(affected['id'], compact)
+    return component_incidents
+
+def ingest_incidents(incidents, marks):
+    """
+    Appends incident updates newer than the high-water marks to each incident's
+    timeline, writing only new updates. Returns False if they could not be written.
+    """
+    events = []
+    for incident in incidents:
+        # Updates are newest first, so stop at the last one already ingested
+        for update in incident.get('incident_updates') or []:
+            if update['id'] == marks.get(incident['id']):
+                break
+            events.append(timeline_event(incident, update))
+
+    if not events:
+        return True
+    try:
+        with get_store().writer() as writer:
+            for event in events:
+                writer.put_item(Item=event)
+        metrics.count('IncidentUpdatesIngested', len(events))
+        return True
+    except Exception as e:
+        print(f"Error ingesting incident updates: {e}")
+        return False
+
+def timeline_event(incident, update):
+    """
+    Builds the compact timeline row for one incident update. Like raw history,
+    it expires through the table's purge_at TTL after HISTORY_TTL_DAYS.
+    """
+    return {
+        'service_name': f"incident#{incident['id']}",
+        'timestamp': f"{update.get('created_at', '')}#{update['id']}",
+        'incident_status': update.get('status', ''),
+        'body': update.get('body', ''),
+        'components': [affected['name'] for affected in incident.get('components') or []],
+        'purge_at': int(time.time()) + HISTORY_TTL_DAYS * 86400
+    }
+
+def attach_incidents(components, component_incidents):
+    """
+    Attaches the latest incident affecting each component for status handling.
+    """
+    for component in components:
+        incident = component_incidents.get(component.get('id'))
+        if incident:
+            component['incident'] = incident
 
 def get_service_status(service_name):
     """
     Retrieves the current status of a service from DynamoDB.
     """
     try:
-        response = table.get_item(Key={'service_name': service_name, 'timestamp': 'latest'})
-        return response.get('Item')
+        return get_store().get_item({'service_name': service_name, 'timestamp': 'latest'})
     except Exception as e:
         print(f"Error retrieving service status: {e}")
         return None
 
-def handle_status_change(service_name, current_status, timestamp, incident):
+def get_service_statuses(service_names):
+    """
+    Retrieves the latest status rows for many services using BatchGetItem.
+    Returns a dict keyed by service name; services without a row are omitted.
+    """
+    keys = [
+        {'service_name': service_name, 'timestamp': 'latest'}
+        for service_name in dict.fromkeys(service_names)
+    ]
+
+    try:
+        return {item['service_name']: item for item in get_store().batch_get(keys)}
+    except Exception as e:
+        print(f"Error retrieving service statuses: {e}")
+        raise Exception("Failed to load service statuses from DynamoDB.")
+
+def handle_status_change(service_name, current_status, timestamp, incident, existing_status=None, writer=None):
     """
     Handles a change in service status.
     """
-    print(f"Status change detected for {service_name}: {current_status}")
+    writer = writer or get_store()
+    metrics.count('StatusChanges')
 
     # Determine if there is an active incident
     if incident:
@@ -302,18 +798,27 @@ def handle_status_change(service_name, current_status, timestamp, incident):
     if current_status != 'operational':
         # Report new incident and escalation
         if incident_id:
-            send_slack_message(service_name, current_status, incident)
-            add_new_service(service_name, current_status, timestamp, incident)
+            queue_alert(service_name, current_status, incident)
+            add_new_service(service_name, current_status, timestamp, incident, writer, existing_status)
             create_incident(service_name, current_status, timestamp, incident)
         else:
             print(f"No incident found for {service_name} with status {current_status}")
 
     elif current_status == 'operational':
-        if incident_id:
+        # Resolved incidents drop out of summary.json, so also check the stored row
+        if incident_id or (existing_status or {}).get('incident_id'):
             # Incident is resolved
-            update_incident_resolution(service_name, current_status, timestamp)
+            update_incident_resolution(service_name, current_status, timestamp, existing_status, writer)
         else:
-            clear_incident(service_name, current_status, timestamp)
+            clear_incident(service_name, current_status, timestamp, writer, existing_status)
+
+def escalation_fields():
+    """
+    Returns the attributes that mark an incident's row open for escalation; its
+    deadlines live in the escalation schedule. Acknowledging or resolving the
+    incident removes them again, so the escalation handler's claim on the row fails.
+    """
+    return {'escalation_state': 'open'}
 
 def create_incident(service_name, current_status, timestamp, incident):
     try:
@@ -322,164 +827,368 @@ def create_incident(service_name, current_status, timestamp, incident):
     except Exception as e:
         print(f"Error generating acknowledgment button: {e}")
 
-def clear_incident(service_name, current_status, timestamp):
+def clear_incident(service_name, current_status, timestamp, writer=None, existing_status=None):
     """
     Clears incident data from the DynamoDB for the service when status returns to operational.
     """
+    writer = writer or get_store()
     try:
         # Update latest entry
-        table.put_item(Item={
+        now = int(time.time())
+        writer.put_item(Item={
             'service_name': service_name,
             'status': current_status,
             'timestamp': 'latest',
-            'incident_id': None
+            'status_since': now
         })
+        writer.put_item(Item=history_item(service_name, current_status, timestamp))
+        record_interval(service_name, existing_status, now)
 
-        print(f"Incident cleared for {service_name}.")
+        metrics.count('IncidentsCleared')
     except Exception as e:
         print(f"Error updating the DynamoDB table: {e}")
 
-def add_new_service(service_name, current_status, timestamp, incident):
+def utc_timestamp(epoch=None):
+    """
+    Returns a sortable UTC timestamp (ISO 8601, second precision) used for every stored time.
+    """
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(epoch))
+
+def history_item(service_name, current_status, timestamp, incident_id=None):
+    """
+    Builds a raw history row. Rows are bucketed by UTC day, sorted by service then
+    time, and expire through the table's purge_at TTL once they have been compacted.
+    """
+    item = {
+        'service_name': f"history#{timestamp[:10]}",
+        'timestamp': f"{service_name}#{timestamp}",
+        'service': service_name,
+        'status': current_status,
+        'purge_at': int(time.time()) + HISTORY_TTL_DAYS * 86400
+    }
+    if incident_id:
+        item['incident_id'] = incident_id
+    return item
+
+def compact_history():
+    """
+    Rolls raw history days older than HISTORY_COMPACT_AFTER_DAYS into one summary
+    row per service and day ('summary#<service>', '<day>'), then deletes the raw rows.
+    """
+    marker = get_store().get_item(COMPACTION_KEY, consistent=True) or {}
+    cutoff = utc_timestamp(time.time() - HISTORY_COMPACT_AFTER_DAYS * 86400)[:10]
+    # Without a marker, start from the oldest day raw rows can still exist
+    day = marker.get('last_day') or utc_timestamp(time.time() - (HISTORY_TTL_DAYS + 1) * 86400)[:10]
+
+    compacted = 0
+    while True:
+        day = (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        if day >= cutoff:
+            break
+        compacted += compact_history_day(day)
+        get_store().put_item(Item=dict(COMPACTION_KEY, last_day=day))
+
+    print(f"Compacted {compacted} history rows up to {cutoff}.")
+    return compacted
+
+def compact_history_day(day):
+    """
+    Summarizes and deletes one day bucket of raw history rows.
+    """
+    rows = get_store().query(f"history#{day}")
+
+    summaries = {}
+    for row in rows:
+        service_name = row['service']
+        summary = summaries.setdefault(service_name, {
+            'service_name': f"summary#{service_name}",
+            'timestamp': day,
+            'changes': 0,
+            'status_counts': {},
+            'incident_ids': set()
+        })
+        summary['changes'] += 1
+        summary['status_counts'][row['status']] = summary['status_counts'].get(row['status'], 0) + 1
+        summary.setdefault('first_status', row['status'])
+        summary['last_status'] = row['status']
+        if row.get('incident_id'):
+            summary['incident_ids'].add(row['incident_id'])
+
+    with get_store().writer() as writer:
+        for summary in summaries.values():
+            if not summary['incident_ids']:
+                del summary['incident_ids']  # DynamoDB rejects empty sets
+            writer.put_item(Item=summary)
+        for row in rows:
+            writer.delete_item(Key={'service_name': row['service_name'], 'timestamp': row['timestamp']})
+
+    return len(rows)
+
+def add_new_service(service_name, current_status, timestamp, incident, writer=None, existing_status=None):
     """
     Adds a new service to DynamoDB.
     """
+    writer = writer or get_store()
     try:
-        if incident:
-            incident_id = incident['id']
-        else:
-            incident_id = None
-
-        table.put_item(Item={
+        now = int(time.time())
+        latest_item = {
             'service_name': service_name,
             'status': current_status,
             'timestamp': 'latest',
-            'incident_id': incident_id
-        })
+            'status_since': now
+        }
+        history = history_item(service_name, current_status, timestamp, incident['id'] if incident else None)
 
-        table.put_item(Item={
-            'service_name': service_name,
-            'status': current_status,
-            'timestamp': timestamp,
-            'incident_id': incident_id
-        })
-        print(f"New service {service_name} added with status {current_status}.")
+        # incident_id is an index key, so it must be omitted rather than stored as NULL
+        if incident:
+            latest_item['incident_id'] = incident['id']
+            if existing_status and existing_status.get('incident_id') == incident['id']:
+                # Same incident with a new status: keep its acknowledgment or escalation deadline
+                for field in ('acknowledged', 'acknowledged_by', 'acknowledged_at', 'escalation_state', 'escalation_tier', 'opened_at'):
+                    if field in existing_status:
+                        latest_item[field] = existing_status[field]
+            elif current_status != 'operational':
+                latest_item.update(escalation_fields(), opened_at=now)
+                writer.put_item(Item=escalations.schedule_item(
+                    {'service_name': service_name, 'timestamp': 'latest'}, incident['id'], service_name, now
+                ))
+                stats.add(pending_stats, service_name, now, incidents=1)
+
+        writer.put_item(Item=latest_item)
+        writer.put_item(Item=history)
+        record_interval(service_name, existing_status, now)
+        metrics.count('ServicesAdded')
 
     except Exception as e:
         print(f"Error adding new service: {e}")
 
-def update_incident_resolution(service_name, current_status, timestamp):
+def update_incident_resolution(service_name, current_status, timestamp, existing_status=None, writer=None):
     """
     Marks an incident as resolved.
     """
+    writer = writer or get_store()
     try:
-        incident_id = table.get_item(Key={'service_name': service_name, 'timestamp': 'latest'}).get('Item').get('incident_id')
+        # Reuse the latest row when the caller already loaded it
+        if existing_status is None:
+            existing_status = get_service_status(service_name) or {}
+        incident_id = existing_status.get('incident_id')
 
         if incident_id:
             # Update latest entry
-            table.put_item(Item={
+            now = int(time.time())
+            writer.put_item(Item={
                 'service_name': service_name,
                 'status': current_status,
                 'timestamp': 'latest',
-                'incident_id': None
+                'status_since': now
             })
+            writer.put_item(Item=history_item(service_name, current_status, timestamp, incident_id))
+            record_interval(service_name, existing_status, now)
+            record_resolution(service_name, existing_status, now)
 
         # Send a resolved notification
-        send_resolution_message(service_name)
+        queue_alert(service_name, current_status)
 
-        print(f"Incident {incident_id} resolved for {service_name}.")
+        metrics.count('IncidentsResolved')
 
     except Exception as e:
         print(f"Error updating incident resolution: {e}")
 
-def send_resolution_message(service_name):
+def record_interval(service_name, existing_status, now):
     """
-    Sends a message to Slack that the service is resolved.
+    Adds the time the service spent in the status of the row being replaced to
+    its daily stats. Rows written before status_since was stored are skipped.
     """
-    try:
-        # Send message to Slack
-        message = {
-            "text": f":white_check_mark: *RESOLVED*: {service_name} is now operational."
+    if existing_status and existing_status.get('status_since'):
+        stats.add_interval(pending_stats, service_name, existing_status['status'], existing_status['status_since'], now)
+
+def record_resolution(service_name, existing_status, now):
+    """
+    Adds a resolved incident's time to resolve, and to acknowledge if it was
+    acknowledged, to the stats of the day it resolved.
+    """
+    opened_at = existing_status.get('opened_at')
+    if not opened_at:
+        return
+
+    counters = {'resolved': 1, 'resolve_seconds': now - int(opened_at)}
+    if existing_status.get('acknowledged_at'):
+        acknowledged_after = stats.parse_timestamp(existing_status['acknowledged_at']) - int(opened_at)
+        counters.update(acknowledged=1, acknowledge_seconds=max(acknowledged_after, 0))
+    stats.add(pending_stats, service_name, now, **counters)
+
+def flush_stats(writer):
+    """
+    Adds the stats recorded during this sync to their daily aggregate rows,
+    through writer so they commit with the status rows. The rows are updated
+    with ADD rather than rewritten, so a second monitor syncing during a lease
+    takeover cannot lose increments.
+    """
+    if not pending_stats:
+        return
+    deltas = dict(pending_stats)
+    pending_stats.clear()
+
+    for (service_name, day), counters in deltas.items():
+        writer.add_counters(stats.key(service_name, day), counters, {'service': service_name})
+    metrics.count('StatsUpdated', len(deltas))
+
+def send_resolution_message(service_name, writer):
+    """
+    Queues a message to Slack that the service is resolved, through the outbox.
+    """
+    body = templates.render('resolved', (service_name, 'operational'), service=service_name)
+    outbox.enqueue(writer, body, 'resolved')
+
+def queue_alert(service_name, current_status, incident=None):
+    """
+    Queues a status alert or resolution for the digest sent by flush_alerts().
+    """
+    alert = {'service_name': service_name, 'status': current_status}
+    if incident:
+        alert['incident'] = {
+            'id': incident.get('id'),
+            'update_id': incident.get('update_id'),
+            'shortlink': incident.get('shortlink', ''),
+            'body': incident.get('body', '')
         }
+    pending_alerts.append(alert)
 
-        encoded_data = json.dumps(message).encode('utf-8')
-        response = http.request(
-            'POST',
-            SLACK_WEBHOOK_URL,
-            body=encoded_data,
-            headers={'Content-type': 'application/json'}
-        )
-        print(f"Slack notification sent: {response.status}")
+def flush_alerts(writer=None):
+    """
+    Writes the alerts queued during this run to the outbox as one Slack message,
+    through writer so they commit with the status rows that raised them.
+    With ALERT_COALESCE_WINDOW set, alerts are held in DynamoDB until the window closes.
+    """
+    if writer is None:
+        with get_store().writer(atomic=True) as writer:
+            return flush_alerts(writer)
 
-    except Exception as e:
-        print(f"Error sending Slack notification: {e}")
+    alerts = pending_alerts[:]
+    pending_alerts.clear()
+
+    if ALERT_COALESCE_WINDOW > 0:
+        alerts = hold_alerts(alerts, writer)
+    if not alerts:
+        return
+
+    if len(alerts) > 1:
+        outbox.enqueue(writer, build_alert_digest(alerts), 'digest')
+    elif alerts[0]['status'] == 'operational':
+        send_resolution_message(alerts[0]['service_name'], writer)
+    else:
+        send_slack_message(alerts[0]['service_name'], alerts[0]['status'], alerts[0]['incident'], writer)
 
-def generate_acknowledgment_button(incident_id):
+def hold_alerts(alerts, writer):
     """
-    Generates an acknowledgment button.
+    Merges alerts into the stored digest. Returns every held alert once the
+    coalescing window has elapsed, otherwise an empty list.
     """
+    now = int(time.time())
     try:
-        # Build the acknowledgment button
-        blocks = [
-            {
-                "type": "actions",
-                "elements": [
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "Acknowledge",
-                            "emoji": True
-                        },
-                        "style": "primary",
-                        "action_id": "acknowledge_incident",
-                        "value": incident_id
-                    }
-                ]
-            }
-        ]
+        stored = get_store().get_item(DIGEST_KEY, consistent=True) or {}
+        held = stored.get('alerts', []) + alerts
+        if not held:
+            return []
+
+        first_queued_at = int(stored.get('first_queued_at', now))
+        if now - first_queued_at >= ALERT_COALESCE_WINDOW:
+            writer.delete_item(Key=DIGEST_KEY)
+            return held
 
-        return blocks
+        if alerts:
+            writer.put_item(Item=dict(DIGEST_KEY, alerts=held, first_queued_at=first_queued_at))
+        return []
     except Exception as e:
-        print(f"Error generating acknowledgment button: {e}")
+        # Never drop alerts because the digest row is unavailable
+        print(f"Error coalescing alerts: {e}")
+        return alerts
 
-def send_slack_message(service_name, current_status, incident):
+def build_alert_digest(alerts):
     """
-    Sends a message to Slack about the GitHub service status.
+    Builds one Block Kit message body listing every alert with its own acknowledge
+    button, headed by the titles of the sources the alerted components belong to.
     """
-    try:
-        print(f"Attempting to send Slack message for {service_name}")  # Debug print
-        message_text = f":red_circle: *{current_status.upper()}*: {service_name} - {incident['shortlink']}\n{incident['body']}"
-        
-        blocks = [
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": message_text
-                }
-            },
-        ]
+    problems = [alert for alert in alerts if alert['status'] != 'operational']
+    resolved = [alert for alert in alerts if alert['status'] == 'operational']
+    titles = sorted({
+        source['title'] for source in
+        (sources.source_for(STATUS_SOURCES, alert['service_name']) for alert in alerts) if source
+    })
+    summary = f"{', '.join(titles) or 'Service'} status: {len(problems)} component(s) affected, {len(resolved)} resolved"
 
-        if incident.get('id'):
-            blocks.extend(generate_acknowledgment_button(incident.get('id')))
+    sections = []
+    for alert in (problems + resolved)[:MAX_DIGEST_SECTIONS]:
+        incident = alert.get('incident') or {}
+        if alert['status'] == 'operational':
+            text = f":white_check_mark: *RESOLVED*: {alert['service_name']} is now operational."
+        else:
+            text = f":red_circle: *{alert['status'].upper()}*: {alert['service_name']} - {incident.get('shortlink', '')}\n{incident.get('body', '')}"
 
-        # Send message to Slack
-        message = {
-            "text": f"{current_status.upper()}: {service_name} - {incident['shortlink']}",
-            "blocks": blocks
-        }
+        if alert['status'] != 'operational' and incident.get('id'):
+            sections.append(templates.fill(
+                'digest_section_ack', text=text[:3000], incident_id=incident['id'],
+                button=acknowledgments.button_value(incident['id'], alert['service_name'])
+            ))
+        else:
+            sections.append(templates.fill('digest_section', text=text[:3000]))
+
+    if len(alerts) > MAX_DIGEST_SECTIONS:
+        sections.append(templates.fill('digest_more', count=len(alerts) - MAX_DIGEST_SECTIONS))
 
-        print(f"Sending to Slack webhook: {message}")  # Debug print
-        encoded_data = json.dumps(message).encode('utf-8')
-        response = http.request(
-            'POST',
-            SLACK_WEBHOOK_URL,
-            body=encoded_data,
-            headers={'Content-type': 'application/json'}
+    return templates.render('digest', summary=summary, sections=','.join(sections))
+
+def send_slack_message(service_name, current_status, incident, writer):
+    """
+    Queues a message to Slack about the GitHub service status, through the outbox.
+    """
+    fields = {
+        'status': current_status.upper(),
+        'service': service_name,
+        'shortlink': incident['shortlink'],
+        'body': incident['body']
+    }
+    if incident.get('id'):
+        # Every field in the body is in the key: one incident can span components and updates
+        body = templates.render(
+            'alert_ack', (incident['id'], incident.get('update_id'), service_name, current_status),
+            button=acknowledgments.button_value(incident['id'], service_name), **fields
         )
-        print(f"Slack response status: {response.status}")  # Debug print
-        print(f"Slack response data: {response.data}")  # Debug print
+    else:
+        body = templates.render('alert', **fields)
+
+    outbox.enqueue(writer, body, 'alert')
 
+def deliver_outbox():
+    """
+    POSTs the outbox rows committed by this invocation, then lets the lease
+    holder drain rows that are due. Delivery never fails the invocation; what
+    is not delivered stays in the outbox.
+    """
+    try:
+        with get_store().writer() as writer:
+            left = outbox.deliver(writer, SLACK_WEBHOOK_URL)
+        if outbox_state['leader']:
+            drain_outbox()
+        if left:
+            outbox_state['pending'] = True
     except Exception as e:
-        print(f"Error sending Slack notification: {str(e)}")  # Detailed error
-        raise  # Re-raise to see in CloudWatch
+        print(f"Error delivering outbox: {e}")
+
+def drain_outbox(now=None):
+    """
+    Delivers up to OUTBOX_BATCH_SIZE due outbox rows, oldest first. Runs after
+    this container left rows behind or filled a batch, and otherwise once per
+    OUTBOX_SWEEP_INTERVAL, which picks up what the escalation and
+    acknowledgment Lambdas could not deliver.
+    """
+    now = int(time.time()) if now is None else now
+    if not outbox_state['pending'] and now - outbox_state['swept_at'] < OUTBOX_SWEEP_INTERVAL:
+        return
+    outbox_state['swept_at'] = now
+
+    rows = get_store().query_before(outbox.PARTITION, outbox.sort_key(now + 1), outbox.OUTBOX_BATCH_SIZE)
+    metrics.count('OutboxDue', len(rows))
+    with get_store().writer() as writer:
+        left = outbox.deliver(writer, SLACK_WEBHOOK_URL, rows)
+    outbox_state['pending'] = left > 0 or len(rows) == outbox.OUTBOX_BATCH_SIZE
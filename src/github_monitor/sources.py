@@ -0,0 +1,81 @@
+import json
+
+# Registry of Statuspage-hosted status sources polled by the monitor.
+#
+# githubstatus.com is always registered as the 'github' source. STATUS_SOURCES
+# adds others as a JSON list, for example:
+#   [{"name": "npm", "url": "https://status.npmjs.org/api/v2/summary.json",
+#     "components": ["registry"], "interval": 300}]
+# - components: names to monitor; empty or missing monitors every component
+# - interval: minimum seconds between fetches (0 fetches on every run)
+# - prefix: prepended to component names and ids so sources cannot collide.
+#   Defaults to "<name>/", and to nothing for 'github' so its stored rows keep their keys.
+# - title: shown in alert digests. Defaults to the name, and to "GitHub" for 'github'.
+
+DEFAULT_SOURCE = 'github'
+
+def load_sources(config, github_url, github_components):
+    """
+    Builds the source registry from the STATUS_SOURCES setting.
+    An entry named 'github' overrides the built-in one.
+    """
+    entries = {DEFAULT_SOURCE: {'name': DEFAULT_SOURCE, 'url': github_url, 'components': github_components}}
+    for entry in json.loads(config) if config else []:
+        entries[entry['name']] = entry
+
+    sources = []
+    for entry in entries.values():
+        name = entry['name']
+        sources.append({
+            'name': name,
+            'url': entry['url'],
+            'components': {component.strip() for component in entry.get('components') or [] if component.strip()},
+            'interval': int(entry.get('interval', 0)),
+            'prefix': entry.get('prefix', '' if name == DEFAULT_SOURCE else f"{name}/"),
+            'title': entry.get('title', 'GitHub' if name == DEFAULT_SOURCE else name)
+        })
+    return sources
+
+def source_for(sources, component_name):
+    """
+    Returns the source a prefixed component name belongs to: the one with the
+    longest matching prefix, so an unprefixed source only takes what is left.
+    """
+    matches = [source for source in sources if component_name.startswith(source['prefix'])]
+    return max(matches, key=lambda source: len(source['prefix']), default=None)
+
+def normalize_summary(source, data):
+    """
+    Converts a source's summary.json into (components, incidents) for the
+    monitoring pipeline. Components outside the source's allowlist are dropped,
+    as are incidents that only affect dropped components.
+    """
+    prefix = source['prefix']
+    allowlist = source['components']
+
+    components = []
+    kept_ids = set()
+    for component in data.get('components') or []:
+        if allowlist and component['name'] not in allowlist:
+            continue
+        kept_ids.add(component.get('id'))
+        components.append({
+            'id': f"{prefix}{component['id']}" if component.get('id') else None,
+            'name': f"{prefix}{component['name']}",
+            'status': component['status'],
+            'source': source['name']
+        })
+
+    incidents = []
+    for incident in data.get('incidents') or []:
+        affected = incident.get('components') or []
+        if allowlist and affected:
+            affected = [component for component in affected if component.get('id') in kept_ids]
+            if not affected:
+                continue
+        incidents.append(dict(incident, components=[
+            {'id': f"{prefix}{component['id']}", 'name': f"{prefix}{component['name']}"}
+            for component in affected
+        ]))
+
+    return components, incidents
@@ -0,0 +1,498 @@
+import json
+import sqlite3
+import time
+from decimal import Decimal
+
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+import acknowledgments
+import metrics
+import outbox
+
+# State store behind the monitor's reads and writes of the status table.
+# DynamoDBStore is used in Lambda; SQLiteStore keeps the same keys, the
+# incident_id-index and the conditional writes in a local file or in memory,
+# for running the monitor outside Lambda and for benchmarking it.
+#
+# put_item(Item=...) and delete_item(Key=...) match a batch writer, so a store
+# can be passed anywhere the monitor accepts a writer. Stores and atomic
+# writers also take add_counters(), an in-place increment of numeric attributes.
+
+# DynamoDB BatchGetItem accepts at most 100 keys per request
+BATCH_GET_LIMIT = 100
+# Unprocessed keys are re-sent after 50ms, 100ms, 200ms... before batch_get gives up
+BATCH_GET_ATTEMPTS = 5
+BATCH_GET_BACKOFF_BASE = 0.05
+
+# DynamoDB TransactWriteItems accepts at most 100 actions
+TRANSACTION_LIMIT = 100
+
+# Every row is keyed on (service_name, timestamp)
+KEY_ATTRIBUTES = ['service_name', 'timestamp']
+
+class ItemExists(Exception):
+    """Raised by an atomic writer whose put_new row already exists; nothing was written."""
+
+class DynamoDBStore:
+    """
+    Status table in DynamoDB. Resources are created on first use; pre-built
+    ones can be passed in, which is how the benchmarks inject stand-ins.
+    """
+
+    def __init__(self, table_name, dynamodb=None, client=None):
+        self.table_name = table_name
+        self.dynamodb = dynamodb
+        self.client = client
+        self.table = None
+
+    def get_table(self):
+        if self.table is None:
+            if self.dynamodb is None:
+                self.dynamodb = boto3.resource('dynamodb')
+                metrics.instrument(self.dynamodb.meta.client)
+            self.table = self.dynamodb.Table(self.table_name)
+        return self.table
+
+    def get_client(self):
+        """Low-level client, needed for typed transactions."""
+        if self.client is None:
+            self.client = metrics.instrument(boto3.client('dynamodb'))
+        return self.client
+
+    def get_item(self, key, consistent=False):
+        return self.get_table().get_item(Key=key, ConsistentRead=consistent).get('Item')
+
+    def batch_get(self, keys, consistent=True):
+        """
+        Returns the items found for keys, in chunks of 100. Unprocessed keys are
+        retried with exponential backoff, raising once BATCH_GET_ATTEMPTS run out.
+        """
+        self.get_table()
+        items = []
+        for start in range(0, len(keys), BATCH_GET_LIMIT):
+            request_items = {self.table_name: {'Keys': keys[start:start + BATCH_GET_LIMIT], 'ConsistentRead': consistent}}
+            for attempt in range(BATCH_GET_ATTEMPTS):
+                if attempt:
+                    time.sleep(BATCH_GET_BACKOFF_BASE * 2 ** (attempt - 1))
+                response = self.dynamodb.batch_get_item(RequestItems=request_items)
+                items.extend(response.get('Responses', {}).get(self.table_name, []))
+                request_items = response.get('UnprocessedKeys')
+                if not request_items:
+                    break
+            else:
+                unprocessed = len(request_items[self.table_name]['Keys'])
+                print(f"BatchGetItem left {unprocessed} keys unprocessed after {BATCH_GET_ATTEMPTS} attempts")
+                raise Exception("Failed to read every key with BatchGetItem.")
+        return items
+
+    def put_item(self, Item):
+        self.get_table().put_item(Item=Item)
+
+    def put_new(self, item):
+        """Writes item only if its key does not exist yet. Returns False if it did."""
+        try:
+            self.get_table().put_item(Item=item, ConditionExpression='attribute_not_exists(service_name)')
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def put_lease(self, item, now):
+        """
+        Writes a lease row if it is unheld, already held by item['holder'], or
+        expired at now. Returns False if another holder still has it.
+        """
+        try:
+            self.get_table().put_item(
+                Item=item,
+                ConditionExpression='attribute_not_exists(holder) OR holder = :me OR expires_at < :now',
+                ExpressionAttributeValues={':me': item['holder'], ':now': now}
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def delete_item(self, Key):
+        self.get_table().delete_item(Key=Key)
+
+    def add_counters(self, key, counters, fields=None):
+        """Adds counters to numeric attributes of a row, creating it if needed, and sets fields."""
+        self.get_table().update_item(**counter_update(key, counters, fields))
+
+    def query(self, partition, prefix=None):
+        """Returns every item in a partition, optionally limited to a sort key prefix."""
+        condition = Key('service_name').eq(partition)
+        if prefix:
+            condition = condition & Key('timestamp').begins_with(prefix)
+        return self._query_pages({'KeyConditionExpression': condition})
+
+    def query_before(self, partition, before, limit):
+        """Returns up to limit items in a partition whose sort key is below before, in key order."""
+        response = self.get_table().query(
+            KeyConditionExpression=Key('service_name').eq(partition) & Key('timestamp').lt(before),
+            Limit=limit
+        )
+        return response.get('Items', [])
+
+    def query_incident(self, incident_id):
+        """Returns the keys of rows carrying incident_id, through incident_id-index."""
+        return self._query_pages({
+            'IndexName': 'incident_id-index',
+            'KeyConditionExpression': Key('incident_id').eq(incident_id)
+        })
+
+    def _query_pages(self, query_args):
+        items = []
+        while True:
+            response = self.get_table().query(**query_args)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return items
+            query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def writer(self, atomic=False):
+        """
+        Batch writer; flushes 25 items per request and when the with block exits.
+        An atomic writer commits everything in one transaction instead (see DynamoDBTransactionWriter).
+        """
+        if atomic:
+            return DynamoDBTransactionWriter(self)
+        return self.get_table().batch_writer(overwrite_by_pkeys=KEY_ATTRIBUTES)
+
+    def acknowledge(self, incident, user, user_name, message=None):
+        """
+        Records the first acknowledgment of an incident's status row, with an
+        optional outbox row in the same transaction. Returns False if it was
+        already acknowledged.
+        """
+        return acknowledgments.record_acknowledgment(
+            self.get_client(), self.table_name, incident, user, user_name, outbox.typed(message) if message else None
+        )
+
+class DynamoDBTransactionWriter:
+    """
+    Buffers puts and deletes, last write per key winning, and commits them with
+    TransactWriteItems when the with block exits, so they apply together or not
+    at all; nothing is written if the block raises. A put_new row is only
+    written if its key is new, otherwise the commit raises ItemExists.
+    add_counters() rows become ADD updates, which DynamoDB applies to the
+    stored item, so a row takes counters or puts, not both. Past 100
+    actions the commit is split, with put_new rows and then outbox rows in the
+    first transaction: a split commit can repeat a message on the next sync but
+    never store a change without it.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.buffer = {}
+        self.new_keys = set()
+        self.counters = {}
+
+    def put_item(self, Item):
+        self.buffer[(Item['service_name'], Item['timestamp'])] = Item
+
+    def put_new(self, item):
+        self.put_item(item)
+        self.new_keys.add((item['service_name'], item['timestamp']))
+
+    def delete_item(self, Key):
+        self.buffer[(Key['service_name'], Key['timestamp'])] = None
+
+    def add_counters(self, key, counters, fields=None):
+        add_pending_counters(self.counters, key, counters, fields)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type or not (self.buffer or self.counters):
+            return
+        table_name = self.store.table_name
+        actions = []
+        # sorted() is stable, so everything else keeps the order it was written in
+        for key, item in sorted(self.buffer.items(), key=lambda entry: (entry[0] not in self.new_keys, entry[0][0] != outbox.PARTITION)):
+            if item is None:
+                actions.append({'Delete': {'TableName': table_name, 'Key': {'service_name': key[0], 'timestamp': key[1]}}})
+            elif key in self.new_keys:
+                actions.append({'Put': {'TableName': table_name, 'Item': item, 'ConditionExpression': 'attribute_not_exists(service_name)'}})
+            else:
+                actions.append({'Put': {'TableName': table_name, 'Item': item}})
+        for (service_name, timestamp), (counters, fields) in self.counters.items():
+            key = {'service_name': service_name, 'timestamp': timestamp}
+            actions.append({'Update': dict(counter_update(key, counters, fields), TableName=table_name)})
+
+        # The resource's client takes plain Python values, like the table does
+        client = self.store.get_table().meta.client
+        for start in range(0, len(actions), TRANSACTION_LIMIT):
+            try:
+                client.transact_write_items(TransactItems=actions[start:start + TRANSACTION_LIMIT])
+            except ClientError as e:
+                reasons = [reason.get('Code') for reason in e.response.get('CancellationReasons', [])]
+                if e.response['Error']['Code'] == 'TransactionCanceledException' and 'ConditionalCheckFailed' in reasons:
+                    raise ItemExists(f"Transaction cancelled by an existing item: {reasons}")
+                raise
+        self.buffer = {}
+        self.new_keys = set()
+        self.counters = {}
+
+class SQLiteStore:
+    """
+    Status table in SQLite, ':memory:' by default. Items are stored as JSON,
+    with numbers read back as Decimal like the DynamoDB resource returns them.
+    """
+
+    def __init__(self, path=':memory:'):
+        # Autocommit; conditional and batched writes open their own transactions
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                service_name TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                incident_id TEXT,
+                item TEXT NOT NULL,
+                PRIMARY KEY (service_name, timestamp)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS items_incident_id ON items (incident_id) WHERE incident_id IS NOT NULL;
+            CREATE TABLE IF NOT EXISTS acknowledgments (
+                incident_id TEXT PRIMARY KEY,
+                item TEXT NOT NULL
+            );
+        """)
+
+    def get_item(self, key, consistent=False):
+        row = self.db.execute(
+            'SELECT item FROM items WHERE service_name = ? AND timestamp = ?',
+            (key['service_name'], key['timestamp'])
+        ).fetchone()
+        return decode(row[0]) if row else None
+
+    def batch_get(self, keys, consistent=True):
+        items = []
+        for key in keys:
+            item = self.get_item(key)
+            if item:
+                items.append(item)
+        return items
+
+    def put_item(self, Item):
+        self._write(Item)
+
+    def put_new(self, item):
+        cursor = self.db.execute(
+            'INSERT INTO items VALUES (?, ?, ?, ?) ON CONFLICT DO NOTHING',
+            (item['service_name'], item['timestamp'], item.get('incident_id'), encode(item))
+        )
+        return cursor.rowcount == 1
+
+    def put_lease(self, item, now):
+        with self.transaction():
+            lease = self.get_item(item)
+            if lease and 'holder' in lease and lease['holder'] != item['holder'] and not lease.get('expires_at', 0) < now:
+                return False
+            self._write(item)
+            return True
+
+    def delete_item(self, Key):
+        self.db.execute('DELETE FROM items WHERE service_name = ? AND timestamp = ?', (Key['service_name'], Key['timestamp']))
+
+    def add_counters(self, key, counters, fields=None):
+        with self.transaction():
+            self._add_counters(key, counters, fields)
+
+    def _add_counters(self, key, counters, fields):
+        item = self.get_item(key) or dict(key)
+        for name, value in counters.items():
+            item[name] = item.get(name, 0) + value
+        item.update(fields or {})
+        self._write(item)
+
+    def query(self, partition, prefix=None):
+        # A sort key range matches begins_with, since both compare UTF-8 bytes
+        prefix = prefix or ''
+        rows = self.db.execute(
+            'SELECT item FROM items WHERE service_name = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp',
+            (partition, prefix, prefix + '\U0010ffff')
+        )
+        return [decode(row[0]) for row in rows]
+
+    def query_before(self, partition, before, limit):
+        rows = self.db.execute(
+            'SELECT item FROM items WHERE service_name = ? AND timestamp < ? ORDER BY timestamp LIMIT ?',
+            (partition, before, limit)
+        )
+        return [decode(row[0]) for row in rows]
+
+    def query_incident(self, incident_id):
+        rows = self.db.execute(
+            'SELECT service_name, timestamp, incident_id FROM items WHERE incident_id = ?',
+            (incident_id,)
+        )
+        return [{'service_name': row[0], 'timestamp': row[1], 'incident_id': row[2]} for row in rows]
+
+    def writer(self, atomic=False):
+        # Always atomic: the writer applies its buffer in one transaction
+        return SQLiteWriter(self)
+
+    def acknowledge(self, incident, user, user_name, message=None):
+        acknowledged_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        with self.transaction():
+            item = self.get_item(incident)
+            row = self.db.execute(
+                'SELECT item FROM acknowledgments WHERE incident_id = ?', (incident['incident_id'],)
+            ).fetchone()
+            # Like the DynamoDB item: the first acknowledgment plus every service acknowledged since
+            ack = decode(row[0]) if row else {
+                'incident_id': incident['incident_id'],
+                'acknowledged_by': user,
+                'user_name': user_name,
+                'acknowledged_at': acknowledged_at,
+                'service_name': incident['service_name']
+            }
+            if (not item or item.get('incident_id') != incident['incident_id'] or 'acknowledged_by' in item
+                    or incident['service_name'] in ack.get('acknowledged_services', ())):
+                print(f"Incident {incident['incident_id']} already acknowledged for {incident['service_name']}")
+                return False
+
+            item.update(acknowledged=True, acknowledged_by=user, acknowledged_at=acknowledged_at)
+            item.pop('escalation_state', None)
+            self._write(item)
+            ack.setdefault('acknowledged_services', set()).add(incident['service_name'])
+            self.db.execute('INSERT OR REPLACE INTO acknowledgments VALUES (?, ?)', (incident['incident_id'], encode(ack)))
+            if message:
+                self._write(message)
+            return True
+
+    def transaction(self):
+        return SQLiteTransaction(self.db)
+
+    def _write(self, item):
+        self.db.execute(
+            'INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?)',
+            (item['service_name'], item['timestamp'], item.get('incident_id'), encode(item))
+        )
+
+class SQLiteTransaction:
+    """Holds the database write lock for a read-check-write sequence."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+class SQLiteWriter:
+    """
+    Buffers puts and deletes and applies them in one transaction, last write per
+    key winning. Like DynamoDBTransactionWriter, raises ItemExists without
+    writing anything if a put_new row already exists.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.buffer = {}
+        self.new_keys = set()
+        self.counters = {}
+
+    def put_item(self, Item):
+        self.buffer[(Item['service_name'], Item['timestamp'])] = Item
+
+    def put_new(self, item):
+        self.put_item(item)
+        self.new_keys.add((item['service_name'], item['timestamp']))
+
+    def delete_item(self, Key):
+        self.buffer[(Key['service_name'], Key['timestamp'])] = None
+
+    def add_counters(self, key, counters, fields=None):
+        add_pending_counters(self.counters, key, counters, fields)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type or not (self.buffer or self.counters):
+            return
+        with self.store.transaction():
+            for service_name, timestamp in self.new_keys:
+                if self.store.get_item({'service_name': service_name, 'timestamp': timestamp}):
+                    raise ItemExists(f"Item {service_name}/{timestamp} already exists")
+            for (service_name, timestamp), item in self.buffer.items():
+                if item is None:
+                    self.store.delete_item({'service_name': service_name, 'timestamp': timestamp})
+                else:
+                    self.store._write(item)
+            for (service_name, timestamp), (counters, fields) in self.counters.items():
+                self.store._add_counters({'service_name': service_name, 'timestamp': timestamp}, counters, fields)
+        self.buffer = {}
+        self.new_keys = set()
+        self.counters = {}
+
+def add_pending_counters(pending, key, counters, fields):
+    """Merges an add_counters() call into a writer's pending increments."""
+    totals, pending_fields = pending.setdefault((key['service_name'], key['timestamp']), ({}, {}))
+    for name, value in counters.items():
+        totals[name] = totals.get(name, 0) + value
+    pending_fields.update(fields or {})
+
+def counter_update(key, counters, fields=None):
+    """Returns the UpdateItem arguments that ADD counters to a row and SET fields."""
+    names = {}
+    values = {}
+    additions = []
+    for index, (name, value) in enumerate(sorted(counters.items())):
+        names[f"#c{index}"] = name
+        values[f":c{index}"] = value
+        additions.append(f"#c{index} :c{index}")
+    expression = 'ADD ' + ', '.join(additions)
+
+    assignments = []
+    for index, (name, value) in enumerate(sorted((fields or {}).items())):
+        names[f"#f{index}"] = name
+        values[f":f{index}"] = value
+        assignments.append(f"#f{index} = :f{index}")
+    if assignments:
+        expression = 'SET ' + ', '.join(assignments) + ' ' + expression
+
+    return {
+        'Key': key,
+        'UpdateExpression': expression,
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values
+    }
+
+def encode(item):
+    return json.dumps(item, default=encode_value, separators=(',', ':'))
+
+def encode_value(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': sorted(value)}
+    raise TypeError(f"Cannot store {type(value).__name__} values")
+
+def decode(text):
+    return json.loads(
+        text,
+        parse_int=Decimal,
+        parse_float=Decimal,
+        object_hook=lambda value: set(value['__set__']) if '__set__' in value else value
+    )
+
+def open_store(backend, table_name, path=':memory:'):
+    """
+    Returns the store for a STATE_BACKEND setting: 'dynamodb' or 'sqlite'.
+    """
+    if backend == 'dynamodb':
+        return DynamoDBStore(table_name)
+    if backend == 'sqlite':
+        return SQLiteStore(path)
+    raise ValueError(f"Unknown state backend: {backend}")
@@ -0,0 +1,203 @@
+import codecs
+import json
+import re
+
+# Incremental parser for Statuspage summary.json.
+#
+# The response body is read chunk by chunk. Only the components array and the
+# incidents array are decoded, one element at a time, and only the watched
+# components and the incidents affecting them are kept, reduced to the fields
+# the monitor reads. Every other value (page, status, scheduled_maintenances)
+# is skipped by scanning its brackets and strings without building objects.
+
+DECODER = json.JSONDecoder()
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# A complete string, a string cut off by the end of the buffer, or a bracket
+TOKEN = re.compile(r'(?P<string>"[^"\\]*(?:\\.[^"\\]*)*")|(?P<partial>"[^"\\]*(?:\\.[^"\\]*)*\\?\Z)|[\[\]{}]', re.DOTALL)
+
+COMPONENT_FIELDS = ('id', 'name', 'status')
+INCIDENT_FIELDS = ('id', 'name', 'status', 'shortlink')
+UPDATE_FIELDS = ('id', 'status', 'body', 'created_at')
+
+def parse_summary(chunks, allowlist=()):
+    """
+    Parses summary.json from an iterable of byte chunks. Returns a summary dict
+    holding only 'components' and 'incidents', limited to components named in
+    allowlist and incidents affecting them, plus the sorted 'allowlist' it was
+    pruned to. An empty allowlist keeps every component.
+    """
+    reader = ChunkReader(chunks)
+    components = []
+    incidents = []
+
+    summary = {'components': components, 'incidents': incidents, 'allowlist': sorted(allowlist)}
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return summary
+
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'components':
+            for component in reader.array():
+                if not isinstance(component, dict):
+                    raise ValueError("Unexpected component in summary")
+                if not allowlist or component.get('name') in allowlist:
+                    components.append({field: component.get(field) for field in COMPONENT_FIELDS})
+        elif key == 'incidents':
+            for incident in reader.array():
+                if not isinstance(incident, dict):
+                    raise ValueError("Unexpected incident in summary")
+                compact = compact_incident(incident, allowlist)
+                if compact:
+                    incidents.append(compact)
+        else:
+            reader.skip()
+
+        if reader.next_of(',}') == '}':
+            break
+
+    reader.end()
+    return summary
+
+def compact_incident(incident, allowlist):
+    """
+    Reduces an incident to the fields the monitor reads, or None if it only
+    affects components outside the allowlist.
+    """
+    affected = [
+        {'id': component.get('id'), 'name': component.get('name')}
+        for component in incident.get('components') or []
+    ]
+    if allowlist and affected:
+        affected = [component for component in affected if component['name'] in allowlist]
+        if not affected:
+            return None
+
+    compact = {field: incident.get(field) for field in INCIDENT_FIELDS}
+    compact['components'] = affected
+    compact['incident_updates'] = [
+        {field: update.get(field) for field in UPDATE_FIELDS}
+        for update in incident.get('incident_updates') or []
+    ]
+    return compact
+
+class ChunkReader:
+    """
+    Decodes UTF-8 chunks into a sliding text buffer and reads JSON values from it.
+    Consumed text is dropped whenever more input is read.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Appends the next chunk, dropping consumed text. Returns False at end of input."""
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.decoder.decode(b'', final=True)
+        else:
+            text = self.decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of summary")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at summary offset {self.pos}")
+        self.pos += 1
+
+    def next_of(self, chars):
+        """Consumes and returns the next character, which must be one of chars."""
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at summary offset {self.pos}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decodes the next complete value, reading more input until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.pos)
+                # A number touching the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof or not isinstance(value, (int, float)):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            # Read at least as much again as the partial value, so retries stay linear in its size
+            pending = len(self.buffer) - self.pos
+            while len(self.buffer) - self.pos < 2 * pending and self.fill():
+                pass
+
+    def array(self):
+        """Yields the elements of the next array one at a time."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.next_of(',]') == ']':
+                return
+
+    def skip(self):
+        """Skips the next value without building it."""
+        if self.peek() in '[{':
+            self.pos = self.container_end()
+        else:
+            self.value()
+
+    def container_end(self):
+        """
+        Reads until the array or object at self.pos is complete and returns its end
+        offset. Only brackets and strings are matched, so no objects are built, and
+        scanned text is dropped as more input is read.
+        """
+        depth = 0
+        scan = self.pos
+        while True:
+            match = TOKEN.search(self.buffer, scan)
+            if match is None or match.group('partial') is not None:
+                # Resume from the cut-off string (or the buffer end) once more input arrives
+                self.pos = match.start() if match else len(self.buffer)
+                if not self.fill():
+                    raise ValueError("Unexpected end of summary")
+                scan = self.pos
+                continue
+
+            scan = match.end()
+            if match.group('string') is None:
+                depth += 1 if match.group() in '[{' else -1
+                if depth == 0:
+                    return scan
+
+    def end(self):
+        """Checks that nothing but whitespace follows the summary."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                raise ValueError(f"Unexpected data after summary at offset {self.pos}")
+            if not self.fill():
+                return
@@ -0,0 +1,94 @@
+import json
+import os
+import time
+
+# Shared by the github_monitor and acknowledgment Lambdas; packaged into each zip.
+
+ACK_TABLE = os.environ.get('ACK_TABLE', 'github-incident-acknowledgments')
+
+def button_value(incident_id, service_name, timestamp='latest'):
+    """
+    Encodes the status row key of an incident into an Acknowledge button value,
+    so the ack path can address the row directly instead of querying an index.
+    """
+    return json.dumps(
+        {'incident_id': incident_id, 'service_name': service_name, 'timestamp': timestamp},
+        separators=(',', ':')
+    )
+
+def parse_button_value(value):
+    """
+    Decodes a button value. Buttons sent before keys were embedded carry only
+    the incident id; those come back without service_name/timestamp.
+    """
+    try:
+        incident = json.loads(value)
+        if isinstance(incident, dict) and incident.get('incident_id'):
+            return incident
+    except (TypeError, ValueError):
+        pass
+    return {'incident_id': value}
+
+def record_acknowledgment(client, status_table, incident, user, user_name, message=None):
+    """
+    Marks the incident's status row acknowledged and stores the acknowledgment
+    in one transaction. The first acknowledgment of each status row wins, so
+    every component of a multi-component incident can be acknowledged; returns
+    False if the row was already acknowledged or no longer holds this incident.
+    The acknowledgments item keeps the incident's first acknowledgment and the
+    set of services acknowledged since. Takes a low-level DynamoDB client. message is an optional outbox row, in
+    typed attribute values, written to the status table in the same transaction.
+    """
+    acknowledged_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+    try:
+        transact_items = [
+            {
+                'Update': {
+                    'TableName': status_table,
+                    'Key': {
+                        'service_name': {'S': incident['service_name']},
+                        'timestamp': {'S': incident['timestamp']}
+                    },
+                    'UpdateExpression': 'SET acknowledged = :ack, acknowledged_by = :user, acknowledged_at = :time '
+                                        'REMOVE escalation_state',
+                    'ConditionExpression': 'incident_id = :incident_id AND attribute_not_exists(acknowledged_by)',
+                    'ExpressionAttributeValues': {
+                        ':ack': {'BOOL': True},
+                        ':user': {'S': user},
+                        ':time': {'S': acknowledged_at},
+                        ':incident_id': {'S': incident['incident_id']}
+                    }
+                }
+            },
+            {
+                'Update': {
+                    'TableName': ACK_TABLE,
+                    'Key': {'incident_id': {'S': incident['incident_id']}},
+                    'UpdateExpression': 'SET acknowledged_by = if_not_exists(acknowledged_by, :user), '
+                                        'user_name = if_not_exists(user_name, :user_name), '
+                                        'acknowledged_at = if_not_exists(acknowledged_at, :time), '
+                                        'service_name = if_not_exists(service_name, :service) '
+                                        'ADD acknowledged_services :services',
+                    'ConditionExpression': 'NOT contains(acknowledged_services, :service)',
+                    'ExpressionAttributeValues': {
+                        ':user': {'S': user},
+                        ':user_name': {'S': user_name},
+                        ':time': {'S': acknowledged_at},
+                        ':service': {'S': incident['service_name']},
+                        ':services': {'SS': [incident['service_name']]}
+                    }
+                }
+            }
+        ]
+        if message:
+            transact_items.append({'Put': {'TableName': status_table, 'Item': message}})
+
+        client.transact_write_items(TransactItems=transact_items)
+        return True
+    except client.exceptions.TransactionCanceledException as e:
+        reasons = [reason.get('Code') for reason in e.response.get('CancellationReasons', [])]
+        if 'ConditionalCheckFailed' in reasons:
+            print(f"Incident {incident['incident_id']} already acknowledged for {incident['service_name']}: {reasons}")
+            return False
+        raise
@@ -0,0 +1,61 @@
+import os
+import time
+
+# Shared by the github_monitor and escalation Lambdas; packaged into each zip.
+#
+# Escalation schedule. When an incident opens on a status row, the monitor
+# writes one schedule row for its first tier into the minute bucket of the
+# tier's due time:
+#   service_name = "escalation#<YYYY-MM-DDTHH:MM>", timestamp = "<incident_id>#<tier>#<row service_name>"
+# The escalation handler queries only the buckets that have come due since its
+# last tick. It claims each tier on the status row, so a tier fires once per
+# row, sends one message per incident and tier, and schedules the next tier.
+# Schedule rows avoid the incident_id attribute so they stay out of incident_id-index.
+
+ESCALATION_TIMEOUT = int(os.environ.get('ESCALATION_TIMEOUT', '15'))
+ESCALATION_CONTACT = os.environ.get('ESCALATION_CONTACT', '')
+# Minutes after the incident opened, each optionally with its own contact: "15,45=@lead,120=@director"
+ESCALATION_TIERS = os.environ.get('ESCALATION_TIERS', '')
+SCHEDULE_TTL_DAYS = 7  # Unprocessed schedule rows expire through the table's purge_at TTL
+
+BUCKET_PREFIX = 'escalation#'
+
+def load_tiers(config, timeout, contact):
+    """
+    Parses ESCALATION_TIERS into a list of {'minutes', 'contact'} sorted by minutes.
+    Without tiers, a single tier fires after ESCALATION_TIMEOUT minutes.
+    """
+    entries = [entry.strip() for entry in config.split(',') if entry.strip()] or [str(timeout)]
+    tiers = []
+    for entry in entries:
+        minutes, _, tier_contact = entry.partition('=')
+        tiers.append({'minutes': int(minutes), 'contact': tier_contact.strip() or contact})
+    return sorted(tiers, key=lambda tier: tier['minutes'])
+
+TIERS = load_tiers(ESCALATION_TIERS, ESCALATION_TIMEOUT, ESCALATION_CONTACT)
+
+def bucket(epoch):
+    """Returns the schedule partition for the UTC minute holding epoch."""
+    return BUCKET_PREFIX + time.strftime('%Y-%m-%dT%H:%M', time.gmtime(epoch))
+
+def due_at(opened_at, tier):
+    """Returns the epoch at which a tier (1-based) of an incident opened at opened_at fires."""
+    return int(opened_at) + TIERS[tier - 1]['minutes'] * 60
+
+def schedule_item(row_key, incident_id, service_name, opened_at, tier=1):
+    """
+    Builds the schedule row for one tier of an incident whose status row is row_key.
+    """
+    due = due_at(opened_at, tier)
+    return {
+        'service_name': bucket(due),
+        'timestamp': f"{incident_id}#{tier}#{row_key['service_name']}",
+        'escalation_incident': incident_id,
+        'service': service_name,
+        'row_service_name': row_key['service_name'],
+        'row_timestamp': row_key['timestamp'],
+        'tier': tier,
+        'opened_at': int(opened_at),
+        'due_at': due,
+        'purge_at': due + SCHEDULE_TTL_DAYS * 86400
+    }
@@ -0,0 +1,177 @@
+import html
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+from botocore.exceptions import ClientError, ParamValidationError
+import metrics
+
+# Shared by the github_monitor and escalation Lambdas; packaged into each zip.
+#
+# Liveness is published off the critical path: beat() starts a background write
+# at most once per HEARTBEAT_INTERVAL per container, and flush() waits for it
+# before the handler returns. Freshness for every function and region is held
+# in one JSON document (HEARTBEAT_STATE_FILE):
+#   {"functions": {"<function>": {"<region>": {"last_seen": ..., "last_seen_epoch": ..., "interval": ...}}}}
+# It is updated with conditional PUTs (If-Match on the last ETag this container
+# wrote), so concurrent writers merge instead of overwriting each other, and
+# it is only read on a cold start or after losing a race. The public status
+# page (HEARTBEAT_FILE) is rendered from the document on each publish.
+
+HEARTBEAT_BUCKET = os.environ.get('HEARTBEAT_BUCKET')  # Unset disables the heartbeat
+HEARTBEAT_FILE = os.environ.get('HEARTBEAT_FILE', 'lambda-heartbeat.html')
+HEARTBEAT_STATE_FILE = os.environ.get('HEARTBEAT_STATE_FILE', 'heartbeat.json')
+HEARTBEAT_INTERVAL = int(os.environ.get('HEARTBEAT_INTERVAL', '300'))  # Seconds between publishes
+FUNCTION_NAME = os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local')
+REGION = os.environ.get('AWS_REGION', os.environ.get('AWS_DEFAULT_REGION', 'local'))
+MAX_ATTEMPTS = 3
+STALE_AFTER_INTERVALS = 2  # A function is shown as stale after missing this many windows
+
+# Errors S3 returns when a conditional PUT loses to another writer
+CONFLICT_CODES = ('PreconditionFailed', 'ConditionalRequestConflict')
+
+clients = {}
+state = {'published_at': 0, 'document': None, 'etag': None, 'conditional': True}
+executor = None
+pending = []
+
+def get_s3():
+    """Returns the cached S3 client."""
+    if 's3' not in clients:
+        clients['s3'] = metrics.instrument(boto3.client('s3'))
+    return clients['s3']
+
+def beat(now=None):
+    """
+    Starts publishing this function's liveness in the background if the last
+    publish from this container is older than HEARTBEAT_INTERVAL.
+    Call flush() before the handler returns.
+    """
+    global executor
+    if not HEARTBEAT_BUCKET:
+        return None
+
+    now = time.time() if now is None else now
+    if now - state['published_at'] < HEARTBEAT_INTERVAL:
+        return None
+    state['published_at'] = now
+
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(publish, now)
+    pending.append(future)
+    return future
+
+def flush():
+    """
+    Waits for a heartbeat started by beat(). A failed publish is logged and
+    retried by the next invocation; liveness never fails the handler.
+    """
+    while pending:
+        future = pending.pop(0)
+        try:
+            future.result()
+        except Exception as e:
+            print(f"Error publishing heartbeat: {e}")
+            state['published_at'] = 0
+
+def publish(now):
+    """
+    Records this function's freshness in the JSON document and re-renders the status page.
+    """
+    with metrics.timer('Heartbeat'):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if state['document'] is None:
+                load_document()
+
+            document = with_entry(state['document'], now)
+            try:
+                state['etag'] = put_document(document)
+                state['document'] = document
+                break
+            except ClientError as e:
+                if e.response['Error']['Code'] not in CONFLICT_CODES or attempt == MAX_ATTEMPTS:
+                    raise
+                # Another function or region published first; merge into its version
+                state['document'] = None
+
+        get_s3().put_object(
+            Bucket=HEARTBEAT_BUCKET,
+            Key=HEARTBEAT_FILE,
+            Body=render_page(document, now).encode('utf-8'),
+            ContentType='text/html',
+            CacheControl='max-age=60'
+        )
+    metrics.count('HeartbeatsPublished')
+
+def load_document():
+    """Reads the freshness document and its ETag, starting an empty one if it does not exist."""
+    try:
+        response = get_s3().get_object(Bucket=HEARTBEAT_BUCKET, Key=HEARTBEAT_STATE_FILE)
+        state['document'] = json.loads(response['Body'].read())
+        state['etag'] = response.get('ETag')
+    except ClientError as e:
+        if e.response['Error']['Code'] not in ('NoSuchKey', '404'):
+            raise
+        state['document'] = {'functions': {}}
+        state['etag'] = None
+
+def put_document(document):
+    """
+    Writes the freshness document only if it is unchanged since it was read
+    (or still absent). Returns the new ETag.
+    """
+    conditions = {}
+    if state['conditional']:
+        conditions = {'IfMatch': state['etag']} if state['etag'] else {'IfNoneMatch': '*'}
+
+    try:
+        response = get_s3().put_object(
+            Bucket=HEARTBEAT_BUCKET,
+            Key=HEARTBEAT_STATE_FILE,
+            Body=json.dumps(document, sort_keys=True).encode('utf-8'),
+            ContentType='application/json',
+            CacheControl='max-age=60',
+            **conditions
+        )
+    except ParamValidationError:
+        if not conditions:
+            raise
+        # Older botocore releases lack S3's conditional PUT parameters. The last
+        # writer then wins, and overwritten entries return on their next publish.
+        state['conditional'] = False
+        return put_document(document)
+    return response.get('ETag')
+
+def with_entry(document, now):
+    """Returns a copy of the document with this function's entry for this region refreshed."""
+    functions = {name: dict(regions) for name, regions in document.get('functions', {}).items()}
+    functions.setdefault(FUNCTION_NAME, {})[REGION] = {
+        'last_seen': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now)),
+        'last_seen_epoch': int(now),
+        'interval': HEARTBEAT_INTERVAL
+    }
+    return dict(document, functions=functions, updated_at=int(now))
+
+def render_page(document, now):
+    """Renders the status page listing each function's freshness per region."""
+    rows = []
+    for name, regions in sorted(document.get('functions', {}).items()):
+        for region, entry in sorted(regions.items()):
+            age = int(now - entry.get('last_seen_epoch', 0))
+            stale = age > entry.get('interval', HEARTBEAT_INTERVAL) * STALE_AFTER_INTERVALS
+            rows.append(
+                f"<tr><td>{html.escape(name)}</td><td>{html.escape(region)}</td>"
+                f"<td>{html.escape(entry.get('last_seen', ''))}</td><td>{age}s</td>"
+                f"<td>{'STALE' if stale else 'OK'}</td></tr>"
+            )
+
+    generated = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(now))
+    return (
+        "<html><head><title>GitHub Status Monitor heartbeat</title></head><body>"
+        f"<h1>Lambda heartbeat</h1><p>Last updated {generated}</p>"
+        "<table><tr><th>Function</th><th>Region</th><th>Last seen</th><th>Age</th><th>State</th></tr>"
+        + ''.join(rows) +
+        "</table></body></html>"
+    )
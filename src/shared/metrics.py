@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Shared by the github_monitor, escalation and acknowledgment Lambdas; packaged into each zip.
+#
+# Collects per-invocation stage timings and counters and prints them as one
+# CloudWatch Embedded Metric Format (EMF) line, which CloudWatch Logs turns into
+# metrics in NAMESPACE with a Function dimension. Timings are in milliseconds
+# and may overlap (DynamoDB time is also part of the stage that made the calls).
+
+NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'GitHubStatusMonitor')
+FUNCTION_NAME = os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local')
+
+# Also published without the Function dimension, so one alarm covers every Lambda emitting them
+ROLLUP_METRICS = ('OutboxDeadLettered',)
+
+# Metric name prefix for instrumented AWS clients
+SERVICE_METRICS = {'dynamodb': 'DynamoDB', 's3': 'S3', 'lambda': 'Lambda'}
+
+timings = {}
+counts = {}
+lock = threading.Lock()  # Slack deliveries record from worker threads
+
+@contextmanager
+def timer(stage):
+    """
+    Adds the time spent in the with block to the stage's timing.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(stage, (time.perf_counter() - start) * 1000)
+
+def add_time(stage, milliseconds):
+    with lock:
+        timings[stage] = timings.get(stage, 0) + milliseconds
+
+def count(name, value=1):
+    with lock:
+        counts[name] = counts.get(name, 0) + value
+
+def instrument(client):
+    """
+    Times and counts every call made through a boto3 client, including its
+    retries and request/response bytes, using botocore's event hooks.
+    Returns the client.
+    """
+    service = client.meta.service_model.service_name
+    prefix = SERVICE_METRICS.get(service, service)
+
+    def before_call(context, **kwargs):
+        context['metrics_started'] = time.perf_counter()
+
+    def before_send(request, **kwargs):
+        # Sent once per attempt, so retried requests count their bytes again.
+        # aws-chunked uploads (S3 with checksums) only declare their decoded length.
+        length = request.headers.get('X-Amz-Decoded-Content-Length') or request.headers.get('Content-Length')
+        count(f"{prefix}BytesOut", int(length) if length else body_length(request.body))
+
+    def after_call(http_response, parsed, model, context, **kwargs):
+        add_time(prefix, (time.perf_counter() - context.get('metrics_started', time.perf_counter())) * 1000)
+        count(f"{prefix}Calls")
+        count(f"{prefix}Retries", parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0))
+        length = http_response.headers.get('content-length')
+        if length is None and not model.has_streaming_output:
+            # Reading content would consume streaming bodies such as S3 GetObject
+            length = len(http_response.content)
+        count(f"{prefix}BytesIn", int(length or 0))
+
+    client.meta.events.register(f"before-call.{service}", before_call)
+    client.meta.events.register(f"before-send.{service}", before_send)
+    client.meta.events.register(f"after-call.{service}", after_call)
+    return client
+
+def body_length(body):
+    """
+    Returns the size of a request body, measuring seekable file-like bodies
+    (such as S3 uploads) without moving their position.
+    """
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    try:
+        position = body.tell()
+        size = body.seek(0, os.SEEK_END)
+        body.seek(position)
+        return size - position
+    except Exception:
+        return 0
+
+def emit(function_name=FUNCTION_NAME):
+    """
+    Prints the collected metrics as one EMF line and starts a new invocation.
+    """
+    with lock:
+        values = {f"{stage}Time": round(milliseconds, 2) for stage, milliseconds in timings.items()}
+        values.update(counts)
+        timings.clear()
+        counts.clear()
+
+    if not values:
+        return
+
+    directives = [{
+        'Namespace': NAMESPACE,
+        'Dimensions': [['Function']],
+        'Metrics': [{'Name': name, 'Unit': metric_unit(name)} for name in values]
+    }]
+    rollups = [name for name in ROLLUP_METRICS if name in values]
+    if rollups:
+        directives.append({
+            'Namespace': NAMESPACE,
+            'Dimensions': [[]],
+            'Metrics': [{'Name': name, 'Unit': metric_unit(name)} for name in rollups]
+        })
+
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': directives
+        },
+        'Function': function_name,
+        **values
+    }, separators=(',', ':')))
+
+def metric_unit(name):
+    if name.endswith('Time'):
+        return 'Milliseconds'
+    if 'Bytes' in name:
+        return 'Bytes'
+    return 'Count'
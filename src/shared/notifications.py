@@ -0,0 +1,91 @@
+import json
+import os
+import time
+import urllib3
+import metrics
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by the github_monitor, escalation and acknowledgment Lambdas; packaged into each zip.
+
+MAX_WORKERS = int(os.environ.get('SLACK_MAX_WORKERS', '4'))
+MAX_ATTEMPTS = int(os.environ.get('SLACK_MAX_ATTEMPTS', '3'))
+MAX_RETRY_AFTER = 10  # Never sleep longer than this inside a Lambda
+
+# One keep-alive pool for every outbound Slack POST in this container
+http = urllib3.PoolManager(maxsize=MAX_WORKERS, timeout=urllib3.Timeout(connect=2.0, read=5.0))
+
+executor = None
+pending = []
+
+def get_executor():
+    """Returns the worker pool shared by every Slack POST in this container."""
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    return executor
+
+def send(url, message):
+    """
+    Queues a Slack message for delivery and starts sending it in the background.
+    Call flush() before the handler returns.
+    """
+    body = message if isinstance(message, bytes) else json.dumps(message).encode('utf-8')
+    future = get_executor().submit(post_message, url, body)
+    pending.append(future)
+    return future
+
+def post(url, body):
+    """
+    POSTs a JSON body once and returns the response, whatever its status.
+    """
+    # Per-request time; requests overlap across workers, so this can exceed the flush wait
+    with metrics.timer('SlackRequest'):
+        response = http.request(
+            'POST',
+            url,
+            body=body,
+            headers={'Content-type': 'application/json'}
+        )
+    metrics.count('SlackRequests')
+    metrics.count('SlackBytesOut', len(body))
+    return response
+
+def post_message(url, body):
+    """
+    POSTs a JSON body, honoring Slack's 429 Retry-After.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        response = post(url, body)
+        if response.status != 429 or attempt == MAX_ATTEMPTS:
+            break
+
+        retry_after = float(response.headers.get('Retry-After', '1'))
+        print(f"Slack rate limited, retrying in {retry_after}s")
+        metrics.count('SlackRetries')
+        time.sleep(min(retry_after, MAX_RETRY_AFTER))
+
+    if response.status >= 400:
+        raise Exception(f"Slack returned HTTP {response.status}: {response.data[:200]}")
+    return response
+
+def flush():
+    """
+    Waits for every queued message. Returns (sent, failed) counts.
+    """
+    if not pending:
+        return 0, 0
+
+    sent = failed = 0
+    with metrics.timer('Slack'):
+        while pending:
+            future = pending.pop(0)
+            try:
+                future.result()
+                sent += 1
+            except Exception as e:
+                print(f"Error sending Slack notification: {e}")
+                failed += 1
+
+    metrics.count('SlackSent', sent)
+    metrics.count('SlackFailed', failed)
+    return sent, failed
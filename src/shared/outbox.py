@@ -0,0 +1,191 @@
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, wait
+from boto3.dynamodb.types import TypeSerializer
+import metrics
+import notifications
+
+# Shared by the github_monitor, escalation and acknowledgment Lambdas; packaged into each zip.
+#
+# Transactional outbox for webhook messages. A message is not POSTed where it
+# is raised; it is written as an outbox row in the same write as the state
+# change behind it (the monitor's sync, an escalation claim, an
+# acknowledgment), so a change is never stored without its message:
+#   service_name = "__outbox__", timestamp = "<next attempt epoch, 10 digits>#<message id>"
+# After committing, the writer delivers its own rows (deliver()). A fresh row is
+# only due OUTBOX_HANDOFF seconds later, so nothing else sends it meanwhile. A
+# row that was not delivered is retried with exponential backoff by the
+# monitor's drainer (drain_outbox in github_monitor/main.py), which the monitor
+# lease keeps to one region. Rows Slack rejects, or that run out of attempts,
+# move to "__outbox_dead__" and expire through purge_at.
+
+OUTBOX_HANDOFF = int(os.environ.get('OUTBOX_HANDOFF', '60'))  # Seconds the writer has to deliver a fresh row
+OUTBOX_MAX_IN_FLIGHT = int(os.environ.get('OUTBOX_MAX_IN_FLIGHT', str(notifications.MAX_WORKERS)))
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '25'))  # Due rows drained per run
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '12'))  # About 3.5 hours of retries
+DELIVERY_BUDGET = 10  # Seconds after which deliver() starts no more requests
+BACKOFF_BASE = 30
+BACKOFF_MAX = 30 * 60
+DEAD_LETTER_TTL_DAYS = 14
+
+PARTITION = '__outbox__'
+DEAD_LETTER_PARTITION = '__outbox_dead__'
+
+# Rows committed by this invocation, delivered by deliver()
+queued = []
+
+serializer = TypeSerializer()
+
+def sort_key(due, message_id=''):
+    """Returns the outbox sort key of a row first due at epoch due."""
+    return f"{int(due):010d}#{message_id}"
+
+def message_item(body, kind, now=None):
+    """
+    Builds the outbox row for a rendered message body (bytes or str).
+    kind names the message type (alert, digest, escalation...) for logs and metrics.
+    """
+    now = int(time.time()) if now is None else int(now)
+    message_id = uuid.uuid4().hex
+    return {
+        'service_name': PARTITION,
+        'timestamp': sort_key(now + OUTBOX_HANDOFF, message_id),
+        'message_id': message_id,
+        'kind': kind,
+        'body': body.decode('utf-8') if isinstance(body, bytes) else body,
+        'attempts': 0,
+        'created_at': now
+    }
+
+def enqueue(writer, body, kind, now=None):
+    """
+    Writes a message to the outbox through writer, normally the one holding the
+    state change it reports, and queues it for deliver().
+    """
+    item = message_item(body, kind, now)
+    writer.put_item(Item=item)
+    track(item)
+    return item
+
+def track(item):
+    """Queues an outbox row that the caller committed itself for deliver()."""
+    queued.append(item)
+
+def discard():
+    """Forgets queued rows, e.g. when the write holding them failed. Committed rows are drained later."""
+    queued.clear()
+
+def row_key(item):
+    return {'service_name': item['service_name'], 'timestamp': item['timestamp']}
+
+def backoff(attempts):
+    """Returns the delay in seconds before retry number attempts (1-based)."""
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+def deliver(writer, url, items=None, budget=DELIVERY_BUDGET):
+    """
+    POSTs outbox rows to url, oldest first, with at most OUTBOX_MAX_IN_FLIGHT
+    requests in flight, and records each outcome through writer: delivered rows
+    are deleted, failed ones rescheduled or dead-lettered. Without items, the
+    rows queued by this invocation are delivered. No new request starts once
+    Slack throttles or the budget is spent; rows not attempted keep their due
+    time. Returns the number of rows left in the outbox.
+    """
+    if items is None:
+        items = queued[:]
+        queued.clear()
+    if not items:
+        return 0
+
+    started = time.monotonic()
+    remaining = list(items)
+    in_flight = {}
+    throttled = False
+    left = 0
+
+    with metrics.timer('Outbox'):
+        while remaining or in_flight:
+            # Keep the window full until Slack pushes back or the budget runs out
+            while (remaining and not throttled and len(in_flight) < OUTBOX_MAX_IN_FLIGHT
+                   and time.monotonic() - started < budget):
+                item = remaining.pop(0)
+                body = item['body'].encode('utf-8')
+                in_flight[notifications.get_executor().submit(notifications.post, url, body)] = item
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = in_flight.pop(future)
+                outcome = settle(writer, item, future)
+                if outcome in ('retry', 'throttled'):
+                    left += 1
+                if outcome == 'throttled':
+                    # Back off as a whole; the rows not started yet wait for the drainer
+                    throttled = True
+
+    left += len(remaining)
+    metrics.count('OutboxDeferred', len(remaining))
+    return left
+
+def settle(writer, item, future):
+    """
+    Records the outcome of one POST. Returns 'delivered', 'retry', 'throttled' or 'dead'.
+    """
+    response = None
+    try:
+        response = future.result()
+        error = None if response.status < 400 else f"HTTP {response.status}: {response.data[:200]}"
+    except Exception as e:
+        error = str(e)
+
+    if error is None:
+        writer.delete_item(Key=row_key(item))
+        metrics.count('OutboxDelivered')
+        return 'delivered'
+
+    now = int(time.time())
+    attempts = int(item.get('attempts', 0)) + 1
+    status = response.status if response is not None else None
+    print(f"Error delivering {item.get('kind')} message {item['message_id']} (attempt {attempts}): {error}")
+
+    # Other 4xx answers (bad payload, revoked webhook) will not succeed on a retry
+    if (status is not None and 400 <= status < 500 and status != 429) or attempts >= OUTBOX_MAX_ATTEMPTS:
+        writer.put_item(Item=dict(
+            item, service_name=DEAD_LETTER_PARTITION, attempts=attempts, last_error=error,
+            purge_at=now + DEAD_LETTER_TTL_DAYS * 86400
+        ))
+        writer.delete_item(Key=row_key(item))
+        metrics.count('OutboxDeadLettered')
+        return 'dead'
+
+    delay = backoff(attempts)
+    if status == 429:
+        delay = max(delay, int(float(response.headers.get('Retry-After', '1'))))
+    writer.put_item(Item=dict(
+        item, timestamp=sort_key(now + delay, item['message_id']), attempts=attempts, last_error=error
+    ))
+    writer.delete_item(Key=row_key(item))
+    metrics.count('OutboxRetried')
+    return 'throttled' if status == 429 else 'retry'
+
+class ClientWriter:
+    """
+    put_item/delete_item on a low-level DynamoDB client, for Lambdas that do
+    not load the resource layer.
+    """
+
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+
+    def put_item(self, Item):
+        self.client.put_item(TableName=self.table_name, Item=typed(Item))
+
+    def delete_item(self, Key):
+        self.client.delete_item(TableName=self.table_name, Key=typed(Key))
+
+def typed(item):
+    """Converts an item to DynamoDB's typed attribute values."""
+    return {name: serializer.serialize(value) for name, value in item.items()}
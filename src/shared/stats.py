@@ -0,0 +1,111 @@
+import calendar
+import time
+
+# Shared by the github_monitor and acknowledgment Lambdas; packaged into each zip.
+#
+# Daily per-service aggregates behind the /stats API:
+#   service_name = "stats#<service>", timestamp = "<YYYY-MM-DD>" (UTC)
+# Each holds the seconds the service spent in each non-operational status that
+# day ("seconds_<status>"), the incidents opened, and for incidents resolved
+# that day how many were acknowledged and the summed times to acknowledge and
+# to resolve. Every attribute is a top-level number, so the monitor adds to it
+# with an ADD update in the same transaction as the status change that closes
+# an interval or an incident; concurrent writers never lose an increment. A
+# dashboard reads one item per day instead of scanning the table. The interval
+# still open is read from the status row.
+
+PREFIX = 'stats#'
+COUNTERS = ('incidents', 'resolved', 'resolve_seconds', 'acknowledged', 'acknowledge_seconds')
+# Statuses counted against uptime; degraded_performance and maintenance are reported but not down
+OUTAGE_STATUSES = ('partial_outage', 'major_outage')
+DAY = 86400
+STATUS_SECONDS_PREFIX = 'seconds_'
+
+def key(service_name, day):
+    return {'service_name': PREFIX + service_name, 'timestamp': day}
+
+def day_of(epoch):
+    return time.strftime('%Y-%m-%d', time.gmtime(epoch))
+
+def day_start(day):
+    return calendar.timegm(time.strptime(day, '%Y-%m-%d'))
+
+def parse_timestamp(timestamp):
+    """Returns the epoch of a stored '%Y-%m-%dT%H:%M:%SZ' timestamp."""
+    return calendar.timegm(time.strptime(timestamp, '%Y-%m-%dT%H:%M:%SZ'))
+
+def split_by_day(start, end):
+    """Yields (day, seconds) for each UTC day the interval [start, end) covers."""
+    while start < end:
+        boundary = start - start % DAY + DAY
+        yield day_of(start), min(end, boundary) - start
+        start = boundary
+
+def add(deltas, service_name, epoch, **counters):
+    """Adds counters to the delta for the service and the day holding epoch."""
+    delta = deltas.setdefault((service_name, day_of(epoch)), {})
+    for counter, value in counters.items():
+        delta[counter] = delta.get(counter, 0) + value
+
+def add_interval(deltas, service_name, status, start, end):
+    """Adds the time spent in a status to each day it covers. Operational time is not stored."""
+    if status == 'operational':
+        return
+    for day, seconds in split_by_day(int(start), int(end)):
+        delta = deltas.setdefault((service_name, day), {})
+        attribute = STATUS_SECONDS_PREFIX + status
+        delta[attribute] = delta.get(attribute, 0) + seconds
+
+def status_seconds(item):
+    """Returns {status: seconds} from an aggregate item."""
+    return {
+        name[len(STATUS_SECONDS_PREFIX):]: int(value)
+        for name, value in item.items() if name.startswith(STATUS_SECONDS_PREFIX)
+    }
+
+def minutes(seconds):
+    return round(seconds / 60, 1)
+
+def summarize(service_name, items, start, end, latest=None):
+    """
+    Combines the daily items of the period [start, end) into uptime, MTTA and
+    MTTR. latest is the service's status row; if it is non-operational, the
+    time since its status began, which no aggregate holds yet, is included.
+    """
+    total_seconds = {}
+    totals = dict.fromkeys(COUNTERS, 0)
+    daily = []
+    for item in sorted(items, key=lambda item: item['timestamp']):
+        day_seconds = status_seconds(item)
+        for status, seconds in day_seconds.items():
+            total_seconds[status] = total_seconds.get(status, 0) + seconds
+        for counter in COUNTERS:
+            totals[counter] += int(item.get(counter, 0))
+        daily.append({
+            'day': item['timestamp'],
+            'minutes_by_status': {status: minutes(seconds) for status, seconds in day_seconds.items()},
+            'incidents': int(item.get('incidents', 0))
+        })
+
+    current_status = latest.get('status') if latest else None
+    if current_status and latest.get('status_since'):
+        open_from = max(int(latest['status_since']), start)
+        if current_status != 'operational' and open_from < end:
+            total_seconds[current_status] = total_seconds.get(current_status, 0) + end - open_from
+
+    period = max(end - start, 1)
+    outage = min(sum(total_seconds.get(status, 0) for status in OUTAGE_STATUSES), period)
+    return {
+        'service': service_name,
+        'from': day_of(start),
+        'to': day_of(end - 1),
+        'current_status': current_status,
+        'uptime_percent': round(100 * (1 - outage / period), 3),
+        'minutes_by_status': {status: minutes(seconds) for status, seconds in sorted(total_seconds.items())},
+        'incidents': totals['incidents'],
+        'resolved': totals['resolved'],
+        'acknowledged': totals['acknowledged'],
+        'mtta_minutes': minutes(totals['acknowledge_seconds'] / totals['acknowledged']) if totals['acknowledged'] else None,
+        'mttr_minutes': minutes(totals['resolve_seconds'] / totals['resolved']) if totals['resolved'] else None,
+        'daily': daily
+    }
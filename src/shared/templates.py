@@ -0,0 +1,134 @@
+import json
+import re
+from collections import OrderedDict
+from json.encoder import encode_basestring_ascii
+
+# Shared by the github_monitor, escalation and acknowledgment Lambdas; packaged into each zip.
+#
+# Precompiled Slack payloads. Each message kind is a Block Kit skeleton that is
+# serialized once at import. Inside a string, {{field}} marks text to fill in
+# (JSON-escaped); a whole string "{{!field}}" marks a slot for JSON that is
+# already rendered, such as a run of blocks. Rendering only joins the literal
+# fragments with the escaped values and returns bytes for notifications.send().
+# Bodies rendered with a cache key are kept, so a retried or duplicate alert
+# for the same incident update, component and status is not rendered again.
+# A cache key must determine every field of the body.
+
+MAX_CACHED = 256
+
+PLACEHOLDER = re.compile(r'"\{\{!(\w+)\}\}"|\{\{(\w+)\}\}')
+
+ACKNOWLEDGE_BUTTON = {
+    "type": "button",
+    "text": {"type": "plain_text", "text": "Acknowledge", "emoji": True},
+    "style": "primary",
+    "action_id": "acknowledge_incident",
+    "value": "{{button}}"
+}
+
+ALERT_SECTION = {
+    "type": "section",
+    "text": {"type": "mrkdwn", "text": ":red_circle: *{{status}}*: {{service}} - {{shortlink}}\n{{body}}"}
+}
+
+DIGEST_SECTION = {"type": "section", "text": {"type": "mrkdwn", "text": "{{text}}"}}
+
+SKELETONS = {
+    # Single status alert, with an Acknowledge button when the incident has an id
+    'alert': {
+        "text": "{{status}}: {{service}} - {{shortlink}}",
+        "blocks": [ALERT_SECTION]
+    },
+    'alert_ack': {
+        "text": "{{status}}: {{service}} - {{shortlink}}",
+        "blocks": [ALERT_SECTION, {"type": "actions", "elements": [ACKNOWLEDGE_BUTTON]}]
+    },
+    'resolved': {
+        "text": ":white_check_mark: *RESOLVED*: {{service}} is now operational."
+    },
+    # Incident record sent by send_incident_to_slack (including test incidents)
+    'incident': {
+        "text": "{{prefix}} {{service}} is experiencing an issue!",
+        "attachments": [{
+            "text": "{{description}}",
+            "fallback": "Acknowledge Incident",
+            "callback_id": "incident_acknowledgment",
+            "color": "{{color}}",
+            "actions": [{"name": "acknowledge", "text": "Acknowledge", "type": "button", "value": "{{button}}"}]
+        }]
+    },
+    # Digest of several alerts; sections are rendered with the digest_* kinds below
+    'digest': {
+        "text": "{{summary}}",
+        "blocks": [{"type": "header", "text": {"type": "plain_text", "text": "{{summary}}"}}, "{{!sections}}"]
+    },
+    'digest_section': DIGEST_SECTION,
+    'digest_section_ack': dict(DIGEST_SECTION, accessory=dict(
+        ACKNOWLEDGE_BUTTON, action_id="acknowledge_incident_{{incident_id}}"
+    )),
+    'digest_more': {
+        "type": "context",
+        "elements": [{"type": "mrkdwn", "text": "...and {{count}} more"}]
+    },
+    'escalation': {
+        "text": ":rotating_light: *ESCALATION (tier {{tier}})*: Incident {{incident_id}} for {{services}} "
+                "has not been acknowledged after {{minutes}} minutes. Escalating to {{contact}}."
+    },
+    'acknowledgment': {
+        "text": ":eyes: {{user}} is handling incident {{incident_id}}."
+    }
+}
+
+def compile_template(skeleton):
+    """
+    Serializes a skeleton and splits it into literal text alternating with
+    (field, raw) slots.
+    """
+    text = json.dumps(skeleton, separators=(',', ':'))
+    fragments = []
+    position = 0
+    for match in PLACEHOLDER.finditer(text):
+        fragments.append(text[position:match.start()])
+        fragments.append((match.group(1), True) if match.group(1) else (match.group(2), False))
+        position = match.end()
+    fragments.append(text[position:])
+    return fragments
+
+TEMPLATES = {kind: compile_template(skeleton) for kind, skeleton in SKELETONS.items()}
+
+rendered = OrderedDict()
+
+def fill(kind, **fields):
+    """
+    Renders a message kind to JSON text. String fields are escaped; raw fields
+    are inserted as given.
+    """
+    parts = []
+    for fragment in TEMPLATES[kind]:
+        if isinstance(fragment, str):
+            parts.append(fragment)
+            continue
+        name, raw = fragment
+        value = fields[name]
+        parts.append(value if raw else encode_basestring_ascii(str(value))[1:-1])
+    return ''.join(parts)
+
+def render(kind, cache_key=None, **fields):
+    """
+    Renders a message kind to a UTF-8 JSON body. With a cache_key, such as
+    (incident id, update id, service, status), the body is reused by later
+    renders of the same kind and key, so the key must cover every field.
+    """
+    if cache_key is None:
+        return fill(kind, **fields).encode('utf-8')
+
+    key = (kind, cache_key)
+    body = rendered.get(key)
+    if body is None:
+        body = fill(kind, **fields).encode('utf-8')
+        rendered[key] = body
+        if len(rendered) > MAX_CACHED:
+            rendered.popitem(last=False)
+    else:
+        rendered.move_to_end(key)
+    return body
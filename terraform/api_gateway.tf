@@ -128,6 +128,35 @@ resource "aws_api_gateway_integration" "acknowledgment_handler_get_integration"
   uri                     = aws_lambda_function.acknowledgment_handler.invoke_arn
 }
 
+# Read-only stats for dashboards, served by the acknowledgment handler from daily aggregates
+resource "aws_api_gateway_resource" "stats" {
+  rest_api_id = aws_api_gateway_rest_api.lambda.id
+  parent_id   = aws_api_gateway_rest_api.lambda.root_resource_id
+  path_part   = "stats"
+}
+
+resource "aws_api_gateway_method" "stats_get" {
+  rest_api_id   = aws_api_gateway_rest_api.lambda.id
+  resource_id   = aws_api_gateway_resource.stats.id
+  http_method   = "GET"
+  authorization = "NONE"
+
+  request_parameters = {
+    "method.request.querystring.service" = true
+    "method.request.querystring.from"    = false
+    "method.request.querystring.to"      = false
+  }
+}
+
+resource "aws_api_gateway_integration" "stats_get_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.lambda.id
+  resource_id             = aws_api_gateway_resource.stats.id
+  http_method             = aws_api_gateway_method.stats_get.http_method
+  integration_http_method = "POST"  # Lambda requires POST
+  type                    = "AWS_PROXY"
+  uri                     = aws_lambda_function.acknowledgment_handler.invoke_arn
+}
+
 resource "aws_api_gateway_deployment" "prod" {
   rest_api_id = aws_api_gateway_rest_api.lambda.id
   
@@ -135,6 +164,7 @@ resource "aws_api_gateway_deployment" "prod" {
     aws_api_gateway_integration.acknowledgment_handler_integration,
     aws_api_gateway_integration.acknowledgment_handler_integration_secondary,
     aws_api_gateway_integration.acknowledgment_handler_get_integration,
+    aws_api_gateway_integration.stats_get_integration,
     aws_api_gateway_integration_response.primary_integration_response,
     aws_api_gateway_integration_response.secondary_integration_response,
     aws_api_gateway_method_response.response_200
@@ -23,6 +23,30 @@ resource "aws_lambda_permission" "allow_cloudwatch_to_call_github_monitor" {
   source_arn    = aws_cloudwatch_event_rule.github_monitor_schedule.arn
 }
 
+# Daily rollup of raw status history into per-day summaries - Primary Region
+resource "aws_cloudwatch_event_rule" "history_compaction_schedule" {
+  name                = "github-status-history-compaction"
+  description         = "Compacts GitHub status history older than a day"
+  schedule_expression = "cron(15 0 * * ? *)"
+  
+  tags = local.common_tags
+}
+
+resource "aws_cloudwatch_event_target" "history_compaction_target" {
+  rule      = aws_cloudwatch_event_rule.history_compaction_schedule.name
+  target_id = "github-monitor-compaction"
+  arn       = aws_lambda_function.github_monitor.arn
+  input     = jsonencode({ action = "compact_history" })
+}
+
+resource "aws_lambda_permission" "allow_cloudwatch_to_compact_history" {
+  statement_id  = "AllowHistoryCompactionFromCloudWatch"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.github_monitor.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.history_compaction_schedule.arn
+}
+
 # CloudWatch Event Rule for GitHub Status Monitoring - Secondary Region
 resource "aws_cloudwatch_event_rule" "github_monitor_schedule_secondary" {
   provider          = aws.secondary
@@ -55,7 +79,8 @@ resource "aws_lambda_permission" "allow_cloudwatch_to_call_github_monitor_second
 resource "aws_cloudwatch_event_rule" "escalation_check_schedule" {
   name                = "github-escalation-check-schedule"
   description         = "Triggers the Escalation Handler Lambda function"
-  schedule_expression = "rate(5 minutes)"
+  # Each tick only reads the minute buckets that came due since the last one
+  schedule_expression = "rate(1 minute)"
   
   tags = local.common_tags
 }
@@ -94,3 +119,57 @@ resource "aws_cloudwatch_metric_alarm" "github_monitor_errors" {
   
   tags = local.common_tags
 }
+
+# CloudWatch Alarm for slow status fetches, from the monitor's embedded metrics (EMF) log lines
+resource "aws_cloudwatch_metric_alarm" "github_monitor_fetch_time" {
+  alarm_name          = "github-monitor-fetch-time"
+  comparison_operator = "GreaterThanThreshold"
+  evaluation_periods  = "3"
+  metric_name         = "FetchTime"
+  namespace           = "GitHubStatusMonitor"
+  period              = "300"
+  statistic           = "Average"
+  threshold           = "5000"
+  treat_missing_data  = "notBreaching"
+  alarm_description   = "Average status page fetch time above 5 seconds"
+  
+  dimensions = {
+    Function = aws_lambda_function.github_monitor.function_name
+  }
+  
+  tags = local.common_tags
+}
+
+# CloudWatch Alarm for Slack messages the outbox gave up on (rejected by Slack or out of attempts).
+# Every Lambda that delivers the outbox also publishes this count without the Function dimension.
+resource "aws_cloudwatch_metric_alarm" "github_monitor_outbox_dead_letters" {
+  alarm_name          = "github-monitor-outbox-dead-letters"
+  comparison_operator = "GreaterThanThreshold"
+  evaluation_periods  = "1"
+  metric_name         = "OutboxDeadLettered"
+  namespace           = "GitHubStatusMonitor"
+  period              = "300"
+  statistic           = "Sum"
+  threshold           = "0"
+  treat_missing_data  = "notBreaching"
+  alarm_description   = "Slack notifications moved to the outbox dead-letter partition by any Lambda"
+  
+  tags = local.common_tags
+}
+
+# The secondary-region monitor (while it holds the lease) and acknowledgment handler also deliver the outbox
+resource "aws_cloudwatch_metric_alarm" "github_monitor_outbox_dead_letters_secondary" {
+  provider            = aws.secondary
+  alarm_name          = "github-monitor-outbox-dead-letters"
+  comparison_operator = "GreaterThanThreshold"
+  evaluation_periods  = "1"
+  metric_name         = "OutboxDeadLettered"
+  namespace           = "GitHubStatusMonitor"
+  period              = "300"
+  statistic           = "Sum"
+  threshold           = "0"
+  treat_missing_data  = "notBreaching"
+  alarm_description   = "Slack notifications moved to the outbox dead-letter partition in the secondary region"
+  
+  tags = local.common_tags
+}
@@ -20,22 +20,18 @@ resource "aws_dynamodb_table" "github_status_monitor" {
     type = "S"
   }
 
+  # Only used to resolve legacy id-only Acknowledge buttons to a row key
   global_secondary_index {
     name               = "incident_id-index"
-    hash_key          = "incident_id"
-    projection_type    = "ALL"
+    hash_key           = "incident_id"
+    projection_type    = "KEYS_ONLY"
   }
 
-  global_secondary_index {
-    name               = "service_name-index"
-    hash_key           = "service_name"
-    projection_type    = "ALL"
-  }
-
-  global_secondary_index {
-    name               = "timestamp-index"
-    hash_key           = "timestamp"
-    projection_type    = "ALL"
+  # Raw history rows (service_name = "history#<day>") and incident timelines ("incident#<id>")
+  # expire after var.history_ttl_days
+  ttl {
+    attribute_name = "purge_at"
+    enabled        = true
   }
 
   server_side_encryption {
@@ -45,10 +41,6 @@ resource "aws_dynamodb_table" "github_status_monitor" {
   point_in_time_recovery {
     enabled = true
   }
-
-  lifecycle {
-    ignore_changes = [ttl]
-  }
 }
 
 # DynamoDB Table for incident acknowledgments
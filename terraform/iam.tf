@@ -28,7 +28,9 @@ resource "aws_iam_policy" "lambda_dynamodb_policy" {
         {
           "Action" : [
             "dynamodb:GetItem",
+            "dynamodb:BatchGetItem",
             "dynamodb:PutItem",
+            "dynamodb:BatchWriteItem",
             "dynamodb:UpdateItem",
             "dynamodb:DeleteItem",
             "dynamodb:Query",
@@ -38,6 +40,7 @@ resource "aws_iam_policy" "lambda_dynamodb_policy" {
           "Resource" : [
             "${aws_dynamodb_table.github_status_monitor.arn}",
             "${aws_dynamodb_table.github_status_monitor.arn}/index/*",
+            "${aws_dynamodb_table.incident_acknowledgments.arn}",
             "arn:aws:dynamodb:us-east-1:701355440535:table/github_monitor_data_store/index/incident_id-index"
           ]
         }
@@ -69,6 +72,22 @@ resource "aws_iam_policy" "lambda_s3_policy" {
   })
 }
 
+# IAM policy for the acknowledgment handler to invoke itself asynchronously
+resource "aws_iam_policy" "lambda_self_invoke_policy" {
+  name        = "github-monitor-lambda-self-invoke-policy"
+  description = "Policy for the acknowledgment handler to defer persistence to an async invocation"
+  policy      = jsonencode({
+    Version   = "2012-10-17"
+    Statement = [
+      {
+        Action   = ["lambda:InvokeFunction"]
+        Effect   = "Allow"
+        Resource = "arn:aws:lambda:*:*:function:github-acknowledgment-handler*"
+      }
+    ]
+  })
+}
+
 # IAM policy for Lambda to write logs
 resource "aws_iam_policy" "lambda_logging_policy" {
   name        = "github-monitor-lambda-logging-policy"
@@ -100,6 +119,11 @@ resource "aws_iam_role_policy_attachment" "lambda_s3_attach" {
   policy_arn = aws_iam_policy.lambda_s3_policy.arn
 }
 
+resource "aws_iam_role_policy_attachment" "lambda_self_invoke_attach" {
+  role       = aws_iam_role.lambda_execution_role.name
+  policy_arn = aws_iam_policy.lambda_self_invoke_policy.arn
+}
+
 resource "aws_iam_role_policy_attachment" "lambda_logging_attach" {
   role       = aws_iam_role.lambda_execution_role.name
   policy_arn = aws_iam_policy.lambda_logging_policy.arn
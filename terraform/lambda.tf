@@ -3,18 +3,29 @@ locals {
     DYNAMODB_TABLE      = aws_dynamodb_table.github_status_monitor.id
     SLACK_WEBHOOK_URL   = var.slack_webhook_url
     SLACK_API_TOKEN     = var.slack_api_token
-    GITHUB_SERVICES     = jsonencode(var.github_services)
+    GITHUB_SERVICES     = join(",", var.github_services)
     MONITORING_INTERVAL = var.monitoring_interval
     ESCALATION_TIMEOUT  = var.escalation_timeout
     ESCALATION_CONTACT  = var.escalation_contact
-    HEARTBEAT_BUCKET    = var.heartbeat_bucket_name
-    HEARTBEAT_FILE      = "heartbeat.html"
+    ESCALATION_TIERS    = var.escalation_tiers
+    HEARTBEAT_BUCKET    = aws_s3_bucket.heartbeat.id
+    HEARTBEAT_FILE      = aws_s3_object.heartbeat_file.key
+    HEARTBEAT_INTERVAL  = var.heartbeat_interval
+    SERVICE_NAME        = var.service_name
+    ALERT_COALESCE_WINDOW = var.alert_coalesce_window
+    HISTORY_TTL_DAYS      = var.history_ttl_days
+    STATUS_SOURCES        = jsonencode(var.status_sources)
+    HYSTERESIS_POLLS      = var.hysteresis_polls
+    HYSTERESIS_DWELL      = var.hysteresis_dwell
+    MONITOR_ROLE        = "secondary"
   }
 
   lambda_environment_vars_acknowledgment_handler = {
     DYNAMODB_TABLE    = aws_dynamodb_table.github_status_monitor.id
     SLACK_WEBHOOK_URL = var.slack_webhook_url
     SLACK_API_TOKEN   = var.slack_api_token
+    ACK_MODE          = "async"
+    ACK_TABLE         = aws_dynamodb_table.incident_acknowledgments.name
   }
 
   lambda_environment_vars_escalation_handler = {
@@ -22,26 +33,65 @@ locals {
     SLACK_WEBHOOK_URL   = var.slack_webhook_url
     ESCALATION_TIMEOUT  = var.escalation_timeout
     ESCALATION_CONTACT  = var.escalation_contact
+    ESCALATION_TIERS    = var.escalation_tiers
+    HEARTBEAT_BUCKET    = aws_s3_bucket.heartbeat.id
+    HEARTBEAT_FILE      = aws_s3_object.heartbeat_file.key
+    HEARTBEAT_INTERVAL  = var.heartbeat_interval
   }
 }
 
 # Archive source code for Lambda functions
+# Each package holds the function's own directory plus the modules in src/shared
+locals {
+  shared_lambda_sources = { for f in fileset("../src/shared", "*.py") : f => "../src/shared/${f}" }
+}
+
 data "archive_file" "github_monitor_zip" {
   type        = "zip"
-  source_dir  = "../src/github_monitor"
   output_path = "./lambda_packages/github_monitor.zip"
+
+  dynamic "source" {
+    for_each = merge(
+      { for f in fileset("../src/github_monitor", "*") : f => "../src/github_monitor/${f}" },
+      local.shared_lambda_sources
+    )
+    content {
+      content  = file(source.value)
+      filename = source.key
+    }
+  }
 }
 
 data "archive_file" "acknowledgment_handler_zip" {
   type        = "zip"
-  source_dir  = "../src/acknowledgment_handler"
   output_path = "./lambda_packages/acknowledgment_handler.zip"
+
+  dynamic "source" {
+    for_each = merge(
+      { for f in fileset("../src/acknowledgment_handler", "*") : f => "../src/acknowledgment_handler/${f}" },
+      local.shared_lambda_sources
+    )
+    content {
+      content  = file(source.value)
+      filename = source.key
+    }
+  }
 }
 
 data "archive_file" "escalation_handler_zip" {
   type        = "zip"
-  source_dir  = "../src/escalation_handler"
   output_path = "./lambda_packages/escalation_handler.zip"
+
+  dynamic "source" {
+    for_each = merge(
+      { for f in fileset("../src/escalation_handler", "*") : f => "../src/escalation_handler/${f}" },
+      local.shared_lambda_sources
+    )
+    content {
+      content  = file(source.value)
+      filename = source.key
+    }
+  }
 }
 
 # Primary region Lambda functions
@@ -64,9 +114,17 @@ resource "aws_lambda_function" "github_monitor" {
       MONITORING_INTERVAL = var.monitoring_interval
       ESCALATION_TIMEOUT  = var.escalation_timeout
       ESCALATION_CONTACT  = var.escalation_contact
-      HEARTBEAT_BUCKET    = var.heartbeat_bucket
-      HEARTBEAT_FILE      = var.heartbeat_file
+      ESCALATION_TIERS    = var.escalation_tiers
+      HEARTBEAT_BUCKET    = aws_s3_bucket.heartbeat.id
+      HEARTBEAT_FILE      = aws_s3_object.heartbeat_file.key
+      HEARTBEAT_INTERVAL  = var.heartbeat_interval
       SERVICE_NAME        = var.service_name
+      ALERT_COALESCE_WINDOW = var.alert_coalesce_window
+      HISTORY_TTL_DAYS      = var.history_ttl_days
+      STATUS_SOURCES        = jsonencode(var.status_sources)
+      HYSTERESIS_POLLS      = var.hysteresis_polls
+      HYSTERESIS_DWELL      = var.hysteresis_dwell
+      MONITOR_ROLE        = "primary"
     }
   }
   tags = local.common_tags
@@ -13,6 +13,11 @@ output "acknowledgment_api_gateway_url" {
   value       = "${aws_api_gateway_stage.prod.invoke_url}/acknowledge"
 }
 
+output "stats_api_gateway_url" {
+  description = "URL for per-service uptime, MTTA and MTTR"
+  value       = "${aws_api_gateway_stage.prod.invoke_url}/stats"
+}
+
 output "dynamodb_table_name" {
   description = "Name of the DynamoDB table for GitHub status"
   value       = aws_dynamodb_table.github_status_monitor.name
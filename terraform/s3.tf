@@ -40,6 +40,11 @@ resource "aws_s3_object" "heartbeat_file" {
   content      = "<html><body>Lambda heartbeat: Initial setup</body></html>"
   content_type = "text/html"
   
+  # The Lambdas re-render the page from heartbeat.json after this initial upload
+  lifecycle {
+    ignore_changes = [content, etag]
+  }
+  
   tags = local.common_tags
 }
 
@@ -54,7 +59,10 @@ resource "aws_s3_bucket_policy" "allow_public_read" {
         Effect    = "Allow"
         Principal = "*"
         Action    = "s3:GetObject"
-        Resource  = "${aws_s3_bucket.heartbeat.arn}/${aws_s3_object.heartbeat_file.key}"
+        Resource  = [
+          "${aws_s3_bucket.heartbeat.arn}/${aws_s3_object.heartbeat_file.key}",
+          "${aws_s3_bucket.heartbeat.arn}/heartbeat.json"
+        ]
       }
     ]
   })
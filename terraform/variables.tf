@@ -23,7 +23,7 @@ variable "slack_webhook_url" {
 }
 
 variable "github_services" {
-  description = "GitHub services to monitor"
+  description = "GitHub components to monitor (an empty list monitors every component)"
   type        = list(string)
   default     = ["Git Operations", "API Requests"]
 }
@@ -40,12 +40,41 @@ variable "escalation_timeout" {
   default     = 15
 }
 
+variable "alert_coalesce_window" {
+  description = "Seconds to hold status alerts across runs so they are sent as one Slack digest (0 sends at the end of each run)"
+  type        = number
+  default     = 0
+}
+
+variable "status_sources" {
+  description = "Additional Statuspage summary.json sources polled alongside githubstatus.com"
+  type = list(object({
+    name       = string
+    url        = string
+    components = list(string)
+    interval   = number
+  }))
+  default = []
+}
+
+variable "history_ttl_days" {
+  description = "Days raw status history and incident timeline rows are kept before DynamoDB TTL removes them (daily summaries are kept)"
+  type        = number
+  default     = 30
+}
+
 variable "escalation_contact" {
   description = "Slack user ID to escalate to if no acknowledgment"
   type        = string
   default     = "@steve"  # Update with actual Slack user ID
 }
 
+variable "escalation_tiers" {
+  description = "Comma-separated escalation tiers in minutes after an incident opens, each optionally with a contact (e.g. \"15,45=@lead\"). Empty uses escalation_timeout and escalation_contact"
+  type        = string
+  default     = ""
+}
+
 variable "heartbeat_bucket_name" {
   description = "S3 bucket name for Lambda heartbeat file"
   type        = string
@@ -88,8 +117,26 @@ variable "heartbeat_file" {
   default     = "heartbeat.txt"
 }
 
+variable "heartbeat_interval" {
+  description = "Minimum seconds between heartbeat publishes from each Lambda container"
+  type        = number
+  default     = 300
+}
+
 variable "service_name" {
   description = "Name of the service"
   type        = string
   default     = "github_monitor_service"
 }
+
+variable "hysteresis_polls" {
+  description = "Consecutive polls a component must report a new status before it is alerted on (1 disables)"
+  type        = number
+  default     = 1
+}
+
+variable "hysteresis_dwell" {
+  description = "Minimum seconds a new component status must persist before it is alerted on (0 disables)"
+  type        = number
+  default     = 0
+}
@@ -0,0 +1,132 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# The Lambdas import their shared modules from the zip root, and every
+# handler's entry module is called main.py, so each is loaded under its own
+# name with the shared and monitor sources on sys.path.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for key, value in {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_ACCESS_KEY_ID': 'testing',
+    'AWS_SECRET_ACCESS_KEY': 'testing',
+    'DYNAMODB_TABLE': 'github-status-monitor',
+    'SLACK_WEBHOOK_URL': 'http://127.0.0.1:9/slack',
+    'SLACK_API_TOKEN': 'testing',
+    'GITHUB_SERVICES': 'Git Operations,API Requests',
+    'MONITORING_INTERVAL': '5',
+    'ESCALATION_TIMEOUT': '15',
+    'ESCALATION_CONTACT': '@oncall',
+    'HEARTBEAT_BUCKET': 'heartbeat-bucket',
+    'HEARTBEAT_FILE': 'heartbeat.html',
+    'SERVICE_NAME': 'github-status-monitor',
+    'STATE_BACKEND': 'sqlite',
+}.items():
+    os.environ.setdefault(key, value)
+
+for path in ('src/shared', 'src/github_monitor'):
+    sys.path.insert(0, os.path.join(REPO_ROOT, path))
+
+def load_lambda(directory, name):
+    """Imports src/<directory>/main.py as module name."""
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, 'src', directory, 'main.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+def load_entry(directory, name):
+    """
+    Imports src/<directory>/lambda_function.py as module name, with its
+    `from main import ...` resolved to that directory's main.py.
+    """
+    if name not in sys.modules:
+        main = load_lambda(directory, f"{name}_main")
+        previous = sys.modules.get('main')
+        sys.modules['main'] = main
+        try:
+            spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, 'src', directory, 'lambda_function.py'))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            spec.loader.exec_module(module)
+        finally:
+            if previous is None:
+                del sys.modules['main']
+            else:
+                sys.modules['main'] = previous
+    return sys.modules[name]
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    """Starts every test with no metrics collected, as a new invocation would."""
+    import metrics
+    metrics.timings.clear()
+    metrics.counts.clear()
+
+@pytest.fixture
+def monitor():
+    """The github_monitor module on a fresh in-memory SQLite store."""
+    main = load_lambda('github_monitor', 'monitor_main')
+    main.clients['store'] = main.state.SQLiteStore()
+    main.pending_alerts.clear()
+    main.pending_stats.clear()
+    main.outbox.queued.clear()
+    main.templates.rendered.clear()
+    yield main
+    main.clients.pop('store', None)
+    main.outbox.queued.clear()
+
+@pytest.fixture
+def escalation():
+    """The escalation_handler module; tests give it a table."""
+    main = load_lambda('escalation_handler', 'escalation_main')
+    main.outbox.queued.clear()
+    yield main
+    main.clients.pop('table', None)
+    main.outbox.queued.clear()
+
+@pytest.fixture
+def dynamodb():
+    """The status and acknowledgments tables, as terraform/dynamodb.tf defines them, in moto."""
+    moto = pytest.importorskip('moto')
+    import boto3
+    with moto.mock_aws():
+        client = boto3.client('dynamodb')
+        client.create_table(
+            TableName=os.environ['DYNAMODB_TABLE'],
+            BillingMode='PAY_PER_REQUEST',
+            AttributeDefinitions=[
+                {'AttributeName': name, 'AttributeType': 'S'} for name in ('service_name', 'timestamp', 'incident_id')
+            ],
+            KeySchema=[
+                {'AttributeName': 'service_name', 'KeyType': 'HASH'},
+                {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+            ],
+            GlobalSecondaryIndexes=[{
+                'IndexName': 'incident_id-index',
+                'KeySchema': [{'AttributeName': 'incident_id', 'KeyType': 'HASH'}],
+                'Projection': {'ProjectionType': 'KEYS_ONLY'}
+            }]
+        )
+        client.create_table(
+            TableName='github-incident-acknowledgments',
+            BillingMode='PAY_PER_REQUEST',
+            AttributeDefinitions=[{'AttributeName': 'incident_id', 'AttributeType': 'S'}],
+            KeySchema=[{'AttributeName': 'incident_id', 'KeyType': 'HASH'}]
+        )
+        yield boto3.resource('dynamodb')
+
+@pytest.fixture
+def acknowledgment():
+    """The acknowledgment_handler entry module; tests give its main module a client."""
+    entry = load_entry('acknowledgment_handler', 'acknowledgment')
+    main = sys.modules['acknowledgment_main']
+    main.outbox.queued.clear()
+    yield entry
+    main.clients.clear()
+    main.outbox.queued.clear()
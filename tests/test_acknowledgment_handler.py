@@ -0,0 +1,40 @@
+import sys
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+
+import acknowledgments
+
+DEFERRED = {'deferred_acknowledgment': {
+    'incident': {'incident_id': 'inc-1', 'service_name': 'Git Operations', 'timestamp': 'latest'},
+    'user': 'alice (U1)',
+    'user_name': 'alice'
+}}
+
+@pytest.fixture
+def client(dynamodb, acknowledgment):
+    client = boto3.client('dynamodb')
+    sys.modules['acknowledgment_main'].clients['dynamodb'] = client
+    dynamodb.Table('github-status-monitor').put_item(Item={
+        'service_name': 'Git Operations', 'timestamp': 'latest', 'status': 'major_outage',
+        'incident_id': 'inc-1', 'escalation_state': 'open'
+    })
+    return client
+
+def test_failed_deferred_acknowledgment_fails_the_invocation(acknowledgment, client, monkeypatch):
+    def throttled(**kwargs):
+        raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'TransactWriteItems')
+
+    monkeypatch.setattr(client, 'transact_write_items', throttled)
+    with pytest.raises(Exception, match='Deferred acknowledgment failed'):
+        acknowledgment.lambda_handler(DEFERRED, None)
+
+def test_retried_deferred_acknowledgment_is_recorded_once(acknowledgment, client, dynamodb):
+    first = acknowledgment.lambda_handler(DEFERRED, None)
+    retry = acknowledgment.lambda_handler(DEFERRED, None)
+
+    assert first['statusCode'] == 200 and 'processed' in first['body']
+    assert retry['statusCode'] == 200 and 'already acknowledged' in retry['body']
+    ack = dynamodb.Table(acknowledgments.ACK_TABLE).get_item(Key={'incident_id': 'inc-1'})['Item']
+    assert ack['acknowledged_services'] == {'Git Operations'}
@@ -0,0 +1,84 @@
+import json
+import urllib.parse
+
+import boto3
+import pytest
+
+import acknowledgments
+import escalations
+
+SERVICES = ('Git Operations', 'API Requests')
+
+def open_incident(store, incident_id='inc-1', opened_at=1700000000):
+    for service_name in SERVICES:
+        store.put_item(Item={
+            'service_name': service_name,
+            'timestamp': 'latest',
+            'status': 'major_outage',
+            'incident_id': incident_id,
+            'escalation_state': 'open',
+            'opened_at': opened_at
+        })
+
+def row(service_name, incident_id='inc-1'):
+    return {'incident_id': incident_id, 'service_name': service_name, 'timestamp': 'latest'}
+
+def test_each_component_of_an_incident_can_be_acknowledged(monitor):
+    store = monitor.get_store()
+    open_incident(store)
+
+    assert store.acknowledge(row('Git Operations'), 'alice (U1)', 'alice')
+    assert store.acknowledge(row('API Requests'), 'bob (U2)', 'bob')
+    assert not store.acknowledge(row('API Requests'), 'carol (U3)', 'carol')
+
+    for service_name in SERVICES:
+        latest = store.get_item({'service_name': service_name, 'timestamp': 'latest'})
+        assert 'escalation_state' not in latest
+    assert store.get_item({'service_name': 'API Requests', 'timestamp': 'latest'})['acknowledged_by'] == 'bob (U2)'
+
+def test_dynamodb_acknowledgment_is_first_wins_per_row(dynamodb):
+    table = dynamodb.Table('github-status-monitor')
+    open_incident(table)
+    client = boto3.client('dynamodb')  # record_acknowledgment takes typed values
+
+    assert acknowledgments.record_acknowledgment(client, table.name, row('Git Operations'), 'alice (U1)', 'alice')
+    assert acknowledgments.record_acknowledgment(client, table.name, row('API Requests'), 'bob (U2)', 'bob')
+    assert not acknowledgments.record_acknowledgment(client, table.name, row('API Requests'), 'carol (U3)', 'carol')
+
+    ack = dynamodb.Table(acknowledgments.ACK_TABLE).get_item(Key={'incident_id': 'inc-1'})['Item']
+    assert ack['acknowledged_by'] == 'alice (U1)'
+    assert ack['acknowledged_services'] == set(SERVICES)
+
+def test_acknowledged_component_is_not_escalated(dynamodb, escalation):
+    table = dynamodb.Table('github-status-monitor')
+    escalation.clients['table'] = table
+    open_incident(table)
+    client = boto3.client('dynamodb')
+    acknowledgments.record_acknowledgment(client, table.name, row('Git Operations'), 'alice (U1)', 'alice')
+    acknowledgments.record_acknowledgment(client, table.name, row('API Requests'), 'bob (U2)', 'bob')
+
+    items = [
+        escalations.schedule_item({'service_name': service_name, 'timestamp': 'latest'}, 'inc-1', service_name, 1700000000)
+        for service_name in SERVICES
+    ]
+    assert escalation.escalate_incident('inc-1', 1, items) == 0
+    assert escalation.outbox.queued == []
+
+def test_monitor_acknowledgment_enqueues_its_confirmation(monitor, monkeypatch):
+    store = monitor.get_store()
+    open_incident(store)
+    monkeypatch.setattr(monitor.notifications, 'send', lambda *args: pytest.fail('confirmation POSTed directly'))
+    payload = {
+        'actions': [{'value': acknowledgments.button_value('inc-1', 'Git Operations')}],
+        'user': {'name': 'alice', 'id': 'U1'},
+        'response_url': 'https://hooks.slack.test/response'
+    }
+    event = {'body': urllib.parse.urlencode({'payload': json.dumps(payload)})}
+
+    assert monitor.handle_acknowledgment(event)['statusCode'] == 200
+    [message] = store.query(monitor.outbox.PARTITION)
+    assert 'alice is handling incident inc-1' in message['body']
+    assert monitor.outbox.queued == [message]
+
+    assert 'already acknowledged' in monitor.handle_acknowledgment(event)['body']
+    assert len(store.query(monitor.outbox.PARTITION)) == 1
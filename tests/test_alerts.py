@@ -0,0 +1,88 @@
+import json
+
+import outbox
+
+def outbox_messages(store):
+    return [json.loads(row['body']) for row in store.query(outbox.PARTITION)]
+
+def incident(update_id, body):
+    return {'id': 'inc-1', 'update_id': update_id, 'shortlink': 'https://stspg.io/x', 'body': body}
+
+def test_alerts_for_one_incident_name_their_own_component(monitor):
+    with monitor.get_store().writer(atomic=True) as writer:
+        monitor.send_slack_message('Git Operations', 'major_outage', incident('u1', 'Git is down'), writer)
+        monitor.send_slack_message('API Requests', 'major_outage', incident('u2', 'API is down too'), writer)
+
+    api, git = sorted(outbox_messages(monitor.get_store()), key=lambda message: message['text'])
+    assert 'API Requests' in api['text'] and 'API is down too' in api['blocks'][0]['text']['text']
+    assert 'Git Operations' in git['text'] and 'Git is down' in git['blocks'][0]['text']['text']
+
+    button = json.loads(api['blocks'][1]['elements'][0]['value'])
+    assert button['service_name'] == 'API Requests'
+
+def test_repeated_alert_reuses_its_body(monitor):
+    first = incident('u1', 'Git is down')
+    with monitor.get_store().writer(atomic=True) as writer:
+        monitor.send_slack_message('Git Operations', 'major_outage', first, writer)
+        monitor.send_slack_message('Git Operations', 'major_outage', dict(first), writer)
+
+    bodies = [row['body'] for row in monitor.get_store().query(outbox.PARTITION)]
+    assert len(bodies) == 2 and bodies[0] == bodies[1]
+    assert len(monitor.templates.rendered) == 1
+
+def test_test_event_sends_one_message_per_service(monitor):
+    monitor.handle_event({'test': True})
+
+    texts = sorted(message['text'] for message in outbox_messages(monitor.get_store()))
+    assert len(texts) == 2
+    assert 'API Requests is experiencing an issue!' in texts[0]
+    assert 'Git Operations is experiencing an issue!' in texts[1]
+
+def test_incident_row_commits_with_its_alert(monitor, monkeypatch):
+    store = monitor.get_store()
+    write = store._write
+
+    def fail_on_schedule(item):
+        if item['service_name'].startswith(monitor.escalations.BUCKET_PREFIX):
+            raise RuntimeError('throttled')
+        write(item)
+
+    monkeypatch.setattr(store, '_write', fail_on_schedule)
+    try:
+        monitor.send_incident_to_slack('Git Operations', 'inc-1', 'Git is down')
+    except RuntimeError:
+        pass
+    assert store.get_item({'service_name': 'Git Operations', 'timestamp': 'incident#inc-1'}) is None
+    assert store.query(outbox.PARTITION) == []
+
+    # The retry is not mistaken for a duplicate
+    monkeypatch.setattr(store, '_write', write)
+    monitor.send_incident_to_slack('Git Operations', 'inc-1', 'Git is down')
+    assert len(store.query(outbox.PARTITION)) == 1
+    assert len(outbox.queued) == 1
+
+def test_duplicate_incident_writes_nothing(dynamodb, monitor):
+    monitor.clients['store'] = monitor.state.DynamoDBStore(monitor.DYNAMODB_TABLE, dynamodb=dynamodb)
+    monitor.send_incident_to_slack('Git Operations', 'inc-1', 'Git is down')
+    monitor.send_incident_to_slack('Git Operations', 'inc-1', 'Git is down')
+
+    rows = dynamodb.Table(monitor.DYNAMODB_TABLE).scan()['Items']
+    partitions = sorted(row['service_name'].split('#')[0] for row in rows)
+    assert partitions == sorted([outbox.PARTITION, 'Git Operations', 'escalation'])
+    assert len(outbox.queued) == 1
+
+def test_digest_header_names_the_alerted_sources(monitor, monkeypatch):
+    registry = monitor.sources.load_sources(
+        json.dumps([{'name': 'npm', 'url': 'https://status.npmjs.org/api/v2/summary.json'}]),
+        monitor.GITHUB_STATUS_URL, monitor.GITHUB_SERVICES
+    )
+    monkeypatch.setattr(monitor, 'STATUS_SOURCES', registry)
+
+    npm_only = json.loads(monitor.build_alert_digest([{'service_name': 'npm/registry', 'status': 'major_outage'}]))
+    assert npm_only['text'].startswith('npm status: 1 component(s) affected')
+
+    both = json.loads(monitor.build_alert_digest([
+        {'service_name': 'npm/registry', 'status': 'major_outage'},
+        {'service_name': 'Git Operations', 'status': 'operational'}
+    ]))
+    assert both['text'].startswith('GitHub, npm status: 1 component(s) affected, 1 resolved')
@@ -0,0 +1,123 @@
+import pytest
+
+import escalations
+import metrics
+import outbox
+
+MINUTE = 1790000040  # A minute boundary
+OPENED_AT = MINUTE - 15 * 60  # The first tier is due at MINUTE
+
+@pytest.fixture
+def table(dynamodb, escalation):
+    table = dynamodb.Table(escalation.DYNAMODB_TABLE)
+    escalation.clients['table'] = table
+    return table
+
+def open_incident(table, service_name, incident_id, opened_at=OPENED_AT):
+    """Writes an open status row and its first tier's schedule row, as the monitor does."""
+    row_key = {'service_name': service_name, 'timestamp': 'latest'}
+    table.put_item(Item=dict(row_key, status='major_outage', incident_id=incident_id, escalation_state='open'))
+    table.put_item(Item=escalations.schedule_item(row_key, incident_id, service_name, opened_at))
+
+def cursor(escalation, table):
+    return table.get_item(Key=escalation.CURSOR_KEY)['Item']['minute']
+
+def escalated_tier(table, service_name):
+    return table.get_item(Key={'service_name': service_name, 'timestamp': 'latest'})['Item'].get('escalation_tier')
+
+def outbox_rows(table):
+    return table.query(KeyConditionExpression='service_name = :p', ExpressionAttributeValues={':p': outbox.PARTITION})['Items']
+
+def test_first_tick_escalates_due_rows_and_advances_the_cursor(escalation, table):
+    open_incident(table, 'Git Operations', 'inc-1')
+    open_incident(table, 'API Requests', 'inc-1')
+
+    escalation.escalate_due_incidents(MINUTE + 30)
+
+    assert escalated_tier(table, 'Git Operations') == 1 and escalated_tier(table, 'API Requests') == 1
+    [message] = outbox_rows(table)
+    assert 'API Requests, Git Operations' in message['body']
+    assert table.query(KeyConditionExpression='service_name = :p', ExpressionAttributeValues={':p': escalations.bucket(MINUTE)})['Items'] == []
+    # The current minute is read again next tick
+    assert cursor(escalation, table) == MINUTE - 60
+    assert metrics.counts['EscalationBuckets'] == escalation.FIRST_RUN_LOOKBACK // 60 + 1
+
+def test_row_waits_until_due_within_its_minute(escalation, table):
+    open_incident(table, 'Git Operations', 'inc-1', OPENED_AT + 40)
+
+    escalation.escalate_due_incidents(MINUTE + 10)
+    assert escalated_tier(table, 'Git Operations') is None
+
+    escalation.escalate_due_incidents(MINUTE + 50)
+    assert escalated_tier(table, 'Git Operations') == 1
+    assert cursor(escalation, table) == MINUTE - 60
+
+    escalation.escalate_due_incidents(MINUTE + 70)
+    assert cursor(escalation, table) == MINUTE
+    assert len(outbox_rows(table)) == 1
+
+def test_later_ticks_read_only_new_buckets(escalation, table):
+    escalation.escalate_due_incidents(MINUTE)
+    metrics.counts.clear()
+
+    escalation.escalate_due_incidents(MINUTE + 180)
+    assert metrics.counts['EscalationBuckets'] == 4
+    assert cursor(escalation, table) == MINUTE + 120
+
+def test_catch_up_is_bounded(escalation, table, monkeypatch):
+    monkeypatch.setattr(escalation, 'MAX_CATCHUP', 10 * 60)
+    table.put_item(Item=dict(escalation.CURSOR_KEY, minute=MINUTE - 3 * 86400))
+    escalation.escalate_due_incidents(MINUTE)
+    assert metrics.counts['EscalationBuckets'] == escalation.MAX_CATCHUP // 60 + 1
+
+def test_unreadable_cursor_skips_the_tick(escalation, table, monkeypatch):
+    table.put_item(Item=dict(escalation.CURSOR_KEY, minute=MINUTE - 60))
+    open_incident(table, 'Git Operations', 'inc-1')
+
+    def throttled(**kwargs):
+        raise RuntimeError('throttled')
+
+    monkeypatch.setattr(table, 'get_item', throttled)
+    with pytest.raises(RuntimeError):
+        escalation.escalate_due_incidents(MINUTE + 30)
+    monkeypatch.undo()
+
+    assert escalated_tier(table, 'Git Operations') is None
+    assert cursor(escalation, table) == MINUTE - 60
+
+def test_failed_bucket_holds_the_cursor(escalation, table, monkeypatch):
+    open_incident(table, 'Git Operations', 'inc-1', OPENED_AT - 120)
+    open_incident(table, 'API Requests', 'inc-2', OPENED_AT - 60)
+    escalate_incident = escalation.escalate_incident
+
+    def fail_first(incident_id, tier, items):
+        if incident_id == 'inc-1':
+            raise RuntimeError('throttled')
+        return escalate_incident(incident_id, tier, items)
+
+    monkeypatch.setattr(escalation, 'escalate_incident', fail_first)
+    escalation.escalate_due_incidents(MINUTE + 30)
+    assert escalated_tier(table, 'API Requests') == 1
+    assert cursor(escalation, table) == MINUTE - 180
+
+    # The failed bucket is read again; the escalated row is not sent twice
+    monkeypatch.setattr(escalation, 'escalate_incident', escalate_incident)
+    escalation.escalate_due_incidents(MINUTE + 90)
+    assert escalated_tier(table, 'Git Operations') == 1
+    assert cursor(escalation, table) == MINUTE
+    assert len(outbox_rows(table)) == 2
+
+def test_next_tier_is_scheduled(escalation, table, monkeypatch):
+    monkeypatch.setattr(escalations, 'TIERS', escalations.load_tiers('15,45=@lead', 15, '@oncall'))
+    open_incident(table, 'Git Operations', 'inc-1')
+
+    escalation.escalate_due_incidents(MINUTE + 30)
+
+    second_bucket = escalations.bucket(escalations.due_at(OPENED_AT, 2))
+    [scheduled] = table.query(KeyConditionExpression='service_name = :p', ExpressionAttributeValues={':p': second_bucket})['Items']
+    assert scheduled['tier'] == 2 and scheduled['escalation_incident'] == 'inc-1'
+
+    escalation.escalate_due_incidents(escalations.due_at(OPENED_AT, 2) + 30)
+    assert escalated_tier(table, 'Git Operations') == 2
+    [second] = [row['body'] for row in outbox_rows(table) if 'tier 2' in row['body']]
+    assert '@lead' in second
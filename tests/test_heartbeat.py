@@ -0,0 +1,85 @@
+import io
+import json
+
+import pytest
+from botocore.exceptions import ClientError, ParamValidationError
+
+import heartbeat
+
+class FakeS3:
+    """In-memory S3 honouring IfMatch/IfNoneMatch on put_object, like S3's conditional writes."""
+
+    def __init__(self, conditional=True):
+        self.objects = {}
+        self.conditional = conditional
+        self.conflicts = 0
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'Not found'}}, 'GetObject')
+        body, etag = self.objects[Key]
+        return {'Body': io.BytesIO(body), 'ETag': etag}
+
+    def put_object(self, Bucket, Key, Body, IfMatch=None, IfNoneMatch=None, **kwargs):
+        if (IfMatch or IfNoneMatch) and not self.conditional:
+            raise ParamValidationError(report='Unknown parameter in input: "IfMatch"')
+        current = self.objects.get(Key)
+        if (IfMatch and (not current or current[1] != IfMatch)) or (IfNoneMatch and current):
+            self.conflicts += 1
+            raise ClientError({'Error': {'Code': 'PreconditionFailed', 'Message': 'At least one precondition failed'}}, 'PutObject')
+        etag = f'"{len(self.objects)}-{hash(Body)}"'
+        self.objects[Key] = (Body, etag)
+        return {'ETag': etag}
+
+    def document(self):
+        return json.loads(self.objects[heartbeat.HEARTBEAT_STATE_FILE][0])
+
+@pytest.fixture
+def s3(monkeypatch):
+    s3 = FakeS3()
+    monkeypatch.setitem(heartbeat.clients, 's3', s3)
+    return s3
+
+def publish_from(monkeypatch, region, container, now):
+    """Publishes as a container in region, with that container's own cached document and ETag."""
+    monkeypatch.setattr(heartbeat, 'REGION', region)
+    monkeypatch.setattr(heartbeat, 'state', container)
+    heartbeat.publish(now)
+
+def new_container():
+    return {'published_at': 0, 'document': None, 'etag': None, 'conditional': True}
+
+def test_conflicting_publishes_merge_both_regions(s3, monkeypatch):
+    east, west = new_container(), new_container()
+    publish_from(monkeypatch, 'us-east-1', east, 1000)
+    publish_from(monkeypatch, 'us-west-2', west, 1010)
+    # east still holds the ETag from before west's write, so its next PUT gets a 412 and merges
+    publish_from(monkeypatch, 'us-east-1', east, 1300)
+
+    assert s3.conflicts == 1
+    regions = s3.document()['functions'][heartbeat.FUNCTION_NAME]
+    assert regions['us-east-1']['last_seen_epoch'] == 1300
+    assert regions['us-west-2']['last_seen_epoch'] == 1010
+    assert 'us-west-2' in s3.objects[heartbeat.HEARTBEAT_FILE][0].decode('utf-8')
+
+def test_conflict_on_every_attempt_raises(s3, monkeypatch):
+    publish_from(monkeypatch, 'us-east-1', new_container(), 1000)
+    container = dict(new_container(), document={'functions': {}}, etag='"stale"')
+    monkeypatch.setattr(heartbeat, 'load_document', lambda: container.update(document={'functions': {}}, etag='"stale"'))
+
+    with pytest.raises(ClientError):
+        publish_from(monkeypatch, 'us-west-2', container, 1010)
+    assert s3.conflicts == heartbeat.MAX_ATTEMPTS
+
+def test_missing_conditional_parameters_fall_back_to_plain_put(monkeypatch):
+    s3 = FakeS3(conditional=False)
+    monkeypatch.setitem(heartbeat.clients, 's3', s3)
+    container = new_container()
+
+    publish_from(monkeypatch, 'us-east-1', container, 1000)
+    assert not container['conditional']
+    assert s3.document()['functions'][heartbeat.FUNCTION_NAME]['us-east-1']['last_seen_epoch'] == 1000
+
+    # Later publishes skip the conditions instead of failing validation again
+    publish_from(monkeypatch, 'us-east-1', container, 1300)
+    assert s3.document()['functions'][heartbeat.FUNCTION_NAME]['us-east-1']['last_seen_epoch'] == 1300
@@ -0,0 +1,51 @@
+import time
+
+def test_incident_timeline_rows_expire_with_history(monitor):
+    incident = {
+        'id': 'inc-1',
+        'components': [{'id': 'c1', 'name': 'Git Operations'}],
+        'incident_updates': [
+            {'id': 'u2', 'status': 'identified', 'body': 'Fix deployed', 'created_at': '2026-10-01T12:05:00Z'},
+            {'id': 'u1', 'status': 'investigating', 'body': 'Investigating', 'created_at': '2026-10-01T12:00:00Z'},
+        ],
+    }
+    assert monitor.latest_incidents([incident])['c1']['update_id'] == 'u2'
+    assert monitor.ingest_incidents([incident], {})
+
+    rows = monitor.get_store().query('incident#inc-1')
+    assert [row['timestamp'] for row in rows] == ['2026-10-01T12:00:00Z#u1', '2026-10-01T12:05:00Z#u2']
+    ttl = time.time() + monitor.HISTORY_TTL_DAYS * 86400
+    assert all(abs(int(row['purge_at']) - ttl) < 60 for row in rows)
+
+def test_status_history_is_compacted_into_daily_summaries(monitor):
+    store = monitor.get_store()
+    with store.writer() as writer:
+        writer.put_item(Item=monitor.history_item('Git Operations', 'major_outage', '2026-10-01T12:00:00Z', 'inc-1'))
+        writer.put_item(Item=monitor.history_item('Git Operations', 'operational', '2026-10-01T13:00:00Z'))
+
+    assert monitor.compact_history_day('2026-10-01') == 2
+    assert store.query('history#2026-10-01') == []
+    summary = store.get_item({'service_name': 'summary#Git Operations', 'timestamp': '2026-10-01'})
+    assert summary['changes'] == 2 and summary['last_status'] == 'operational' and summary['incident_ids'] == {'inc-1'}
+
+def test_incident_marks_are_read_with_the_fingerprint(monitor, monkeypatch):
+    incident = {
+        'id': 'inc-1',
+        'components': [{'id': 'c1', 'name': 'Git Operations'}],
+        'incident_updates': [{'id': 'u1', 'status': 'investigating', 'body': 'Investigating', 'created_at': '2026-10-01T12:00:00Z'}],
+    }
+    components = [{'id': 'c1', 'name': 'Git Operations', 'status': 'operational'}]
+    store = monitor.get_store()
+    monitor.sync_github_services([dict(c) for c in components], [incident])
+    assert store.get_item(monitor.FINGERPRINT_KEY)['marks'] == {'inc-1': 'u1'}
+
+    reads = []
+    get_item = store.get_item
+    monkeypatch.setattr(store, 'get_item', lambda key, **kwargs: reads.append(key) or get_item(key, **kwargs))
+    monitor.sync_github_services([dict(c) for c in components], [incident])
+    assert reads == [monitor.FINGERPRINT_KEY]
+
+    incident['incident_updates'].insert(0, {'id': 'u2', 'status': 'resolved', 'body': 'Resolved', 'created_at': '2026-10-01T12:30:00Z'})
+    monitor.sync_github_services([dict(c) for c in components], [incident])
+    assert [row['timestamp'] for row in store.query('incident#inc-1')] == ['2026-10-01T12:00:00Z#u1', '2026-10-01T12:30:00Z#u2']
+    assert store.get_item(monitor.FINGERPRINT_KEY)['marks'] == {'inc-1': 'u2'}
@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+import hysteresis
+
+def row(status='operational', **pending):
+    return dict({'service_name': 'Git Operations', 'timestamp': 'latest', 'status': status}, **pending)
+
+def test_steady_status_writes_nothing():
+    assert hysteresis.observe(row(), 'operational', 1000, polls=3) == (hysteresis.STEADY, None)
+
+def test_change_is_confirmed_at_once_without_hysteresis():
+    assert not hysteresis.enabled(1, 0)
+    assert hysteresis.observe(row(), 'major_outage', 1000) == (hysteresis.CONFIRM, None)
+
+def test_change_is_confirmed_after_enough_polls():
+    outcome, latest = hysteresis.observe(row(), 'major_outage', 1000, polls=3)
+    assert outcome == hysteresis.PENDING
+    assert (latest['status'], latest['pending_status'], latest['pending_count'], latest['pending_since']) == ('operational', 'major_outage', 1, 1000)
+
+    outcome, latest = hysteresis.observe(latest, 'major_outage', 1060, polls=3)
+    assert outcome == hysteresis.PENDING and latest['pending_count'] == 2 and latest['pending_since'] == 1000
+
+    assert hysteresis.observe(latest, 'major_outage', 1120, polls=3) == (hysteresis.CONFIRM, None)
+
+def test_change_waits_for_the_dwell_time():
+    _, latest = hysteresis.observe(row(), 'major_outage', 1000, polls=2, dwell=300)
+    outcome, latest = hysteresis.observe(latest, 'major_outage', 1060, polls=2, dwell=300)
+    assert outcome == hysteresis.PENDING and latest['pending_count'] == 2
+
+    assert hysteresis.observe(latest, 'major_outage', 1300, polls=2, dwell=300)[0] == hysteresis.CONFIRM
+
+def test_flap_back_to_confirmed_status_is_suppressed():
+    _, latest = hysteresis.observe(row(), 'major_outage', 1000, polls=3)
+    outcome, latest = hysteresis.observe(latest, 'operational', 1060, polls=3)
+
+    assert outcome == hysteresis.SUPPRESSED
+    assert latest == row()
+
+def test_different_candidate_starts_over():
+    _, latest = hysteresis.observe(row(), 'major_outage', 1000, polls=2)
+    outcome, latest = hysteresis.observe(latest, 'partial_outage', 1060, polls=2)
+
+    assert outcome == hysteresis.PENDING
+    assert (latest['pending_status'], latest['pending_count'], latest['pending_since']) == ('partial_outage', 1, 1060)
+    assert hysteresis.observe(latest, 'partial_outage', 1120, polls=2)[0] == hysteresis.CONFIRM
+
+def test_counters_read_back_as_decimal():
+    stored = row(pending_status='major_outage', pending_count=Decimal(1), pending_since=Decimal(1000))
+    assert hysteresis.observe(stored, 'major_outage', 1060, polls=2)[0] == hysteresis.CONFIRM
@@ -0,0 +1,44 @@
+import pytest
+
+PRIMARY = 'us-east-1/github-status-monitor'
+SECONDARY = 'us-west-2/github-status-monitor'
+
+@pytest.fixture
+def lease_store(dynamodb, monitor):
+    store = monitor.state.DynamoDBStore(monitor.DYNAMODB_TABLE, dynamodb)
+    monitor.clients['store'] = store
+    return store
+
+def run_as(monitor, monkeypatch, role, holder):
+    monkeypatch.setattr(monitor, 'MONITOR_ROLE', role)
+    monkeypatch.setattr(monitor, 'LEASE_HOLDER', holder)
+    return monitor.acquire_lease()
+
+def holder(monitor, store):
+    return store.get_item(monitor.LEASE_KEY, consistent=True)['holder']
+
+def test_primary_holds_the_lease(monitor, lease_store, monkeypatch):
+    assert run_as(monitor, monkeypatch, 'primary', PRIMARY)
+    assert holder(monitor, lease_store) == PRIMARY
+
+def test_secondary_is_refused_while_the_lease_is_live(monitor, lease_store, monkeypatch):
+    run_as(monitor, monkeypatch, 'primary', PRIMARY)
+
+    assert not run_as(monitor, monkeypatch, 'secondary', SECONDARY)
+    assert holder(monitor, lease_store) == PRIMARY
+
+def test_secondary_takes_over_an_expired_lease(monitor, lease_store, monkeypatch):
+    run_as(monitor, monkeypatch, 'primary', PRIMARY)
+    expired = monitor.time.time() + monitor.LEASE_DURATION + 1
+    monkeypatch.setattr(monitor.time, 'time', lambda: expired)
+
+    assert run_as(monitor, monkeypatch, 'secondary', SECONDARY)
+    assert holder(monitor, lease_store) == SECONDARY
+    # It renews its own lease on the next run
+    assert run_as(monitor, monkeypatch, 'secondary', SECONDARY)
+
+def test_unreachable_lease_row_fails_open(dynamodb, monitor, monkeypatch):
+    monitor.clients['store'] = monitor.state.DynamoDBStore('missing-table', dynamodb)
+
+    assert run_as(monitor, monkeypatch, 'secondary', SECONDARY)
+    assert run_as(monitor, monkeypatch, 'primary', PRIMARY)
@@ -0,0 +1,23 @@
+import json
+
+import metrics
+
+def test_dead_letters_are_also_published_without_function_dimension(capsys):
+    metrics.count('OutboxDelivered')
+    metrics.count('OutboxDeadLettered', 2)
+    metrics.emit('github-escalation-handler')
+
+    line = json.loads(capsys.readouterr().out)
+    per_function, rollup = line['_aws']['CloudWatchMetrics']
+    assert per_function['Dimensions'] == [['Function']]
+    assert {metric['Name'] for metric in per_function['Metrics']} == {'OutboxDelivered', 'OutboxDeadLettered'}
+    assert rollup['Dimensions'] == [[]]
+    assert [metric['Name'] for metric in rollup['Metrics']] == ['OutboxDeadLettered']
+    assert line['OutboxDeadLettered'] == 2
+
+def test_rollup_is_left_out_when_nothing_was_dead_lettered(capsys):
+    metrics.count('OutboxDelivered')
+    metrics.emit('github-escalation-handler')
+
+    line = json.loads(capsys.readouterr().out)
+    assert len(line['_aws']['CloudWatchMetrics']) == 1
@@ -0,0 +1,89 @@
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+import notifications
+import outbox
+import state
+
+NOW = 1790000000
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(outbox.time, 'time', lambda: NOW)
+    return state.SQLiteStore()
+
+def queued_row(store, attempts=0):
+    item = dict(outbox.message_item(b'{"text":"hello"}', 'alert', NOW - outbox.OUTBOX_HANDOFF), attempts=attempts)
+    store.put_item(Item=item)
+    return item
+
+def answered(status, headers=None):
+    future = Future()
+    future.set_result(SimpleNamespace(status=status, data=b'error body', headers=headers or {}))
+    return future
+
+def failed(error):
+    future = Future()
+    future.set_exception(error)
+    return future
+
+def test_delivered_row_is_deleted(store):
+    item = queued_row(store)
+    assert outbox.settle(store, item, answered(200)) == 'delivered'
+    assert store.query(outbox.PARTITION) == []
+
+def test_failed_row_is_rescheduled_with_backoff(store):
+    item = queued_row(store, attempts=2)
+    assert outbox.settle(store, item, answered(503)) == 'retry'
+
+    [row] = store.query(outbox.PARTITION)
+    assert row['attempts'] == 3
+    assert row['timestamp'] == outbox.sort_key(NOW + 4 * outbox.BACKOFF_BASE, item['message_id'])
+    assert row['last_error'].startswith('HTTP 503')
+
+def test_connection_error_is_retried(store):
+    item = queued_row(store)
+    assert outbox.settle(store, item, failed(OSError('connection reset'))) == 'retry'
+    assert store.query(outbox.PARTITION)[0]['last_error'] == 'connection reset'
+
+def test_throttled_row_waits_for_retry_after(store):
+    item = queued_row(store)
+    assert outbox.settle(store, item, answered(429, {'Retry-After': '120'})) == 'throttled'
+    assert store.query(outbox.PARTITION)[0]['timestamp'] == outbox.sort_key(NOW + 120, item['message_id'])
+
+def test_backoff_is_capped():
+    assert outbox.backoff(1) == outbox.BACKOFF_BASE
+    assert outbox.backoff(30) == outbox.BACKOFF_MAX
+
+def test_rejected_row_is_dead_lettered(store):
+    item = queued_row(store)
+    assert outbox.settle(store, item, answered(404)) == 'dead'
+
+    assert store.query(outbox.PARTITION) == []
+    [dead] = store.query(outbox.DEAD_LETTER_PARTITION)
+    assert dead['message_id'] == item['message_id'] and dead['attempts'] == 1
+    assert dead['purge_at'] == NOW + outbox.DEAD_LETTER_TTL_DAYS * 86400
+
+def test_row_out_of_attempts_is_dead_lettered(store):
+    item = queued_row(store, attempts=outbox.OUTBOX_MAX_ATTEMPTS - 1)
+    assert outbox.settle(store, item, answered(500)) == 'dead'
+    assert len(store.query(outbox.DEAD_LETTER_PARTITION)) == 1
+
+def test_deliver_starts_nothing_after_slack_throttles(store, monkeypatch):
+    monkeypatch.setattr(outbox, 'OUTBOX_MAX_IN_FLIGHT', 1)
+    responses = [SimpleNamespace(status=200, data=b'', headers={}), SimpleNamespace(status=429, data=b'', headers={})]
+    posted = []
+
+    def post(url, body):
+        posted.append(body)
+        return responses[len(posted) - 1]
+
+    monkeypatch.setattr(notifications, 'post', post)
+    items = [queued_row(store) for _ in range(4)]
+    assert outbox.deliver(store, 'http://slack.invalid/hook', items) == 3
+
+    assert len(posted) == 2
+    # Delivered, rescheduled, and two rows still at their original due time
+    assert len(store.query(outbox.PARTITION)) == 3
@@ -0,0 +1,47 @@
+import pytest
+
+import state
+
+KEYS = [{'service_name': name, 'timestamp': 'latest'} for name in ('Git Operations', 'API Requests')]
+
+class ThrottledDynamoDB:
+    """Resource stand-in whose BatchGetItem returns one key per call and the rest as unprocessed."""
+
+    def __init__(self, table_name, throttled_calls):
+        self.table_name = table_name
+        self.throttled_calls = throttled_calls
+        self.calls = 0
+
+    def Table(self, name):
+        return None
+
+    def batch_get_item(self, RequestItems):
+        self.calls += 1
+        keys = RequestItems[self.table_name]['Keys']
+        if self.calls <= self.throttled_calls:
+            return {'Responses': {self.table_name: []}, 'UnprocessedKeys': RequestItems}
+        return {
+            'Responses': {self.table_name: [dict(keys[0], status='operational')]},
+            'UnprocessedKeys': {self.table_name: dict(RequestItems[self.table_name], Keys=keys[1:])} if keys[1:] else {}
+        }
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(state.time, 'sleep', sleeps.append)
+    return sleeps
+
+def test_batch_get_backs_off_on_unprocessed_keys(sleeps):
+    dynamodb = ThrottledDynamoDB('status', throttled_calls=1)
+    items = state.DynamoDBStore('status', dynamodb).batch_get(KEYS)
+
+    assert sorted(item['service_name'] for item in items) == ['API Requests', 'Git Operations']
+    assert sleeps == [state.BATCH_GET_BACKOFF_BASE, state.BATCH_GET_BACKOFF_BASE * 2]
+
+def test_batch_get_gives_up_after_bounded_attempts(sleeps):
+    dynamodb = ThrottledDynamoDB('status', throttled_calls=100)
+    with pytest.raises(Exception, match='BatchGetItem'):
+        state.DynamoDBStore('status', dynamodb).batch_get(KEYS)
+
+    assert dynamodb.calls == state.BATCH_GET_ATTEMPTS
+    assert len(sleeps) == state.BATCH_GET_ATTEMPTS - 1
@@ -0,0 +1,43 @@
+import stats
+
+DAY_START = stats.day_start('2026-10-01')
+
+def test_interval_is_split_at_midnight():
+    deltas = {}
+    stats.add_interval(deltas, 'Git Operations', 'major_outage', DAY_START - 600, DAY_START + 300)
+    stats.add_interval(deltas, 'Git Operations', 'operational', DAY_START + 300, DAY_START + 900)
+
+    assert deltas == {
+        ('Git Operations', '2026-09-30'): {'seconds_major_outage': 600},
+        ('Git Operations', '2026-10-01'): {'seconds_major_outage': 300}
+    }
+
+def test_concurrent_monitors_do_not_lose_increments(dynamodb, monitor):
+    store = monitor.state.DynamoDBStore(monitor.DYNAMODB_TABLE, dynamodb=dynamodb)
+    monitor.clients['store'] = store
+
+    # Both monitors record their change before either commits, as during a lease takeover
+    writers = [store.writer(atomic=True), store.writer(atomic=True)]
+    for writer, seconds in zip(writers, (600, 300)):
+        stats.add_interval(monitor.pending_stats, 'Git Operations', 'major_outage', DAY_START, DAY_START + seconds)
+        stats.add(monitor.pending_stats, 'Git Operations', DAY_START, incidents=1)
+        monitor.flush_stats(writer)
+    for writer in writers:
+        writer.__exit__(None, None, None)
+
+    item = store.get_item(stats.key('Git Operations', '2026-10-01'))
+    assert item['seconds_major_outage'] == 900
+    assert item['incidents'] == 2
+    assert item['service'] == 'Git Operations'
+
+def test_summary_reads_daily_rows_and_the_open_interval():
+    items = [
+        dict(stats.key('Git Operations', '2026-10-01'), seconds_major_outage=3600, seconds_degraded_performance=600,
+             incidents=1, resolved=1, resolve_seconds=3600, acknowledged=1, acknowledge_seconds=300),
+    ]
+    latest = {'status': 'partial_outage', 'status_since': DAY_START + stats.DAY + 1800}
+    summary = stats.summarize('Git Operations', items, DAY_START, DAY_START + 2 * stats.DAY, latest)
+
+    assert summary['minutes_by_status'] == {'degraded_performance': 10.0, 'major_outage': 60.0, 'partial_outage': 1410.0}
+    assert summary['uptime_percent'] == round(100 * (1 - (3600 + 84600) / (2 * stats.DAY)), 3)
+    assert summary['mtta_minutes'] == 5.0 and summary['mttr_minutes'] == 60.0
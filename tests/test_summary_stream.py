@@ -0,0 +1,93 @@
+import json
+import random
+
+import pytest
+
+import summary_stream
+
+WATCHED = ('Git Operations', 'API Requests')
+
+SUMMARY = {
+    'page': {'id': 'kctbh9vrtdwd', 'name': 'GitHub', 'url': 'https://www.githubstatus.com', 'updated_at': '2026-10-01T12:00:00.000Z'},
+    'components': [
+        {'id': 'c1', 'name': 'Git Operations', 'status': 'major_outage', 'position': 1, 'description': 'Performance of git clones, pulls, pushes, and associated operations'},
+        {'id': 'c2', 'name': 'Webhooks', 'status': 'operational', 'position': 2, 'description': None, 'group': False},
+        {'id': 'c3', 'name': 'API Requests', 'status': 'degraded_performance', 'position': 3, 'showcase': True, 'start_date': None},
+        {'id': 'c4', 'name': 'Pages — été \U0001f680', 'status': 'operational', 'position': 12345678901234567890},
+    ],
+    'incidents': [
+        {
+            'id': 'i1', 'name': 'Disruption with "git" {clones} [and pushes]', 'status': 'investigating',
+            'shortlink': 'https://stspg.io/abc', 'impact': 'major',
+            'components': [{'id': 'c1', 'name': 'Git Operations'}, {'id': 'c2', 'name': 'Webhooks'}],
+            'incident_updates': [
+                {'id': 'u2', 'status': 'identified', 'body': 'Mitigation in progress — retry \\ later', 'created_at': '2026-10-01T12:05:00Z', 'affected_components': None},
+                {'id': 'u1', 'status': 'investigating', 'body': 'We are investigating.\nMore soon.', 'created_at': '2026-10-01T12:00:00Z'},
+            ],
+        },
+        {
+            'id': 'i2', 'name': 'Webhooks delayed', 'status': 'monitoring', 'shortlink': 'https://stspg.io/def',
+            'components': [{'id': 'c2', 'name': 'Webhooks'}],
+            'incident_updates': [{'id': 'u3', 'status': 'monitoring', 'body': 'Delays are recovering. \U0001f504', 'created_at': '2026-10-01T11:00:00Z'}],
+        },
+        {'id': 'i3', 'name': 'Unscoped incident', 'status': 'investigating', 'shortlink': '', 'components': [], 'incident_updates': []},
+    ],
+    'scheduled_maintenances': [{'id': 'm1', 'name': 'Brackets ] } in "strings" \\" stay quoted', 'components': [[], {}, [[{}]]]}],
+    'status': {'indicator': 'major', 'description': 'Partial System Outage', 'scale': -1.5e-3},
+}
+
+def expected(data, allowlist):
+    """The summary parse_summary must produce, built from json.loads."""
+    incidents = [summary_stream.compact_incident(incident, allowlist) for incident in data.get('incidents', [])]
+    return {
+        'components': [
+            {field: component.get(field) for field in summary_stream.COMPONENT_FIELDS}
+            for component in data.get('components', [])
+            if not allowlist or component['name'] in allowlist
+        ],
+        'incidents': [incident for incident in incidents if incident],
+        'allowlist': sorted(allowlist),
+    }
+
+def split(body, sizes):
+    chunks = []
+    position = 0
+    for size in sizes:
+        chunks.append(body[position:position + size])
+        position += size
+    chunks.append(body[position:])
+    return chunks
+
+def encodings():
+    yield json.dumps(SUMMARY).encode('utf-8')
+    yield json.dumps(SUMMARY, ensure_ascii=False).encode('utf-8')
+    yield json.dumps(SUMMARY, indent=2, ensure_ascii=False).encode('utf-8')
+
+def test_matches_json_loads_for_every_fixed_chunk_size():
+    for body in encodings():
+        for allowlist in (WATCHED, ()):
+            reference = expected(json.loads(body), allowlist)
+            for size in range(1, 64):
+                chunks = [body[start:start + size] for start in range(0, len(body), size)]
+                assert summary_stream.parse_summary(chunks, allowlist) == reference, size
+
+def test_matches_json_loads_across_random_chunk_boundaries():
+    generator = random.Random(20261001)
+    for body in encodings():
+        reference = expected(json.loads(body), WATCHED)
+        for _ in range(300):
+            sizes = [generator.randint(0, 40) for _ in range(generator.randint(1, 120))]
+            assert summary_stream.parse_summary(split(body, sizes), WATCHED) == reference
+
+def test_empty_summary():
+    assert summary_stream.parse_summary([b' { } '], WATCHED) == {'components': [], 'incidents': [], 'allowlist': sorted(WATCHED)}
+
+def test_truncated_summary_is_rejected():
+    body = json.dumps(SUMMARY).encode('utf-8')
+    for cut in (1, len(body) // 3, len(body) // 2, len(body) - 1):
+        with pytest.raises(ValueError):
+            summary_stream.parse_summary([body[:cut]], WATCHED)
+
+def test_trailing_data_is_rejected():
+    with pytest.raises(ValueError):
+        summary_stream.parse_summary([json.dumps(SUMMARY).encode('utf-8') + b' {}'], WATCHED)